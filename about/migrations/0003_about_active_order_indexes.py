@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('about', '0002_currentnasheen_previousnasheen'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aboutsection',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'id'], name='aboutsection_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aboutsubsection',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['section', 'order', 'id'], name='aboutsub_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='currentnasheen',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='currentnasheen_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='previousnasheen',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'id'], name='prevnasheen_active_order_idx'),
+        ),
+    ]
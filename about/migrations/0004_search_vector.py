@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:36
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+from core.migration_utils import PostgresOnly, search_vector_trigger
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('about', '0003_about_active_order_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aboutsection',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='aboutsubsection',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        PostgresOnly(migrations.AddIndex(
+            model_name='aboutsection',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='aboutsection_search_idx'),
+        )),
+        PostgresOnly(migrations.AddIndex(
+            model_name='aboutsubsection',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='aboutsub_search_idx'),
+        )),
+        PostgresOnly(search_vector_trigger('about_aboutsection', [
+            ('title_en', 'english', 'A'),
+            ('title_ur', 'simple', 'A'),
+            ('content_en', 'english', 'B'),
+            ('content_ur', 'simple', 'B'),
+        ])),
+        PostgresOnly(search_vector_trigger('about_aboutsubsection', [
+            ('title_en', 'english', 'A'),
+            ('title_ur', 'simple', 'A'),
+            ('content_en', 'english', 'B'),
+            ('content_ur', 'simple', 'B'),
+        ])),
+    ]
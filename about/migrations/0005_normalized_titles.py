@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:38
+
+from django.db import migrations, models
+
+from core.migration_utils import PostgresOnly, fill_normalized_fields, search_vector_trigger
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('about', '0004_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aboutsection',
+            name='normalized_title_en',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='aboutsection',
+            name='normalized_title_ur',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='aboutsection',
+            index=models.Index(fields=['normalized_title_en'], name='aboutsection_norm_en_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='aboutsection',
+            index=models.Index(fields=['normalized_title_ur'], name='aboutsection_norm_ur_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        fill_normalized_fields('about', 'aboutsection', {
+            'normalized_title_en': 'title_en',
+            'normalized_title_ur': 'title_ur',
+        }),
+        # Index the normalized Urdu title instead of the raw one
+        PostgresOnly(search_vector_trigger(
+            'about_aboutsection',
+            [
+                ('title_en', 'english', 'A'),
+                ('normalized_title_ur', 'simple', 'A'),
+                ('content_en', 'english', 'B'),
+                ('content_ur', 'simple', 'B'),
+            ],
+            previous_columns=[
+                ('title_en', 'english', 'A'),
+                ('title_ur', 'simple', 'A'),
+                ('content_en', 'english', 'B'),
+                ('content_ur', 'simple', 'B'),
+            ],
+        )),
+    ]
@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 class AboutSection(models.Model):
@@ -14,10 +16,26 @@ class AboutSection(models.Model):
     is_active = models.BooleanField(default=True, help_text="Show this section on the page")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Full-text search (kept up to date by a database trigger on PostgreSQL)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Normalized titles for search and lookups (filled on save, see core/text.py)
+    normalized_title_en = models.CharField(max_length=255, blank=True, default='', editable=False)
+    normalized_title_ur = models.CharField(max_length=255, blank=True, default='', editable=False)
+    normalized_fields = {'normalized_title_en': 'title_en', 'normalized_title_ur': 'title_ur'}
 
     class Meta:
         ordering = ['order', 'id']
         verbose_name = "About Section"
+        indexes = [
+            # Public list: WHERE is_active ORDER BY order, id
+            models.Index(fields=['order', 'id'], condition=models.Q(is_active=True),
+                         name='aboutsection_active_order_idx'),
+            GinIndex(fields=['search_vector'], name='aboutsection_search_idx'),
+            models.Index(fields=['normalized_title_en'], name='aboutsection_norm_en_idx',
+                         opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['normalized_title_ur'], name='aboutsection_norm_ur_idx',
+                         opclasses=['varchar_pattern_ops']),
+        ]
         verbose_name_plural = "About Sections"
 
     def __str__(self):
@@ -38,10 +56,18 @@ class AboutSubSection(models.Model):
     is_active = models.BooleanField(default=True, help_text="Show this sub-section")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Full-text search (kept up to date by a database trigger on PostgreSQL)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['order', 'id']
         verbose_name = "About Sub-Section"
+        indexes = [
+            # Prefetch: WHERE section_id IN (...) AND is_active ORDER BY order, id
+            models.Index(fields=['section', 'order', 'id'], condition=models.Q(is_active=True),
+                         name='aboutsub_active_order_idx'),
+            GinIndex(fields=['search_vector'], name='aboutsub_search_idx'),
+        ]
         verbose_name_plural = "About Sub-Sections"
 
     def __str__(self):
@@ -66,6 +92,11 @@ class CurrentNasheen(models.Model):
         verbose_name = "Current Nasheen"
         verbose_name_plural = "Current Nasheen"
         ordering = ['-is_active', '-created_at']
+        indexes = [
+            # Public endpoint: WHERE is_active ORDER BY created_at DESC
+            models.Index(fields=['-created_at'], condition=models.Q(is_active=True),
+                         name='currentnasheen_active_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name_en} (Active: {self.is_active})"
@@ -88,6 +119,11 @@ class PreviousNasheen(models.Model):
         verbose_name = "Previous Nasheen"
         verbose_name_plural = "Previous Nasheens"
         ordering = ['order', 'id']
+        indexes = [
+            # Lineage tree: WHERE is_active ORDER BY order, id
+            models.Index(fields=['order', 'id'], condition=models.Q(is_active=True),
+                         name='prevnasheen_active_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.order}. {self.name_en}"
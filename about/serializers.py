@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from core.media_urls import get_media_url_builder
 from .models import AboutSection, AboutSubSection, CurrentNasheen, PreviousNasheen
 
 
@@ -8,6 +9,12 @@ class AboutSubSectionSerializer(serializers.ModelSerializer):
         fields = ['id', 'title_en', 'title_ur', 'content_en', 'content_ur', 'order']
 
 
+class AboutSubSectionSearchSerializer(AboutSubSectionSerializer):
+    """Sub-section search result, with the id of the section it belongs to"""
+    class Meta(AboutSubSectionSerializer.Meta):
+        fields = AboutSubSectionSerializer.Meta.fields + ['section']
+
+
 class AboutSectionSerializer(serializers.ModelSerializer):
     subsections = serializers.SerializerMethodField()
     
@@ -16,8 +23,11 @@ class AboutSectionSerializer(serializers.ModelSerializer):
         fields = ['id', 'title_en', 'title_ur', 'content_en', 'content_ur', 'order', 'default_open', 'subsections']
     
     def get_subsections(self, obj):
-        # Filter active subsections and order them
-        active_subsections = obj.subsections.filter(is_active=True).order_by('order', 'id')
+        # Use the filtered, ordered prefetch from get_active_sections() when available;
+        # filtering obj.subsections here would bypass it and query once per section
+        active_subsections = getattr(obj, 'active_subsections', None)
+        if active_subsections is None:
+            active_subsections = obj.subsections.filter(is_active=True).order_by('order', 'id')
         return AboutSubSectionSerializer(active_subsections, many=True).data
 
 
@@ -31,7 +41,7 @@ class CurrentNasheenSerializer(serializers.ModelSerializer):
     def get_image(self, obj):
         request = self.context.get('request')
         if obj.image and request:
-            return request.build_absolute_uri(obj.image.url)
+            return get_media_url_builder(request).file_url(obj.image)
         return None
 
 
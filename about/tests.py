@@ -1,4 +1,53 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import AboutSection, AboutSubSection
 
+
+class AboutSectionQueryTests(TestCase):
+    """Regression tests for the about sections query count"""
+
+    def setUp(self):
+        """Start from an empty cache"""
+        cache.clear()
+        self.client = APIClient()
+
+    def _seed(self, sections, subsections):
+        for s in range(sections):
+            section = AboutSection.objects.create(title_en=f'Section {s}', title_ur=f'حصہ {s}', order=s)
+            AboutSubSection.objects.bulk_create([
+                AboutSubSection(
+                    section=section, title_en=f'Sub {i}', title_ur=f'ذیلی {i}',
+                    content_en='...', content_ur='...', order=subsections - i,
+                    is_active=i != 0,
+                )
+                for i in range(subsections)
+            ])
+
+    def test_query_count_stays_flat(self):
+        """The query count doesn't grow with the number of sections"""
+        self._seed(3, 2)
+        # Plus the published snapshot lookup, which finds nothing here
+        with self.assertNumQueries(3):
+            self.client.get('/api/about/sections/')
+
+        self._seed(30, 10)
+        cache.clear()
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/about/sections/')
+        self.assertEqual(len(response.json()), 33)
+
+    def test_inactive_subsections_hidden_and_ordered(self):
+        """Only active subsections are returned, in display order"""
+        self._seed(1, 4)
+        subsections = self.client.get('/api/about/sections/').json()[0]['subsections']
+        self.assertEqual([s['title_en'] for s in subsections], ['Sub 3', 'Sub 2', 'Sub 1'])
+
+    def test_detail_uses_prefetch(self):
+        """A single section is one query plus the subsections prefetch"""
+        self._seed(1, 5)
+        section = AboutSection.objects.get()
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/about/sections/{section.pk}/')
+        self.assertEqual(len(response.json()['subsections']), 4)
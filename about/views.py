@@ -1,62 +1,79 @@
+from django.db.models import Prefetch
 from rest_framework import viewsets
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from .models import AboutSection, CurrentNasheen, PreviousNasheen
+from core.cache_utils import CacheMixin
+from .models import AboutSection, AboutSubSection, CurrentNasheen, PreviousNasheen
 from .serializers import AboutSectionSerializer, CurrentNasheenSerializer, PreviousNasheenSerializer
 
 
-class AboutSectionViewSet(viewsets.ReadOnlyModelViewSet):
+def get_active_sections():
+    """
+    Active sections with their active subsections, ordered.
+    The subsections are prefetched already filtered and ordered into
+    `active_subsections`, so the whole list costs two queries.
+    """
+    return AboutSection.objects.filter(is_active=True).prefetch_related(
+        Prefetch(
+            'subsections',
+            queryset=AboutSubSection.objects.filter(is_active=True).order_by('order', 'id'),
+            to_attr='active_subsections',
+        )
+    ).order_by('order', 'id')
+
+
+class AboutSectionViewSet(CacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint to get all active About sections with their subsections
     """
     queryset = AboutSection.objects.filter(is_active=True).prefetch_related('subsections')
     serializer_class = AboutSectionSerializer
+    cache_key_prefix = 'about'
+    query_budget = 3  # snapshot lookup, sections, subsections
+    snapshot_key = 'about.sections'
+    cache_models = (AboutSection, AboutSubSection)
     
     def get_queryset(self):
         # Return all active sections, ordered by order field
-        return AboutSection.objects.filter(is_active=True).prefetch_related(
-            'subsections'
-        ).order_by('order', 'id')
-    
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return get_active_sections()
 
 
-class CurrentNasheenViewSet(viewsets.ReadOnlyModelViewSet):
+class CurrentNasheenViewSet(CacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint to get current active Nasheen
     """
     queryset = CurrentNasheen.objects.filter(is_active=True)
     serializer_class = CurrentNasheenSerializer
+    cache_key_prefix = 'about'
+    query_budget = 2  # snapshot lookup, then the queryset if there is none
+    snapshot_key = 'about.current-nasheen'
     
     def get_queryset(self):
         # Return only the active current Nasheen
         return CurrentNasheen.objects.filter(is_active=True)
     
     def list(self, request, *args, **kwargs):
+        return self.cached_list(self._current_nasheen_response)
+    
+    def _current_nasheen_response(self):
         queryset = self.get_queryset()
         current_nasheen = queryset.first()
         if current_nasheen:
-            serializer = self.get_serializer(current_nasheen, context={'request': request})
+            serializer = self.get_serializer(current_nasheen, context={'request': self.request})
             return Response(serializer.data)
         return Response(None)
 
 
-class PreviousNasheenViewSet(viewsets.ReadOnlyModelViewSet):
+class PreviousNasheenViewSet(CacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint to get all previous Nasheens for lineage tree
     """
     queryset = PreviousNasheen.objects.filter(is_active=True)
     serializer_class = PreviousNasheenSerializer
+    cache_key_prefix = 'about'
+    query_budget = 2  # snapshot lookup, then the queryset if there is none
+    snapshot_key = 'about.previous-nasheen'
     
     def get_queryset(self):
         # Return all active previous Nasheens, ordered by order field
         return PreviousNasheen.objects.filter(is_active=True).order_by('order', 'id')
-    
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
-
@@ -0,0 +1,304 @@
+"""
+Custom cache backends
+
+LRUMemoryCache
+    In-process cache with a true LRU eviction policy under a byte budget
+    (LocMemCache culls a random third of its entries by count when full).
+
+TieredCache
+    Near-cache: an LRUMemoryCache (L1) in front of a shared cache such as
+    Redis (L2). Reads are served from process memory when possible; writes
+    go to both. L1 entries live for a short time only, so a model version
+    stamp bumped by another worker (see core.cache_utils) is picked up within
+    L1_VERSION_TIMEOUT seconds, and since every API cache key embeds those
+    version stamps, the longer-lived L1 data entries can never be served
+    after a change has been seen.
+
+Example:
+    CACHES = {
+        'default': {...Redis...},
+        'api': {
+            'BACKEND': 'core.cache_backends.TieredCache',
+            'LOCATION': 'api-l1',
+            'OPTIONS': {
+                'L2': 'default',
+                'MAX_BYTES': 32 * 1024 * 1024,
+                'L1_TIMEOUT': 60,
+                'L1_VERSION_TIMEOUT': 2,
+            },
+        },
+    }
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .cache_utils import VERSION_KEY_PREFIX
+
+# Default byte budget of an in-process cache (32 MB)
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Rough per-entry bookkeeping overhead (dict slot, tuple, float)
+ENTRY_OVERHEAD = 100
+
+_MISSING = object()
+
+
+class _LRUStore:
+    """Shared storage of all LRUMemoryCache instances with the same LOCATION"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (pickled value, expiry, size)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+# LOCATION -> _LRUStore (Django creates one backend instance per thread)
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class LRUMemoryCache(BaseCache):
+    """
+    Thread-safe in-process cache bounded by the pickled size of its values.
+
+    OPTIONS:
+        MAX_BYTES - byte budget, least recently used entries are evicted first
+    """
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        max_bytes = int(options.get('MAX_BYTES', DEFAULT_MAX_BYTES))
+        with _stores_lock:
+            self._store = _stores.setdefault(name, _LRUStore(max_bytes))
+
+    def _get_live(self, key):
+        # Caller holds the lock
+        item = self._store.entries.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= time.time():
+            self._delete(key)
+            return None
+        return item
+
+    def _delete(self, key):
+        # Caller holds the lock
+        item = self._store.entries.pop(key, None)
+        if item is None:
+            return False
+        self._store.size -= item[2]
+        return True
+
+    def _set(self, key, value, timeout):
+        # Caller holds the lock
+        self._delete(key)
+        expiry = self.get_backend_timeout(timeout)
+        if expiry is not None and expiry <= time.time():
+            # timeout <= 0: already expired, don't let it push live entries out
+            return
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        size = len(pickled) + len(key) + ENTRY_OVERHEAD
+        if size > self._store.max_bytes:
+            # Would evict everything else and still not fit
+            return
+        store = self._store
+        store.entries[key] = (pickled, expiry, size)
+        store.size += size
+        while store.size > store.max_bytes:
+            _, evicted = store.entries.popitem(last=False)
+            store.size -= evicted[2]
+            store.evictions += 1
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._store.lock:
+            if self._get_live(key) is not None:
+                return False
+            self._set(key, value, timeout)
+            return True
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._store.lock:
+            item = self._get_live(key)
+            if item is None:
+                self._store.misses += 1
+                return default
+            self._store.entries.move_to_end(key)
+            self._store.hits += 1
+            pickled = item[0]
+        return pickle.loads(pickled)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._store.lock:
+            self._set(key, value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._store.lock:
+            item = self._get_live(key)
+            if item is None:
+                return False
+            expiry = self.get_backend_timeout(timeout)
+            if expiry is not None and expiry <= time.time():
+                self._delete(key)
+                return True
+            self._store.entries[key] = (item[0], expiry, item[2])
+            self._store.entries.move_to_end(key)
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._store.lock:
+            item = self._get_live(key)
+            if item is None:
+                raise ValueError("Key '%s' not found" % key)
+            new_value = pickle.loads(item[0]) + delta
+            pickled = pickle.dumps(new_value, self.pickle_protocol)
+            self._store.size += len(pickled) - len(item[0])
+            self._store.entries[key] = (pickled, item[1], item[2] + len(pickled) - len(item[0]))
+            self._store.entries.move_to_end(key)
+        return new_value
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._store.lock:
+            return self._get_live(key) is not None
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._store.lock:
+            return self._delete(key)
+
+    def clear(self):
+        with self._store.lock:
+            self._store.entries.clear()
+            self._store.size = 0
+
+    def get_stats(self):
+        """Return hit/miss/eviction counters and current usage"""
+        store = self._store
+        with store.lock:
+            return {
+                'hits': store.hits,
+                'misses': store.misses,
+                'evictions': store.evictions,
+                'entries': len(store.entries),
+                'bytes': store.size,
+                'max_bytes': store.max_bytes,
+            }
+
+
+class TieredCache(BaseCache):
+    """
+    LRUMemoryCache (L1) in front of another configured cache (L2).
+
+    OPTIONS:
+        L2                 - alias of the shared cache in CACHES (required)
+        MAX_BYTES          - byte budget of the L1 cache
+        L1_TIMEOUT         - max seconds an entry is kept in L1 (default 60)
+        L1_VERSION_TIMEOUT - max seconds a model version stamp is kept in L1 (default 2)
+    """
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options['L2']
+        self._l1_timeout = int(options.get('L1_TIMEOUT', 60))
+        self._l1_version_timeout = int(options.get('L1_VERSION_TIMEOUT', 2))
+        self._l1 = LRUMemoryCache(name, params)
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _l1_timeout_for(self, key, timeout):
+        l1_timeout = self._l1_timeout
+        if str(key).startswith(VERSION_KEY_PREFIX):
+            l1_timeout = self._l1_version_timeout
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return l1_timeout
+        return min(timeout, l1_timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout, version)
+        # Locks and seeds are only meaningful in L2
+        self._l1.delete(key, version)
+        return added
+
+    def get(self, key, default=None, version=None):
+        value = self._l1.get(key, _MISSING, version)
+        if value is not _MISSING:
+            return value
+        value = self.l2.get(key, _MISSING, version)
+        if value is _MISSING:
+            return default
+        self._l1.set(key, value, self._l1_timeout_for(key, DEFAULT_TIMEOUT), version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remote_keys = []
+        for key in keys:
+            value = self._l1.get(key, _MISSING, version)
+            if value is _MISSING:
+                remote_keys.append(key)
+            else:
+                found[key] = value
+        if remote_keys:
+            remote = self.l2.get_many(remote_keys, version)
+            for key, value in remote.items():
+                self._l1.set(key, value, self._l1_timeout_for(key, DEFAULT_TIMEOUT), version)
+            found.update(remote)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout, version)
+        self._l1.set(key, value, self._l1_timeout_for(key, timeout), version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._l1.delete(key, version)
+        return self.l2.touch(key, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        self._l1.delete(key, version)
+        return self.l2.incr(key, delta, version)
+
+    def has_key(self, key, version=None):
+        return self._l1.has_key(key, version) or self.l2.has_key(key, version)
+
+    def delete(self, key, version=None):
+        self._l1.delete(key, version)
+        return self.l2.delete(key, version)
+
+    def clear(self):
+        self._l1.clear()
+        self.l2.clear()
+
+    def get_stats(self):
+        """Return the L1 counters"""
+        return self._l1.get_stats()
+
+
+def is_shared_cache(cache):
+    """
+    Whether every worker process sees the same data in a cache (Redis,
+    Memcached, a database) rather than a copy of its own
+    """
+    return not isinstance(cache, (LRUMemoryCache, LocMemCache, DummyCache))
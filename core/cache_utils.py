@@ -1,44 +1,338 @@
 """
 Cache utilities for API views
 Provides decorators and mixins for caching API responses
+
+Invalidation is done with per-model version stamps instead of clearing the
+whole cache. Every model has a small version key in the cache which is bumped
+by the post_save/post_delete/m2m_changed signals (see core/signals.py). The
+versions of the models an endpoint depends on are folded into its cache key,
+so a change to one model only invalidates the endpoints that read it. Old
+entries are never deleted explicitly - they simply stop being addressed and
+expire on their own timeout.
+
+Cache entries hold the final rendered JSON bytes plus content type and
+headers, so a hit is returned as a plain HttpResponse without running the
+serializer or the renderer again. Its gzip/brotli/zstd copies are stored
+next to it by the compression middleware (see core/compression.py).
+
+With a shared cache (Redis) the same version stamps double as HTTP
+validators: CacheMixin sends an ETag and Last-Modified with every response
+and answers matching conditional requests with 304 Not Modified without
+touching the database. A per-process cache has per-process stamps, which a
+worker that didn't handle a write never bumps, so there the ETag is a hash
+of the body and is checked once the body is known.
+
+Entries have a soft TTL (the cache timeout) and a hard TTL (soft TTL plus
+the stale timeout). Past the soft TTL the first request takes a short lock
+and recomputes the entry while concurrent requests keep getting the stale
+copy, so an expiring popular key doesn't send every worker to the database
+at once. Past the hard TTL the entry is gone and is never served.
 """
 from functools import wraps
-from django.core.cache import cache
+from django.core.cache import caches
 from django.conf import settings
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.connection import ConnectionProxy
+from django.utils.http import http_date
 import hashlib
 import json
+import logging
+import threading
+import time
+
+from .snapshots import get_snapshot_response
+
+logger = logging.getLogger(__name__)
+
+# Cache alias used for API responses and version stamps (see settings.API_CACHE_ALIAS)
+CACHE_ALIAS = getattr(settings, 'API_CACHE_ALIAS', 'default')
+cache = ConnectionProxy(caches, CACHE_ALIAS)
+
+
+# Prefix for the per-model version keys
+VERSION_KEY_PREFIX = 'cachever'
+
+# Framework apps whose writes never affect cached API responses
+CACHE_VERSION_IGNORED_APPS = {'admin', 'auth', 'contenttypes', 'sessions', 'token_blacklist'}
+
+# How long past the soft TTL a stale entry may still be served (seconds)
+DEFAULT_STALE_TIMEOUT = 60
+
+# How long a single recompute may hold the refresh lock (seconds)
+DEFAULT_LOCK_TIMEOUT = 10
+
+
+class CacheStats:
+    """
+    Per-process counters for the API cache.
+
+        hits      - fresh entry served
+        misses    - no entry, response computed
+        refreshes - stale entry found, this request took the lock and recomputed
+        stale     - stale entry served while another request recomputes
+        variant_hits   - compressed copy of an entry reused (core/compression.py)
+        variant_misses - entry compressed and its compressed copy stored
+    """
+    FIELDS = ('hits', 'misses', 'refreshes', 'stale', 'variant_hits', 'variant_misses')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def incr(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+cache_stats = CacheStats()
+
+
+def get_cache_stats():
+    """Return the API cache counters of this process"""
+    return cache_stats.snapshot()
+
+
+def get_model_namespace(model):
+    """Return the version namespace of a model, e.g. 'events.event'"""
+    return model._meta.label_lower
+
+
+def _version_key(namespace):
+    return f"{VERSION_KEY_PREFIX}:{namespace}"
+
+
+def _new_stamp():
+    # Versions are millisecond timestamps rather than counters starting at 1,
+    # so a version key that was evicted is re-seeded with a value that was
+    # never used before and can't resurrect an old cache entry.
+    return int(time.time() * 1000)
+
+
+def get_cache_versions(models):
+    """
+    Return {namespace: version} for the given models.
+    Missing version keys are seeded with the current timestamp.
+    """
+    namespaces = sorted({get_model_namespace(model) for model in models})
+    keys = {_version_key(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(list(keys))
+
+    versions = {}
+    for key, namespace in keys.items():
+        version = found.get(key)
+        if version is None:
+            stamp = _new_stamp()
+            # add() so concurrent seeders agree on a single value
+            if not cache.add(key, stamp, None):
+                stamp = cache.get(key, stamp)
+            version = stamp
+        versions[namespace] = version
+    return versions
+
+
+def bump_cache_version(model):
+    """Invalidate every cache entry built from this model"""
+    if model._meta.app_label in CACHE_VERSION_IGNORED_APPS:
+        return
+    key = _version_key(get_model_namespace(model))
+    stamp = _new_stamp()
+    current = cache.get(key)
+    if current is not None and current >= stamp:
+        stamp = current + 1
+    cache.set(key, stamp, None)
+
+
+def get_version_token(models=None, versions=None):
+    """Short token that changes whenever any of the given models changes"""
+    if versions is None:
+        versions = get_cache_versions(models) if models else {}
+    if not versions:
+        return '0'
+    token_data = '|'.join(f"{namespace}={version}" for namespace, version in sorted(versions.items()))
+    return hashlib.md5(token_data.encode()).hexdigest()[:12]
+
+
+def build_cache_key(key_prefix, request, models=None, versions=None):
+    """Cache key for a request: host + path + query string + model versions"""
+    # Host and scheme are part of the key because serializers embed absolute
+    # media URLs built with request.build_absolute_uri()
+    query_string = request.GET.urlencode()
+    cache_key_data = f"{request.scheme}://{request.get_host()}{request.path}?{query_string}"
+    path_hash = hashlib.md5(cache_key_data.encode()).hexdigest()
+    return f"{key_prefix}:{path_hash}:{get_version_token(models, versions)}"
+
+
+def cache_is_shared():
+    """Whether every worker sees the same API cache entries and version stamps"""
+    # Imported here, core.cache_backends imports this module
+    from .cache_backends import is_shared_cache
+    return is_shared_cache(caches[CACHE_ALIAS])
+
+
+def get_validators(cache_key, versions, variant=''):
+    """
+    Return (etag, last_modified) for a cached endpoint.
+
+    Both come from the model version stamps already folded into the cache
+    key, so checking them costs no database query at all. Last-Modified is
+    the newest stamp (they are millisecond timestamps). Only valid when the
+    stamps are shared by every worker, see cache_is_shared().
+    """
+    etag = quote_etag(hashlib.md5(f"{cache_key}:{variant}".encode()).hexdigest())
+    last_modified = max(versions.values()) // 1000 if versions else None
+    return etag, last_modified
+
+
+def get_body_etag(content):
+    """ETag of a response body, for caches whose version stamps aren't shared"""
+    return quote_etag(hashlib.md5(content).hexdigest())
+
+
+def set_validators(response, etag, last_modified):
+    """Add ETag / Last-Modified headers to a response"""
+    if etag and not response.has_header('ETag'):
+        response['ETag'] = etag
+    if last_modified and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def _entry_from_response(response, timeout):
+    """
+    Build a cache entry from a rendered response.
+    Only the encoded body, content type and headers are stored - never the
+    Response object itself, which holds on to the request, view and renderer.
+    """
+    headers = {
+        name: value for name, value in response.items()
+        if name.lower() not in ('content-type', 'content-length')
+    }
+    return {
+        'content': response.content,
+        'content_type': response.get('Content-Type'),
+        'headers': headers,
+        'expires': time.time() + timeout,
+    }
 
 
-def cache_api_response(timeout=300, key_prefix='api'):
+def _mark_cached(response, cache_key, entry):
+    """
+    Note which cache entry a response's body is, so the compression
+    middleware can store compressed variants next to it
+    """
+    response._api_cache_entry = (cache_key, entry['expires'])
+
+
+def _response_from_entry(entry, cache_key):
+    """Turn a cache entry back into a plain HttpResponse (no rendering needed)"""
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    if entry['content_type'] is None:
+        # Empty bodies (e.g. Response(None)) are rendered without a content type
+        del response['Content-Type']
+    for name, value in entry['headers'].items():
+        response[name] = value
+    _mark_cached(response, cache_key, entry)
+    return response
+
+
+def _is_json(response):
+    return response.get('Content-Type', '').startswith('application/json')
+
+
+def get_cache_entry(cache_key, lock_timeout=DEFAULT_LOCK_TIMEOUT):
+    """
+    Look up a cached response entry.
+
+    Returns the entry to serve, or None when the caller should compute the
+    response and store it with set_cache_entry(). A stale entry is returned
+    to everyone except the one request that wins the refresh lock.
+    """
+    entry = cache.get(cache_key)
+    if entry is None:
+        cache_stats.incr('misses')
+        return None
+
+    if entry.get('expires', 0) > time.time():
+        cache_stats.incr('hits')
+        return entry
+
+    if cache.add(f"{cache_key}:lock", 1, lock_timeout):
+        cache_stats.incr('refreshes')
+        return None
+
+    cache_stats.incr('stale')
+    logger.debug(f"Serving stale cache entry {cache_key} while it is refreshed")
+    return entry
+
+
+def set_cache_entry(cache_key, response, timeout, stale_timeout=DEFAULT_STALE_TIMEOUT):
+    """Store a rendered response and release the refresh lock"""
+    entry = _entry_from_response(response, timeout)
+    cache.set(cache_key, entry, timeout + (stale_timeout or 0))
+    cache.delete(f"{cache_key}:lock")
+    _mark_cached(response, cache_key, entry)
+
+
+def cache_api_response(timeout=300, key_prefix='api', models=None,
+                       stale_timeout=DEFAULT_STALE_TIMEOUT, lock_timeout=DEFAULT_LOCK_TIMEOUT):
     """
     Decorator to cache API view responses.
-    
-    Usage:
-        @cache_api_response(timeout=3600)
+
+    `models` lists the models the view reads; the cached response is
+    invalidated as soon as any of them is saved or deleted.
+    `stale_timeout` is how long after `timeout` a stale copy may still be
+    served while one request refreshes it (0 disables stale serving).
+
+    Only rendered JSON bodies are cached, so for DRF function views the
+    decorator must go outside @api_view:
+        @cache_api_response(timeout=3600, models=[Event])
+        @api_view(['GET'])
         def my_view(request):
             ...
     """
     def decorator(func):
+        warned = False
+
         @wraps(func)
         def wrapper(request, *args, **kwargs):
-            # Generate cache key from request path and query params
-            query_string = request.GET.urlencode()
-            cache_key_data = f"{request.path}?{query_string}"
-            cache_key = f"{key_prefix}:{hashlib.md5(cache_key_data.encode()).hexdigest()}"
-            
+            nonlocal warned
+            # Generate cache key from request path, query params and model versions
+            cache_key = build_cache_key(key_prefix, request, models)
+
             # Try to get from cache
-            cached_response = cache.get(cache_key)
-            if cached_response is not None:
-                return cached_response
-            
+            entry = get_cache_entry(cache_key, lock_timeout)
+            if entry is not None:
+                return _response_from_entry(entry, cache_key)
+
             # Call the view function
             response = func(request, *args, **kwargs)
-            
-            # Cache successful responses only
+
+            # Cache successful JSON responses only
             if response.status_code == 200:
-                # Store response data (serialize if needed)
-                cache.set(cache_key, response, timeout)
-            
+                if isinstance(response, SimpleTemplateResponse) and not response.is_rendered:
+                    if getattr(response, 'accepted_renderer', None) is None and hasattr(response, 'data'):
+                        # DRF Response that was never finalized - can't render it here
+                        if not warned:
+                            warned = True
+                            logger.warning(
+                                f"cache_api_response on {func.__qualname__} got an unrendered DRF "
+                                f"Response and caches nothing; put it outside @api_view"
+                            )
+                        return response
+                    response.render()
+                if _is_json(response):
+                    set_cache_entry(cache_key, response, timeout, stale_timeout)
+
             return response
         return wrapper
     return decorator
@@ -47,69 +341,142 @@ def cache_api_response(timeout=300, key_prefix='api'):
 class CacheMixin:
     """
     Mixin for ViewSets to enable caching.
-    
+
+    `cache_models` lists every model the serialized output depends on
+    (defaults to the queryset model). Saving or deleting any of them
+    invalidates this viewset's cached responses and nothing else.
+
+    `cache_stale_timeout` is how long after `cache_timeout` a stale response
+    may still be served while one request refreshes it (0 disables it).
+
+    `snapshot_key` names the PublishedSnapshot row of the list endpoint (see
+    core/snapshots.py). A cache miss is then served from the snapshot, and
+    the snapshot alone is served if the cache is unavailable.
+
     Usage:
         class MyViewSet(CacheMixin, viewsets.ModelViewSet):
             cache_timeout = 3600  # 1 hour
             cache_key_prefix = 'myapp'
+            cache_models = (MyModel, MyChildModel)
     """
     cache_timeout = 300  # Default: 5 minutes
+    cache_stale_timeout = DEFAULT_STALE_TIMEOUT
+    cache_lock_timeout = DEFAULT_LOCK_TIMEOUT
     cache_key_prefix = 'api'
-    
+    cache_models = None
+    snapshot_key = None
+
+    def get_cache_models(self):
+        """Models whose changes invalidate this viewset's cache"""
+        if self.cache_models:
+            return self.cache_models
+        if getattr(self, 'queryset', None) is not None:
+            return (self.queryset.model,)
+        return (self.get_serializer_class().Meta.model,)
+
+    def get_model_versions(self):
+        """Version stamps of the cache models, fetched once per request"""
+        if getattr(self, '_model_versions', None) is None:
+            self._model_versions = get_cache_versions(self.get_cache_models())
+        return self._model_versions
+
     def get_cache_key(self):
         """Generate cache key for this request"""
-        querystring = self.request.GET.urlencode()
-        path = self.request.path
-        cache_key_data = f"{path}?{querystring}"
-        return f"{self.cache_key_prefix}:{hashlib.md5(cache_key_data.encode()).hexdigest()}"
-    
+        return build_cache_key(self.cache_key_prefix, self.request, versions=self.get_model_versions())
+
+    def get_cached_response(self, cache_key, compute):
+        """
+        Return the cached body for cache_key as a plain HttpResponse, or call
+        compute() and mark its response to be stored once it is rendered.
+
+        With a shared cache conditional requests are answered first: a
+        matching If-None-Match or If-Modified-Since gets a 304 before any
+        queryset is evaluated. Otherwise finalize_response() checks them
+        against a hash of the body.
+        """
+        if not cache_is_shared():
+            self._validators = None
+            self._body_etag = True
+        else:
+            self._validators = get_validators(
+                cache_key, self.get_model_versions(), self.request.accepted_renderer.format
+            )
+            not_modified = get_conditional_response(
+                self.request, etag=self._validators[0], last_modified=self._validators[1]
+            )
+            if not_modified is not None:
+                return set_validators(not_modified, *self._validators)
+
+        if self.request.accepted_renderer.format != 'json':
+            # Browsable API and other formats are rendered per request
+            return compute()
+
+        entry = get_cache_entry(cache_key, self.cache_lock_timeout)
+        if entry is not None:
+            return _response_from_entry(entry, cache_key)
+
+        response = compute()
+
+        if response.status_code == 200:
+            response._api_cache_key = cache_key
+
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Render responses marked by get_cached_response and store the bytes"""
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, '_validators', None)
+        if validators and response.status_code == 200:
+            set_validators(response, *validators)
+        body_etag = getattr(self, '_body_etag', False) and response.status_code == 200
+        if body_etag:
+            if isinstance(response, SimpleTemplateResponse):
+                response.render()
+            # Set before storing, so cache hits carry it without hashing again
+            set_validators(response, get_body_etag(response.content), None)
+        cache_key = getattr(response, '_api_cache_key', None)
+        if cache_key:
+            if isinstance(response, SimpleTemplateResponse):
+                response.render()
+            set_cache_entry(cache_key, response, self.cache_timeout, self.cache_stale_timeout)
+        if body_etag:
+            return get_conditional_response(request, etag=response['ETag'], response=response)
+        return response
+
     def list(self, request, *args, **kwargs):
         """Override list to use cache"""
+        return self.cached_list(lambda: super(CacheMixin, self).list(request, *args, **kwargs))
+
+    def cached_list(self, compute):
+        """Serve a list response through the snapshot and the API cache"""
         if not self.cache_timeout:
-            return super().list(request, *args, **kwargs)
-        
-        cache_key = self.get_cache_key()
-        cached_data = cache.get(cache_key)
-        
-        if cached_data is not None:
-            from rest_framework.response import Response
-            return Response(cached_data)
-        
-        response = super().list(request, *args, **kwargs)
-        
-        if response.status_code == 200:
-            cache.set(cache_key, response.data, self.cache_timeout)
-        
-        return response
-    
+            return compute()
+        if not self.snapshot_key or self.request.GET or self.request.accepted_renderer.format != 'json':
+            return self.get_cached_response(self.get_cache_key(), compute)
+
+        def snapshot_or_compute():
+            response = get_snapshot_response(self.snapshot_key, self.request)
+            return compute() if response is None else response
+
+        try:
+            cache_key = self.get_cache_key()
+        except Exception as e:
+            # e.g. Redis is down: one primary key lookup instead of a failed request
+            logger.warning(f"API cache unavailable, serving snapshot {self.snapshot_key}: {e}")
+            return snapshot_or_compute()
+        return self.get_cached_response(cache_key, snapshot_or_compute)
+
     def retrieve(self, request, *args, **kwargs):
         """Override retrieve to use cache"""
         if not self.cache_timeout:
             return super().retrieve(request, *args, **kwargs)
-        
-        cache_key = f"{self.get_cache_key()}:{kwargs.get('pk')}"
-        cached_data = cache.get(cache_key)
-        
-        if cached_data is not None:
-            from rest_framework.response import Response
-            return Response(cached_data)
-        
-        response = super().retrieve(request, *args, **kwargs)
-        
-        if response.status_code == 200:
-            cache.set(cache_key, response.data, self.cache_timeout)
-        
-        return response
-    
-    def invalidate_cache(self, pattern=None):
-        """Invalidate cache for this viewset"""
-        # Note: This is a simple implementation
-        # For Redis, you could use keys() pattern matching
-        # For now, we'll just clear all cache (or implement pattern matching)
-        if pattern:
-            # In production with Redis, implement pattern-based deletion
-            pass
-        else:
-            # Clear cache when data changes
-            cache.clear()
 
+        return self.get_cached_response(
+            f"{self.get_cache_key()}:{kwargs.get('pk')}",
+            lambda: super(CacheMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+    def invalidate_cache(self):
+        """Invalidate cache for this viewset by bumping its model versions"""
+        for model in self.get_cache_models():
+            bump_cache_version(model)
@@ -0,0 +1,162 @@
+"""
+Negotiated response compression (used by core.middleware.CompressionMiddleware)
+
+The bilingual JSON payloads compress to a fraction of their size, so API
+responses are compressed with the best codec the client accepts:
+
+    br    - brotli, if the `brotli` package is installed
+    zstd  - Zstandard, if the `zstandard` package is installed
+    gzip  - always available
+
+At equal q-values the order above wins. Only JSON answers to GET/HEAD
+requests under /api/ are compressed: pages carrying a CSRF token or
+session data (the admin, the browsable API, token endpoints) are never,
+as compressing a secret next to reflected input leaks it (BREACH). Bodies
+under COMPRESSION_MIN_LENGTH bytes and streaming responses (media files,
+byte ranges) are sent as they are.
+
+Responses served from the API cache (core.cache_utils) are compressed once
+per entry: the compressed bytes are stored next to the entry under
+"compressed:<encoding>:<cache key>" (a prefix, since detail entries already
+extend list keys with ":<pk>"), tagged with the entry's expiry stamp so a
+variant is only reused for the exact entry it was made from.
+"""
+import gzip
+import logging
+import time
+
+from django.conf import settings
+
+from .cache_utils import DEFAULT_STALE_TIMEOUT, cache, cache_stats
+
+# Optional codecs
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Key prefix of the compressed variants of API cache entries
+VARIANT_KEY_PREFIX = 'compressed'
+
+# Bodies shorter than this are not worth compressing
+DEFAULT_MIN_LENGTH = 512
+
+# Only the public API is compressed, see the module docstring
+COMPRESSED_PATH_PREFIX = '/api/'
+COMPRESSIBLE_TYPES = ('application/json',)
+
+
+def _gzip(data):
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=5)
+
+
+def _zstd(data):
+    return zstandard.ZstdCompressor(level=6).compress(data)
+
+
+# Content-Encoding -> compress function, in order of preference
+CODECS = {}
+if brotli is not None:
+    CODECS['br'] = _brotli
+if zstandard is not None:
+    CODECS['zstd'] = _zstd
+CODECS['gzip'] = _gzip
+
+
+def parse_accept_encoding(header):
+    """Return {coding: q} of an Accept-Encoding header"""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate_encoding(header, codecs=CODECS):
+    """
+    Pick the codec for an Accept-Encoding header: the highest q-value, then
+    the server's preference. Returns None when nothing acceptable is available.
+    """
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_q = None, 0.0
+    for coding in codecs:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def is_compressible_request(request):
+    """Whether the response to a request may be compressed"""
+    return request.method in ('GET', 'HEAD') and request.path.startswith(COMPRESSED_PATH_PREFIX)
+
+
+def is_compressible(response):
+    """Whether a response is worth compressing at all (client aside)"""
+    if response.status_code != 200 or response.streaming:
+        return False
+    if response.has_header('Content-Encoding'):
+        return False
+    if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+        return False
+    min_length = getattr(settings, 'COMPRESSION_MIN_LENGTH', DEFAULT_MIN_LENGTH)
+    return len(response.content) >= min_length
+
+
+def compress_response_body(response, encoding):
+    """
+    Return the body of a response compressed with `encoding`. For a response
+    served from the API cache the compressed variant is looked up and
+    stored next to its entry.
+    """
+    compress = CODECS[encoding]
+    marker = getattr(response, '_api_cache_entry', None)
+    if marker is None:
+        return compress(response.content)
+
+    cache_key, expires = marker
+    variant_key = f"{VARIANT_KEY_PREFIX}:{encoding}:{cache_key}"
+    try:
+        variant = cache.get(variant_key)
+    except Exception as e:
+        logger.warning(f"API cache unavailable, compressing {cache_key} per request: {e}")
+        return compress(response.content)
+    if variant is not None and variant['expires'] == expires:
+        cache_stats.incr('variant_hits')
+        return variant['content']
+
+    cache_stats.incr('variant_misses')
+    content = compress(response.content)
+    # Lives as long as its entry may still be served
+    timeout = max(expires - time.time(), 0) + DEFAULT_STALE_TIMEOUT
+    try:
+        cache.set(variant_key, {'expires': expires, 'content': content}, timeout)
+    except Exception as e:
+        logger.warning(f"Could not store compressed variant of {cache_key}: {e}")
+    return content
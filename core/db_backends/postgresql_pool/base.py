@@ -0,0 +1,87 @@
+"""
+PostgreSQL backend that takes its connections from a bounded per-process
+pool (see core.db_pool) instead of opening one per thread.
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'core.db_backends.postgresql_pool',
+            ...,
+            'CONN_MAX_AGE': 0,  # hand the connection back after every request
+            'POOL': {
+                'MIN_SIZE': 1,         # opened at worker boot
+                'MAX_SIZE': 4,         # never more server connections per process
+                'TIMEOUT': 10,         # seconds a request waits for a free connection
+                'CHECK_INTERVAL': 30,  # ping connections idle longer than this
+                'MAX_LIFETIME': 1800,  # reopen connections older than this
+            },
+        },
+    }
+
+A checkout that times out raises django.db.OperationalError.
+"""
+from functools import partial
+
+import psycopg2
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from psycopg2 import extensions
+
+from core.db_pool import ConnectionPool, PoolTimeout, get_pool
+
+
+def _check(connection):
+    if connection.closed:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return True
+
+
+def _reset(connection):
+    """Roll back a transaction left open; returns whether anything was reset"""
+    if connection.closed:
+        raise psycopg2.InterfaceError('connection already closed')
+    status = connection.info.transaction_status
+    if status == extensions.TRANSACTION_STATUS_IDLE:
+        return False
+    if status in (extensions.TRANSACTION_STATUS_INTRANS, extensions.TRANSACTION_STATUS_INERROR):
+        connection.rollback()
+        return True
+    # A query still running or the connection lost: not reusable
+    raise psycopg2.InterfaceError(f'connection not reusable (transaction status {status})')
+
+
+def _close(connection):
+    connection.close()
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self._create_pool)
+
+    def _create_pool(self):
+        options = {key.lower(): value for key, value in self.settings_dict.get('POOL', {}).items()}
+        return ConnectionPool(check=_check, reset=_reset, close=_close, **options)
+
+    def get_new_connection(self, conn_params):
+        connect = partial(super().get_new_connection, conn_params)
+        try:
+            connection = self.pool.getconn(connect)
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e)) from e
+        # Set by the parent on a fresh connection only
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = IsolationLevel(options.get('isolation_level', IsolationLevel.READ_COMMITTED))
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            self.pool.putconn(self.connection)
+
+    def prewarm_pool(self):
+        """Open the pool's MIN_SIZE connections; returns how many were opened"""
+        connect = partial(super().get_new_connection, self.get_connection_params())
+        with self.wrap_database_errors:
+            return self.pool.prewarm(connect)
@@ -0,0 +1,274 @@
+"""
+Bounded per-process pool of database connections
+
+Django keeps one persistent connection per thread (CONN_MAX_AGE), so a
+gunicorn worker with many threads holds as many server connections as it
+has threads, idle or not, and each one is opened cold on first use. The
+pooled backend (core.db_backends.postgresql_pool) instead checks a raw
+connection out of a shared pool when a request first touches the database
+and returns it when Django closes the connection at the end of the
+request, so a process never holds more than MAX_SIZE connections.
+
+    checkout - reuse an idle connection (pinged first when it has been idle
+               longer than CHECK_INTERVAL, dropped when older than
+               MAX_LIFETIME), open a new one while below MAX_SIZE, or wait
+               up to TIMEOUT seconds for one to be returned
+    return   - roll back whatever the request left open, then park the
+               connection as idle; broken connections are dropped
+
+Pools are keyed by (alias, pid), so a worker forked from a process that
+already had a pool starts with an empty one instead of sharing sockets.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Defaults of the POOL options
+DEFAULT_MIN_SIZE = 1
+DEFAULT_MAX_SIZE = 4
+DEFAULT_TIMEOUT = 10
+DEFAULT_CHECK_INTERVAL = 30
+DEFAULT_MAX_LIFETIME = 1800
+
+
+class PoolTimeout(Exception):
+    """No connection was returned to a full pool within the timeout"""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of at most max_size connections.
+
+    The pool doesn't know the driver: connections are opened by the
+    callable given to getconn() and checked, reset and closed through the
+    check/reset/close callables (see the pooled backend for psycopg2).
+
+    Counters (see get_stats):
+        checkouts  - connections handed out
+        created    - connections opened
+        resets     - connections rolled back on return
+        discarded  - connections dropped (failed check, too old, broken)
+        timeouts   - checkouts that gave up waiting
+        wait_time  - total seconds spent waiting for a connection
+        max_wait   - longest single wait (seconds)
+    """
+    COUNTERS = ('checkouts', 'created', 'resets', 'discarded', 'timeouts')
+
+    def __init__(self, check, reset, close, min_size=DEFAULT_MIN_SIZE, max_size=DEFAULT_MAX_SIZE,
+                 timeout=DEFAULT_TIMEOUT, check_interval=DEFAULT_CHECK_INTERVAL,
+                 max_lifetime=DEFAULT_MAX_LIFETIME):
+        self.check = check
+        self.reset = reset
+        self.close = close
+        self.max_size = max(1, int(max_size))
+        self.min_size = max(0, min(int(min_size), self.max_size))
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.max_lifetime = max_lifetime
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, opened at, returned at)
+        self._opened = {}     # id(connection) -> opened at, for checked-out connections
+        self._size = 0        # idle + checked out + being opened
+        self._counts = dict.fromkeys(self.COUNTERS, 0)
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+
+    def _count(self, name):
+        # Caller holds the lock
+        self._counts[name] += 1
+
+    def _discard(self, connection):
+        with self._cond:
+            self._size -= 1
+            self._count('discarded')
+            self._cond.notify()
+        try:
+            self.close(connection)
+        except Exception:
+            pass
+
+    def _open(self, connect):
+        try:
+            connection = connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._count('created')
+        return connection, time.monotonic()
+
+    def _take(self):
+        """
+        Return (connection, opened at, needs check) or None when the pool
+        is full, reserving a slot when a new connection has to be opened.
+        Caller holds the lock.
+        """
+        if self._idle:
+            connection, opened, returned = self._idle.pop()
+            needs_check = time.monotonic() - returned > self.check_interval
+            return connection, opened, needs_check
+        if self._size < self.max_size:
+            self._size += 1
+            return None, None, False
+        return None
+
+    def getconn(self, connect):
+        """Check out a connection, opening one with connect() if needed"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            with self._cond:
+                taken = self._take()
+                while taken is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._count('timeouts')
+                        self._record_wait(started)
+                        raise PoolTimeout(
+                            f"No database connection available within {self.timeout}s "
+                            f"(pool size {self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+                    taken = self._take()
+
+            connection, opened, needs_check = taken
+            if opened is None:
+                connection, opened = self._open(connect)
+            elif self.max_lifetime and time.monotonic() - opened > self.max_lifetime:
+                self._discard(connection)
+                continue
+            elif needs_check and not self._check(connection):
+                self._discard(connection)
+                continue
+
+            with self._cond:
+                self._opened[id(connection)] = opened
+                self._count('checkouts')
+                self._record_wait(started)
+            return connection
+
+    def _check(self, connection):
+        try:
+            return self.check(connection)
+        except Exception:
+            return False
+
+    def _record_wait(self, started):
+        # Caller holds the lock
+        waited = time.monotonic() - started
+        self._wait_time += waited
+        self._max_wait = max(self._max_wait, waited)
+
+    def putconn(self, connection, discard=False):
+        """Return a checked-out connection, resetting or dropping it"""
+        with self._cond:
+            opened = self._opened.pop(id(connection), None)
+        if opened is None:
+            # Not ours (e.g. checked out before a fork): just close it
+            self.close(connection)
+            return
+        if not discard:
+            try:
+                if self.reset(connection):
+                    with self._cond:
+                        self._count('resets')
+            except Exception:
+                discard = True
+        if discard:
+            self._discard(connection)
+            return
+        with self._cond:
+            self._idle.append((connection, opened, time.monotonic()))
+            self._cond.notify()
+
+    def prewarm(self, connect, count=None):
+        """Open connections until count (default min_size) are idle; returns how many were opened"""
+        count = self.min_size if count is None else min(count, self.max_size)
+        opened = 0
+        while True:
+            with self._cond:
+                if len(self._idle) >= count or self._size >= self.max_size:
+                    return opened
+                self._size += 1
+            connection, opened_at = self._open(connect)
+            with self._cond:
+                self._idle.append((connection, opened_at, time.monotonic()))
+                self._cond.notify()
+            opened += 1
+
+    def closeall(self):
+        """Close the idle connections (checked-out ones are closed when returned)"""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+        for connection, _, _ in idle:
+            try:
+                self.close(connection)
+            except Exception:
+                pass
+
+    def get_stats(self):
+        """Return the pool counters and current usage"""
+        with self._cond:
+            stats = dict(self._counts)
+            stats.update({
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._opened),
+                'max_size': self.max_size,
+                'wait_time': round(self._wait_time, 6),
+                'max_wait': round(self._max_wait, 6),
+            })
+        return stats
+
+
+# (alias, pid) -> ConnectionPool
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, factory):
+    """Return this process's pool for a database alias, created with factory() on first use"""
+    key = (alias, os.getpid())
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = factory()
+    return pool
+
+
+def get_pool_stats():
+    """Return {alias: stats} for the pools of this process"""
+    pid = os.getpid()
+    return {alias: pool.get_stats() for (alias, owner), pool in list(_pools.items()) if owner == pid}
+
+
+def prewarm_pools():
+    """
+    Open MIN_SIZE connections for every pooled database. Called when a
+    worker boots (see khanqah_backend/wsgi.py) so the first requests don't
+    pay for TLS and authentication; returns {alias: connections opened}.
+    A database that can't be reached is logged and left to the first request.
+    """
+    from django.db import connections
+
+    opened = {}
+    for alias in connections:
+        connection = connections[alias]
+        if not hasattr(connection, 'prewarm_pool'):
+            continue
+        try:
+            opened[alias] = connection.prewarm_pool()
+        except Exception as e:
+            logger.warning(f"Could not prewarm the '{alias}' connection pool: {e}")
+            opened[alias] = 0
+    return opened
@@ -0,0 +1,135 @@
+"""
+Read-only fast path for list serialization
+
+A DRF ModelSerializer builds a model instance per row, then walks its
+fields calling get_attribute() and to_representation() on each. For the
+large public lists that is most of the request time. A FastSerializer
+produces the same output from `.values()` rows instead:
+
+    - the plain fields of the mirrored DRF serializer are compiled once per
+      class into (name, column, converter) entries; converters are the DRF
+      fields' own to_representation, or int/str where those are identical
+    - SerializerMethodFields are answered by get_<name>(row) methods of the
+      FastSerializer, which read the row dict
+
+Usage:
+    class EventFastSerializer(FastSerializer):
+        serializer_class = EventSerializer
+        value_fields = ('title_en', 'title_ur')  # columns the get_ methods read
+
+        def get_title(self, row):
+            return {'english': row['title_en'], 'urdu': row['title_ur']}
+
+    EventFastSerializer(queryset, context={'request': request}).data
+
+Views opt in with FastListMixin. Responses are byte-identical to the DRF
+serializer's (see the golden tests of each app); detail views, writes and
+validation keep using the DRF serializer.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
+from rest_framework import fields as drf_fields
+from rest_framework.response import Response
+
+# DRF fields whose to_representation is the same as a builtin
+_BUILTIN_CONVERTERS = {
+    drf_fields.IntegerField: int,
+    drf_fields.CharField: str,
+}
+
+
+class FastSerializer:
+    """
+    Serialize `.values()` rows like serializer_class would serialize model
+    instances. Read-only and always many=True.
+    """
+    serializer_class = None
+    # Extra columns read by the get_<name>() methods
+    value_fields = ()
+
+    def __init__(self, instance, context=None):
+        self.instance = instance
+        self.context = context or {}
+
+    @classmethod
+    def get_plan(cls):
+        """Return [(name, column or None, converter)], compiled once per class"""
+        plan = cls.__dict__.get('_plan')
+        if plan is None:
+            plan = cls._plan = cls._compile()
+        return plan
+
+    @classmethod
+    def _compile(cls):
+        if cls.serializer_class is None:
+            raise ImproperlyConfigured(f"{cls.__name__} needs a serializer_class")
+        plan = []
+        for name, field in cls.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, drf_fields.SerializerMethodField):
+                method_name = field.method_name or f'get_{name}'
+                if not hasattr(cls, method_name):
+                    raise ImproperlyConfigured(f"{cls.__name__} is missing {method_name}(row)")
+                plan.append((name, None, method_name))
+                continue
+            if field.source == '*' or '.' in field.source:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} can't read {name!r} (source {field.source!r}) from a row"
+                )
+            converter = _BUILTIN_CONVERTERS.get(type(field), field.to_representation)
+            plan.append((name, field.source, converter))
+        return plan
+
+    @classmethod
+    def get_value_fields(cls):
+        """Columns to fetch with .values()"""
+        columns = [column for _, column, _ in cls.get_plan() if column is not None]
+        columns += [column for column in cls.value_fields if column not in columns]
+        return columns
+
+    def get_rows(self):
+        if isinstance(self.instance, QuerySet):
+            return self.instance.values(*self.get_value_fields())
+        return self.instance
+
+    @property
+    def data(self):
+        plan = [
+            (name, column, getattr(self, converter) if column is None else converter)
+            for name, column, converter in self.get_plan()
+        ]
+        data = []
+        for row in self.get_rows():
+            item = {}
+            for name, column, convert in plan:
+                if column is None:
+                    item[name] = convert(row)
+                else:
+                    value = row[column]
+                    item[name] = None if value is None else convert(value)
+            data.append(item)
+        return data
+
+
+class FastListMixin:
+    """
+    Serve list() through fast_serializer_class. Put it after CacheMixin and
+    the filter mixins, right before the generic view:
+
+        class EventViewSet(CacheMixin, FastListMixin, viewsets.ReadOnlyModelViewSet):
+            fast_serializer_class = EventFastSerializer
+    """
+    fast_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.values(*self.fast_serializer_class.get_value_fields())
+        context = self.get_serializer_context()
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.fast_serializer_class(page, context=context).data)
+        return Response(self.fast_serializer_class(queryset, context=context).data)
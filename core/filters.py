@@ -0,0 +1,137 @@
+"""
+Server-side filters and facet counts for the archive list endpoints
+"""
+import datetime
+import hashlib
+
+from django.db.models import Count
+from django.db.models.functions import ExtractYear
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+from .cache_utils import DEFAULT_STALE_TIMEOUT, cache, get_version_token
+
+
+class ArchiveFilterMixin:
+    """
+    Filters for list views:
+        ?category=Bayaan
+        ?year=2024
+        ?date_from=2024-01-01&date_to=2024-06-30
+
+    With ?facets=true the response also carries counts per category and per
+    year for the current filters:
+        "facets": {"category": [{"value": "Bayaan", "count": 12}, ...],
+                   "year": [{"value": 2024, "count": 7}, ...]}
+    Each facet ignores its own filter (so the other categories still show
+    their counts while one is selected). Both come from a single
+    GROUP BY (category, year) query, cached per filter combination and
+    shared by every page of the same listing. Paginated responses get a
+    "facets" key; plain lists are wrapped as {"results": [...], "facets": {...}}.
+
+    `filter_date_field` is None for models without a date; they get the
+    category filter and facet only.
+    """
+    filter_category_field = 'category'
+    filter_date_field = 'date'
+    facets_param = 'facets'
+
+    def get_filter_params(self):
+        """Validated filter values from the query string"""
+        if getattr(self, '_filter_params', None) is not None:
+            return self._filter_params
+        query_params = self.request.query_params
+        params = {}
+        if query_params.get('category'):
+            params['category'] = query_params['category']
+        if self.filter_date_field:
+            if query_params.get('year'):
+                try:
+                    params['year'] = int(query_params['year'])
+                except ValueError:
+                    raise ValidationError({'year': ['Must be a year, e.g. 2024']})
+                if not datetime.MINYEAR <= params['year'] <= datetime.MAXYEAR:
+                    raise ValidationError({'year': [f'Must be between {datetime.MINYEAR} and {datetime.MAXYEAR}']})
+            for name in ('date_from', 'date_to'):
+                if query_params.get(name):
+                    try:
+                        value = parse_date(query_params[name])
+                    except ValueError:
+                        value = None
+                    if value is None:
+                        raise ValidationError({name: ['Must be a date in YYYY-MM-DD format']})
+                    params[name] = value
+        self._filter_params = params
+        return params
+
+    def filter_archive(self, queryset, params, dimensions=('category', 'year')):
+        """Apply the date range and the filters of the given dimensions"""
+        date_field = self.filter_date_field
+        if 'category' in params and 'category' in dimensions:
+            queryset = queryset.filter(**{self.filter_category_field: params['category']})
+        if 'year' in params and 'year' in dimensions:
+            # A range rather than __year, so the date index can be used
+            queryset = queryset.filter(**{
+                f'{date_field}__gte': datetime.date(params['year'], 1, 1),
+                f'{date_field}__lte': datetime.date(params['year'], 12, 31),
+            })
+        if 'date_from' in params:
+            queryset = queryset.filter(**{f'{date_field}__gte': params['date_from']})
+        if 'date_to' in params:
+            queryset = queryset.filter(**{f'{date_field}__lte': params['date_to']})
+        return queryset
+
+    def get_queryset(self):
+        return self.filter_archive(super().get_queryset(), self.get_filter_params())
+
+    def wants_facets(self):
+        return self.request.query_params.get(self.facets_param, '').lower() in ('1', 'true', 'yes')
+
+    def get_facets(self):
+        """Facet counts for the current filters, cached per filter combination"""
+        params = self.get_filter_params()
+        model = super().get_queryset().model
+        params_key = hashlib.md5(repr(sorted(params.items())).encode()).hexdigest()
+        cache_key = f"facets:{model._meta.label_lower}:{params_key}:{get_version_token([model])}"
+        facets = cache.get(cache_key)
+        if facets is None:
+            facets = self.compute_facets(params)
+            timeout = getattr(self, 'cache_timeout', 300) + getattr(self, 'cache_stale_timeout', DEFAULT_STALE_TIMEOUT)
+            cache.set(cache_key, facets, timeout)
+        return facets
+
+    def compute_facets(self, params):
+        """
+        One GROUP BY (category, year) over the rows in the date range; each
+        facet is then summed over the rows matching the other facet's filter.
+        """
+        category_field = self.filter_category_field
+        queryset = self.filter_archive(super().get_queryset(), params, dimensions=()).order_by()
+        if self.filter_date_field:
+            queryset = queryset.annotate(year=ExtractYear(self.filter_date_field))
+            rows = queryset.values(category_field, 'year').annotate(count=Count('pk'))
+        else:
+            rows = queryset.values(category_field).annotate(count=Count('pk'))
+
+        categories = {}
+        years = {}
+        for row in rows:
+            category, year = row[category_field], row.get('year')
+            if params.get('year') in (None, year):
+                categories[category] = categories.get(category, 0) + row['count']
+            if year is not None and params.get('category') in (None, category):
+                years[year] = years.get(year, 0) + row['count']
+
+        facets = {'category': [{'value': k, 'count': v} for k, v in sorted(categories.items())]}
+        if self.filter_date_field:
+            facets['year'] = [{'value': k, 'count': v} for k, v in sorted(years.items(), reverse=True)]
+        return facets
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if self.wants_facets() and response.status_code == 200:
+            if isinstance(response.data, dict):
+                response.data['facets'] = self.get_facets()
+            else:
+                response.data = {'results': response.data, 'facets': self.get_facets()}
+        return response
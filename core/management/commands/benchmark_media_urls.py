@@ -0,0 +1,95 @@
+"""
+Measure the per-row cost of media URLs on a large gallery (core.media_urls).
+
+    python manage.py benchmark_media_urls
+    python manage.py benchmark_media_urls --rows 5000 --repeat 5
+
+A gallery collection with --rows images is inserted inside a transaction
+that is rolled back at the end. Reported per row, best of --repeat runs:
+
+    build_absolute_uri  - request.build_absolute_uri(image.url), the old way
+    builder (cold)      - MediaURLBuilder with an empty memo
+    builder (warm)      - MediaURLBuilder once every name is memoized
+    serializer          - GalleryImageSerializer for the whole page
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from core.media_urls import MediaURLBuilder, get_storage_url
+from core.routes import get_default_host
+from gallery.models import GalleryCollection, GalleryImage
+from gallery.serializers import GalleryImageSerializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measure per-row media URL cost on a large gallery'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000,
+                            help='Images in the gallery (default: 5000)')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Runs per measurement, the best one is reported (default: 3)')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._benchmark(options['rows'], options['repeat'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _benchmark(self, rows, repeat):
+        collection = GalleryCollection.objects.create(name_en='Benchmark', name_ur='بینچ مارک')
+        GalleryImage.objects.bulk_create(
+            [GalleryImage(collection=collection, image=f'gallery/images/{i}.jpg') for i in range(rows)],
+            batch_size=1000,
+        )
+        images = list(collection.images.order_by('id'))
+        host = get_default_host()
+
+        def new_request():
+            return RequestFactory().get('/api/gallery/', HTTP_HOST=host, secure=True)
+
+        def uncached():
+            request = new_request()
+            return [request.build_absolute_uri(image.image.url) for image in images]
+
+        def builder_cold():
+            get_storage_url.cache_clear()
+            builder = MediaURLBuilder(new_request())
+            return [builder.file_url(image.image) for image in images]
+
+        def builder_warm():
+            builder = MediaURLBuilder(new_request())
+            return [builder.file_url(image.image) for image in images]
+
+        def serializer():
+            return GalleryImageSerializer(images, many=True, context={'request': new_request()}).data
+
+        if uncached() != builder_cold():
+            self.stdout.write(self.style.ERROR('MediaURLBuilder output differs from build_absolute_uri'))
+            return
+        self.stdout.write(f'{len(images)} images, per row:')
+        for label, func in [
+            ('build_absolute_uri', uncached),
+            ('builder (cold)', builder_cold),
+            ('builder (warm)', builder_warm),
+            ('serializer', serializer),
+        ]:
+            self.stdout.write(f'  {label:<20} {self._best(func, repeat) / len(images) * 1e6:8.2f} µs')
+
+    def _best(self, func, repeat):
+        best = None
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,124 @@
+"""
+Compare the DRF serializers with their .values() fast path (core.fast_serializers).
+
+    python manage.py benchmark_serializers
+    python manage.py benchmark_serializers --rows 10000 --repeat 5 --only events
+
+Rows are bulk-inserted inside a transaction that is rolled back at the end,
+so the command leaves the database as it found it. Each timing covers the
+query and the serialization of every row, best of --repeat runs.
+"""
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from core.routes import get_default_host
+from events.models import Event
+from events.serializers import EventFastSerializer, EventSerializer
+from publications.models import Publication
+from publications.serializers import PublicationFastSerializer, PublicationSerializer
+from video_audios.models import Audio
+from video_audios.serializers import AudioFastSerializer, AudioSerializer
+
+
+def _events(count):
+    types = ['daily', 'weekly', 'monthly', 'yearly', 'one_time']
+    return [
+        Event(
+            title_en=f'Event {i}', title_ur=f'محفل {i}', description_en='Weekly gathering of dhikr',
+            description_ur='ذکر کی ہفتہ وار محفل', recurring_type=types[i % 5], day_of_week=i % 7,
+            week_of_month=i % 4 + 1, event_date=date(2026, 1, 1) + timedelta(days=i % 365), order=i,
+        )
+        for i in range(count)
+    ]
+
+
+def _audios(count):
+    return [
+        Audio(
+            english_title=f'Bayaan {i}', urdu_title=f'بیان {i}', audio_file=f'audios/{i}.mp3',
+            category='Bayaan', date=date(2020, 1, 1) + timedelta(days=i % 2000),
+        )
+        for i in range(count)
+    ]
+
+
+def _publications(count):
+    return [
+        Publication(
+            title_en=f'Publication {i}', title_ur=f'کتاب {i}', file=f'publications/{i}.pdf',
+            description_en='Collected letters', description_ur='مکتوبات', category='book',
+        )
+        for i in range(count)
+    ]
+
+
+# name -> (model, row factory, DRF serializer, fast serializer)
+BENCHMARKS = {
+    'events': (Event, _events, EventSerializer, EventFastSerializer),
+    'audios': (Audio, _audios, AudioSerializer, AudioFastSerializer),
+    'publications': (Publication, _publications, PublicationSerializer, PublicationFastSerializer),
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measure rows/second of the DRF serializers and their .values() fast path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000,
+                            help='Rows inserted per model (default: 10000)')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Runs per serializer, the best one is reported (default: 3)')
+        parser.add_argument('--only', choices=sorted(BENCHMARKS), action='append',
+                            help='Benchmark only this model, may be given several times')
+
+    def handle(self, *args, **options):
+        context = {'request': RequestFactory().get('/', HTTP_HOST=get_default_host())}
+        names = options['only'] or list(BENCHMARKS)
+        try:
+            with transaction.atomic():
+                for name in names:
+                    self._benchmark(name, options['rows'], options['repeat'], context)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _benchmark(self, name, rows, repeat, context):
+        model, factory, serializer_class, fast_class = BENCHMARKS[name]
+        model.objects.bulk_create(factory(rows), batch_size=1000)
+        queryset = model.objects.order_by('pk')
+        count = queryset.count()
+
+        def drf():
+            return serializer_class(queryset.all(), many=True, context=context).data
+
+        def fast():
+            return fast_class(queryset.all(), context=context).data
+
+        if drf() != fast():
+            self.stdout.write(self.style.ERROR(f'{name}: fast output differs from {serializer_class.__name__}'))
+            return
+        before = self._best(drf, repeat)
+        after = self._best(fast, repeat)
+        self.stdout.write(
+            f'{name:<13} {count:>7} rows   '
+            f'{serializer_class.__name__}: {count / before:>9,.0f} rows/s   '
+            f'{fast_class.__name__}: {count / after:>9,.0f} rows/s   '
+            f'x{before / after:.1f}'
+        )
+
+    def _best(self, func, repeat):
+        best = None
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,43 @@
+"""
+Rebuild the published JSON snapshots of the low-churn endpoints.
+
+    python manage.py refresh_snapshots
+    python manage.py refresh_snapshots --key events.events
+    python manage.py refresh_snapshots --base-url https://api.example.com
+
+Snapshots are rebuilt automatically when their data changes (see
+core/signals.py); run this after a deploy so serializer changes show up,
+and whenever SNAPSHOT_BASE_URL changes.
+"""
+from django.core.management.base import BaseCommand
+
+from core.routes import get_default_base_url, refresh_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Re-render the snapshot endpoints and store their JSON bodies'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--key', action='append', default=None,
+                            help='Snapshot key to refresh, may be given several times (default: all)')
+        parser.add_argument('--base-url', default=None,
+                            help='Scheme and host the snapshots are rendered for (default: SNAPSHOT_BASE_URL)')
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'] or get_default_base_url()
+        results = refresh_snapshots(options['key'], base_url)
+
+        failed = 0
+        for key, status in sorted(results.items()):
+            line = f"{status:>9}  {key}"
+            if status in ('updated', 'unchanged'):
+                self.stdout.write(line)
+            else:
+                failed += 1
+                self.stdout.write(self.style.WARNING(line))
+
+        summary = f"Refreshed {len(results) - failed}/{len(results)} snapshots for {base_url}"
+        if failed:
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,102 @@
+"""
+Precompute every public API endpoint after a deploy.
+
+    python manage.py warm_cache
+    python manage.py warm_cache --concurrency 8 --max-detail 50
+    python manage.py warm_cache --url "/api/video-audios/audios/?category=Bayaan"
+
+Endpoints are found by walking the URL conf (see core.routes): every list
+endpoint served by a CacheMixin view plus each detail page. Extra variants
+such as paginated or filtered URLs are listed in settings.CACHE_WARM_URLS.
+Each URL is rendered in-process through its view (no HTTP, no middleware,
+no throttling), which fills the API cache. That only helps the web workers
+when the cache is shared (REDIS_URL); without it the command fills its own
+in-process cache, which is gone when it exits. Deployed instances run it
+from gunicorn.conf.py once the server is listening.
+"""
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import RequestFactory
+
+from core.routes import get_default_host, get_public_urls, render_url
+
+
+class Command(BaseCommand):
+    help = 'Render every public API endpoint once to fill the cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help='Number of endpoints rendered at the same time (default: 4)')
+        parser.add_argument('--max-detail', type=int, default=None,
+                            help='Maximum number of detail pages per endpoint (default: all)')
+        parser.add_argument('--host', default=None,
+                            help='Host used for absolute URLs (default: first ALLOWED_HOSTS entry)')
+        parser.add_argument('--scheme', choices=['http', 'https'], default=None,
+                            help='Scheme used for absolute URLs (default: https unless DEBUG)')
+        parser.add_argument('--url', action='append', default=[],
+                            help='Extra URL to warm, may be given several times')
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'REDIS_URL', None):
+            self.stdout.write(self.style.WARNING(
+                'REDIS_URL is not set: the API cache is local to this process and is '
+                'discarded when the command exits'
+            ))
+        host = options['host'] or get_default_host()
+        secure = (options['scheme'] or ('http' if settings.DEBUG else 'https')) == 'https'
+        urls = get_public_urls(options['max_detail'])
+        urls += list(getattr(settings, 'CACHE_WARM_URLS', [])) + options['url']
+
+        pending = queue.Queue()
+        for url in urls:
+            pending.put(url)
+        results = []
+        results_lock = threading.Lock()
+
+        def worker(own_thread=True):
+            factory = RequestFactory()
+            try:
+                while True:
+                    try:
+                        url = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    status, elapsed, content = render_url(url, host, secure, factory)
+                    result = (url, status, elapsed, len(content))
+                    with results_lock:
+                        results.append(result)
+            finally:
+                if own_thread:
+                    # Each thread has its own database connections
+                    connections.close_all()
+
+        started = time.monotonic()
+        if options['concurrency'] <= 1:
+            worker(own_thread=False)
+        else:
+            threads = [threading.Thread(target=worker) for _ in range(options['concurrency'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        total = time.monotonic() - started
+
+        failed = 0
+        for url, status, elapsed, size in sorted(results):
+            line = f"{status}  {elapsed * 1000:8.1f} ms  {size:9d} B  {url}"
+            if status == 200:
+                self.stdout.write(line)
+            else:
+                failed += 1
+                self.stdout.write(self.style.WARNING(line))
+
+        summary = f"Warmed {len(results) - failed}/{len(results)} endpoints in {total:.2f}s"
+        if failed:
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
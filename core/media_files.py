@@ -0,0 +1,259 @@
+"""
+HTTP helpers for serve_media_file: validators (RFC 7232) and byte ranges
+(RFC 7233).
+
+Validators come from one os.stat of the file: the ETag is its modification
+time and size (like nginx's), Last-Modified its modification time. Repeat
+views of an image or PDF revalidate with If-None-Match / If-Modified-Since
+and get a 304 without the file being opened.
+
+Audio players ask for ranges when the listener seeks, and PDF.js fetches
+large PDFs in chunks. A range is streamed from its offset (seek, then read
+only the requested bytes), several ranges are sent as one
+multipart/byteranges body.
+
+Delivery (settings.MEDIA_OFFLOAD): the checks always run in Python, then
+    - 'x-accel-redirect' / 'x-sendfile': an empty response tells the front
+      proxy (nginx / Apache mod_xsendfile) to send the file itself, ranges
+      and all, so a slow client doesn't hold a gunicorn worker
+    - '' (default): the whole file or a single range is a FileResponse,
+      which the WSGI server's wsgi.file_wrapper sends with os.sendfile
+      (gunicorn does, from the file's offset for Content-Length bytes)
+"""
+import io
+import re
+import uuid
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+
+# Bytes read from disk per chunk
+CHUNK_SIZE = 64 * 1024
+
+# More ranges than this is not a media player; the whole file is sent instead
+MAX_RANGES = 16
+
+# MEDIA_OFFLOAD mode -> response header read by the proxy
+OFFLOAD_HEADERS = {
+    'x-accel-redirect': 'X-Accel-Redirect',
+    'x-sendfile': 'X-Sendfile',
+}
+
+_RANGE_SPEC = re.compile(r'^(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    """None of the requested ranges overlaps the file"""
+
+
+def parse_range_header(header, size):
+    """
+    Return the [(start, end)] byte ranges (inclusive, sorted, overlapping
+    ones merged) of a Range header, or None when the header is absent,
+    malformed or not worth honouring, in which case the whole file is sent.
+    Raises RangeNotSatisfiable when every range lies past the end of the file.
+    """
+    if not header or size == 0:
+        return None
+    unit, _, specs = header.partition('=')
+    if unit.strip().lower() != 'bytes':
+        return None
+    specs = [spec.strip() for spec in specs.split(',') if spec.strip()]
+    if not specs or len(specs) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for spec in specs:
+        match = _RANGE_SPEC.match(spec)
+        if not match or match.groups() == ('', ''):
+            return None
+        first, last = match.groups()
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length == 0:
+                continue
+            ranges.append((max(0, size - length), size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start >= size:
+            continue
+        end = int(last) if last else size - 1
+        ranges.append((start, min(end, size - 1)))
+
+    if not ranges:
+        raise RangeNotSatisfiable
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def file_etag(file_stat):
+    """Strong ETag of a file, from its modification time and size"""
+    return f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+
+
+def set_validators(response, file_stat):
+    """Add the ETag and Last-Modified of a file to a response"""
+    response['ETag'] = file_etag(file_stat)
+    response['Last-Modified'] = http_date(file_stat.st_mtime)
+    return response
+
+
+def if_range_matches(request, file_stat):
+    """
+    Whether the If-Range precondition allows a partial response: true
+    without the header, or when it carries the file's current ETag or exact
+    Last-Modified. Weak entity tags never match (RFC 7233 3.2).
+    """
+    header = request.META.get('HTTP_IF_RANGE')
+    if not header:
+        return True
+    header = header.strip()
+    if header.startswith('W/'):
+        return False
+    if header.startswith('"'):
+        return header == file_etag(file_stat)
+    since = parse_http_date_safe(header)
+    return since is not None and since == int(file_stat.st_mtime)
+
+
+def read_range(file_handle, start, length, chunk_size=CHUNK_SIZE):
+    """Yield `length` bytes of an open file from offset `start`"""
+    file_handle.seek(start)
+    remaining = length
+    while remaining > 0:
+        chunk = file_handle.read(min(chunk_size, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+
+
+class FileSlice:
+    """
+    Read-only window of an open file, positioned at its start. A
+    FileResponse of it gets Content-Length = length, and gunicorn's
+    wsgi.file_wrapper sends exactly that window with os.sendfile; other
+    servers read it through read().
+    """
+
+    def __init__(self, file_handle, start, length):
+        self.file_handle = file_handle
+        self.start = start
+        self.length = length
+        file_handle.seek(start)
+
+    def fileno(self):
+        return self.file_handle.fileno()
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.file_handle.tell() - self.start
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.tell()
+        elif whence == io.SEEK_END:
+            offset += self.length
+        self.file_handle.seek(self.start + offset)
+        return offset
+
+    def read(self, size=-1):
+        remaining = self.length - self.tell()
+        if remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        return self.file_handle.read(size)
+
+    def close(self):
+        self.file_handle.close()
+
+
+class RangeFileWrapper:
+    """Iterable over byte ranges of an open file; closes it when the response is closed"""
+
+    def __init__(self, file_handle, parts):
+        # parts: byte strings and (start, length) ranges, in order
+        self.file_handle = file_handle
+        self.parts = parts
+
+    def __iter__(self):
+        for part in self.parts:
+            if isinstance(part, bytes):
+                yield part
+            else:
+                yield from read_range(self.file_handle, *part)
+
+    def close(self):
+        self.file_handle.close()
+
+
+def range_not_satisfiable(size):
+    response = HttpResponse(status=416)
+    response['Content-Range'] = f'bytes */{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def partial_response(file_handle, ranges, size, content_type):
+    """206 response streaming the given ranges of an open file"""
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        response = FileResponse(
+            FileSlice(file_handle, start, end - start + 1),
+            status=206, content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        return response
+
+    boundary = uuid.uuid4().hex
+    parts = []
+    length = 0
+    for start, end in ranges:
+        head = (
+            f'\r\n--{boundary}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Range: bytes {start}-{end}/{size}\r\n\r\n'
+        ).encode()
+        parts += [head, (start, end - start + 1)]
+        length += len(head) + end - start + 1
+    tail = f'\r\n--{boundary}--\r\n'.encode()
+    parts.append(tail)
+    length += len(tail)
+
+    response = StreamingHttpResponse(
+        RangeFileWrapper(file_handle, parts),
+        status=206, content_type=f'multipart/byteranges; boundary={boundary}',
+    )
+    response['Content-Length'] = str(length)
+    return response
+
+
+def offload_response(file_path, full_path, content_type):
+    """
+    Empty response handing the transfer of a checked file to the front
+    proxy (settings.MEDIA_OFFLOAD). X-Accel-Redirect names the file under
+    nginx's internal MEDIA_OFFLOAD_PREFIX location, X-Sendfile its path.
+    """
+    header = OFFLOAD_HEADERS[settings.MEDIA_OFFLOAD]
+    response = HttpResponse(content_type=content_type)
+    if header == 'X-Accel-Redirect':
+        response[header] = settings.MEDIA_OFFLOAD_PREFIX.rstrip('/') + '/' + quote(file_path)
+    else:
+        # WSGI headers are latin-1 text: pass the UTF-8 path bytes through as is
+        response[header] = full_path.encode('utf-8').decode('latin-1')
+    return response
@@ -0,0 +1,105 @@
+"""
+Absolute media URLs for serializers
+
+Serializers used to call request.build_absolute_uri(field_file.url) for
+every row. field_file.url asks the storage to build the URL, which with
+MediaCloudinaryStorage means building (and signing) a Cloudinary URL per
+image, and build_absolute_uri parses and re-encodes it each time.
+
+    - storage URLs are memoized per (storage, file name) in a bounded LRU,
+      already URI-encoded; stored files don't move, so an entry only has to
+      go when the media settings change (tests, see below)
+    - the scheme://host prefix is computed once per request and prepended
+      to relative URLs
+
+The result is exactly what request.build_absolute_uri(storage.url(name))
+returns (anything but a plain /path falls back to it). Without a request
+the storage URL is returned as is, like DRF's FileField.
+
+Usage:
+    builder = get_media_url_builder(self.context.get('request'))
+    builder.file_url(obj.image)                     # FieldFile
+    builder.url(row['image'], field_storage)        # .values() row
+"""
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from django.core.files.storage import default_storage
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.encoding import iri_to_uri
+from rest_framework import serializers
+
+# Storage URLs kept per process (a URL is ~100 bytes, so well under 2 MB)
+MEDIA_URL_CACHE_SIZE = 10000
+
+# Settings that change what storage.url() returns
+MEDIA_SETTINGS = {'MEDIA_URL', 'MEDIA_ROOT', 'STORAGES', 'DEFAULT_FILE_STORAGE'}
+
+
+@lru_cache(maxsize=MEDIA_URL_CACHE_SIZE)
+def get_storage_url(storage, name):
+    """
+    Return (is_path, url) for a stored file. is_path is True for a plain
+    '/path' URL that only needs the request's scheme and host in front;
+    url is then already URI-encoded.
+    """
+    url = storage.url(name)
+    bits = urlsplit(url)
+    if bits.scheme and bits.netloc:
+        return False, iri_to_uri(url)
+    if url.startswith('/') and not url.startswith('//') and '/./' not in bits.path and '/../' not in bits.path:
+        return True, iri_to_uri(url)
+    return False, url
+
+
+@receiver(setting_changed)
+def clear_storage_urls(setting, **kwargs):
+    if setting in MEDIA_SETTINGS:
+        get_storage_url.cache_clear()
+
+
+class MediaURLBuilder:
+    """Absolute media URLs for one request"""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.base = None
+        if request is not None:
+            self.base = iri_to_uri(f"{request.scheme}://{request.get_host()}")
+
+    def url(self, name, storage=default_storage):
+        """URL of a stored file name, None for an empty name"""
+        if not name:
+            return None
+        is_path, url = get_storage_url(storage, name)
+        if self.request is None:
+            return url
+        if is_path:
+            return self.base + url
+        return self.request.build_absolute_uri(url)
+
+    def file_url(self, field_file):
+        """URL of a FieldFile (e.g. obj.image), None when it is empty"""
+        if not field_file:
+            return None
+        return self.url(field_file.name, field_file.storage)
+
+
+def get_media_url_builder(request):
+    """Return the MediaURLBuilder of a request, created on first use"""
+    if request is None:
+        return MediaURLBuilder()
+    builder = getattr(request, '_media_url_builder', None)
+    if builder is None:
+        builder = request._media_url_builder = MediaURLBuilder(request)
+    return builder
+
+
+class MediaImageField(serializers.ImageField):
+    """ImageField whose URLs come from the request's MediaURLBuilder"""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return get_media_url_builder(self.context.get('request')).file_url(value)
@@ -1,8 +1,22 @@
 """
 Custom middleware for caching and performance
 """
+import logging
+import time
+from contextlib import ExitStack
+
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from khanqah_backend.db_router import has_written, replica_enabled, set_read_replica
+
+from .cache_backends import is_shared_cache
+from .compression import compress_response_body, is_compressible, is_compressible_request, negotiate_encoding
+
+logger = logging.getLogger(__name__)
 
 
 class CacheControlHeadersMiddleware(MiddlewareMixin):
@@ -79,8 +93,181 @@ class CacheControlHeadersMiddleware(MiddlewareMixin):
             else:  # Less than 1 hour - private cache
                 response['Cache-Control'] = f'private, max-age={cache_time}, must-revalidate'
             
-            # ETag will be handled by Django automatically if enabled
+            # ETag / Last-Modified validators are set by core.cache_utils.CacheMixin,
+            # which also answers conditional requests with 304 Not Modified
         elif cache_time == 0:
             response['Cache-Control'] = 'no-cache, must-revalidate'
         
         return response
+
+
+class QueryCounter:
+    """
+    Database execute wrapper that counts queries and their total time.
+    Install with connection.execute_wrapper(counter).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class QueryCountMiddleware:
+    """
+    Count the SQL queries of every request and check them against the
+    view's declared `query_budget`.
+
+    Requests over budget are logged as a warning. With QUERY_COUNT_HEADERS
+    enabled, or for staff users, the numbers are also sent back as headers:
+        X-DB-Queries: 3
+        X-DB-Query-Budget: 4
+        Server-Timing: db;dur=1.8;desc="3 queries"
+
+    Usage:
+        class MyViewSet(CacheMixin, viewsets.ReadOnlyModelViewSet):
+            query_budget = 2  # most queries a cold (uncached) request may run
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        request._query_budget = None
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            response = self.get_response(request)
+
+        budget = request._query_budget
+        if budget is not None and counter.count > budget:
+            logger.warning(
+                "%s %s ran %d queries, over its budget of %d",
+                request.method, request.path, counter.count, budget,
+            )
+        if self._show_headers(request):
+            response['X-DB-Queries'] = str(counter.count)
+            if budget is not None:
+                response['X-DB-Query-Budget'] = str(budget)
+            response['Server-Timing'] = (
+                f'db;dur={counter.duration * 1000:.1f};desc="{counter.count} queries"'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        request._query_budget = getattr(view_class, 'query_budget', None)
+
+    def _show_headers(self, request):
+        if getattr(settings, 'QUERY_COUNT_HEADERS', False):
+            return True
+        # DRF copies the authenticated (e.g. JWT) user onto the Django request
+        user = getattr(request, 'user', None)
+        return bool(user is not None and user.is_staff)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Mark which requests may read from the replica (see khanqah_backend/db_router.py).
+
+    GET/HEAD/OPTIONS requests outside the admin read the public apps from
+    the replica, unless the client or anyone else wrote in the last
+    REPLICA_PIN_SECONDS. A request that writes sets a short-lived cookie
+    that keeps its client on the primary, and records the same window in
+    the default cache for everyone else.
+
+    That global pin needs a default cache shared by all workers (REDIS_URL).
+    With the per-process fallback cache only the writing client is pinned,
+    so other clients may read data older than the write for as long as the
+    replica lags. If the cache fails, requests read from the primary.
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+    PIN_COOKIE = 'primary_pin'
+    PIN_CACHE_KEY = 'replica:pinned-until'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_enabled():
+            return self.get_response(request)
+
+        set_read_replica(self._can_use_replica(request))
+        try:
+            response = self.get_response(request)
+            wrote = has_written()
+        finally:
+            set_read_replica(False)
+
+        if wrote:
+            pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 15)
+            response.set_cookie(self.PIN_COOKIE, '1', max_age=pin_seconds, httponly=True, samesite='Lax')
+            pin_cache = self._pin_cache()
+            if pin_cache is not None:
+                try:
+                    pin_cache.set(self.PIN_CACHE_KEY, time.time() + pin_seconds, pin_seconds)
+                except Exception as e:
+                    logger.warning(f"Could not pin reads to the primary after a write: {e}")
+        return response
+
+    def _pin_cache(self):
+        """The cache holding the global pin, None when workers don't share it"""
+        pin_cache = caches['default']
+        return pin_cache if is_shared_cache(pin_cache) else None
+
+    def _can_use_replica(self, request):
+        if request.method not in self.SAFE_METHODS or request.path.startswith('/admin/'):
+            return False
+        if self.PIN_COOKIE in request.COOKIES:
+            return False
+        pin_cache = self._pin_cache()
+        if pin_cache is None:
+            return True
+        try:
+            return pin_cache.get(self.PIN_CACHE_KEY, 0) <= time.time()
+        except Exception as e:
+            logger.warning(f"Replica pin unavailable, reading from the primary: {e}")
+            return False
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with the best codec the client accepts (br, zstd or
+    gzip, see core/compression.py). Bodies served from the API cache are
+    compressed once per cache entry instead of on every hit.
+
+    Only JSON answers to GET/HEAD under /api/ are compressed, never pages
+    with CSRF tokens or session data (BREACH). Responses that could be
+    compressed get `Vary: Accept-Encoding` whatever the client sent; tiny
+    bodies, media and byte ranges are left alone.
+    Strong ETags are made weak, as the compressed bytes differ from the
+    uncompressed ones (like django.middleware.gzip.GZipMiddleware).
+    """
+
+    def process_response(self, request, response):
+        if not is_compressible_request(request) or not is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        content = compress_response_body(response, encoding)
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,118 @@
+"""
+Helpers for migrations that only apply to PostgreSQL.
+
+Production runs on PostgreSQL; local development and the test suite may use
+SQLite. Operations wrapped in PostgresOnly always update the migration state
+(so the models and migrations stay in sync) but only touch the database on
+PostgreSQL.
+
+    operations = [
+        PostgresOnly(migrations.AddIndex(model_name='event', index=GinIndex(...))),
+        PostgresOnly(search_vector_trigger('events_event', [
+            ('title_en', 'english', 'A'),
+            ('title_ur', 'simple', 'A'),
+        ])),
+    ]
+"""
+from django.db import migrations
+from django.db.migrations.operations.base import Operation
+
+from .text import normalize_text
+
+
+class PostgresOnly(Operation):
+    """Run the wrapped operation's database changes on PostgreSQL only"""
+
+    def __init__(self, operation):
+        self.operation = operation
+
+    @property
+    def reversible(self):
+        return self.operation.reversible
+
+    def deconstruct(self):
+        return self.__class__.__qualname__, [self.operation], {}
+
+    def state_forwards(self, app_label, state):
+        self.operation.state_forwards(app_label, state)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            self.operation.database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            self.operation.database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return f"{self.operation.describe()} (PostgreSQL only)"
+
+    @property
+    def migration_name_fragment(self):
+        return self.operation.migration_name_fragment
+
+
+def _vector_sql(columns, row=''):
+    return ' || '.join(
+        f"setweight(to_tsvector('{config}', coalesce({row}{column}, '')), '{weight}')"
+        for column, config, weight in columns
+    )
+
+
+def _trigger_sql(table, columns, vector_column):
+    function = f"{table}_{vector_column}_update"
+    trigger = f"{table}_{vector_column}_trigger"
+    watched = ', '.join(column for column, _, _ in columns)
+    return f"""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+        BEGIN
+            NEW.{vector_column} := {_vector_sql(columns, 'NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+        DROP TRIGGER IF EXISTS {trigger} ON {table};
+        CREATE TRIGGER {trigger} BEFORE INSERT OR UPDATE OF {watched} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {function}();
+        UPDATE {table} SET {vector_column} = {_vector_sql(columns)};
+    """
+
+
+def search_vector_trigger(table, columns, vector_column='search_vector', previous_columns=None):
+    """
+    RunSQL keeping `vector_column` of `table` up to date with a trigger and
+    filling it for the existing rows.
+
+    `columns` is a list of (column, text search config, weight), e.g.
+    ('title_en', 'english', 'A'). Urdu text uses the 'simple' config as
+    PostgreSQL has no Urdu dictionary.
+
+    When the columns of an existing trigger change, pass the old list as
+    `previous_columns` so the migration reverses to it instead of dropping
+    the trigger.
+    """
+    if previous_columns is not None:
+        reverse_sql = _trigger_sql(table, previous_columns, vector_column)
+    else:
+        reverse_sql = f"""
+            DROP TRIGGER IF EXISTS {table}_{vector_column}_trigger ON {table};
+            DROP FUNCTION IF EXISTS {table}_{vector_column}_update();
+        """
+    return migrations.RunSQL(sql=_trigger_sql(table, columns, vector_column), reverse_sql=reverse_sql)
+
+
+def fill_normalized_fields(app_label, model_name, fields):
+    """
+    RunPython filling normalized copies (see core/text.py) for the existing
+    rows. `fields` maps each normalized column to its source column, like
+    the model's `normalized_fields`.
+    """
+    def forwards(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        max_lengths = {target: model._meta.get_field(target).max_length for target in fields}
+        rows = list(model.objects.only('pk', *fields.values()))
+        for row in rows:
+            for target, source in fields.items():
+                setattr(row, target, normalize_text(getattr(row, source))[:max_lengths[target]])
+        model.objects.bulk_update(rows, list(fields), batch_size=500)
+
+    return migrations.RunPython(forwards, migrations.RunPython.noop)
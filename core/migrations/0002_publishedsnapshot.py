@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublishedSnapshot',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('base_url', models.CharField(help_text='Scheme and host the absolute URLs in the content were built for', max_length=255)),
+                ('content', models.TextField()),
+                ('content_hash', models.CharField(max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
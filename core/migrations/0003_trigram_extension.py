@@ -0,0 +1,14 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """pg_trgm for the typeahead indexes (a no-op on other databases)"""
+
+    dependencies = [
+        ('core', '0002_publishedsnapshot'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+    ]
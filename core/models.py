@@ -10,3 +10,17 @@ class Publication(models.Model):
 
     def __str__(self):
         return self.title_en
+
+
+class PublishedSnapshot(models.Model):
+    """
+    Pre-rendered JSON body of a low-churn list endpoint (see core/snapshots.py)
+    """
+    key = models.CharField(max_length=100, primary_key=True)
+    base_url = models.CharField(max_length=255, help_text="Scheme and host the absolute URLs in the content were built for")
+    content = models.TextField()
+    content_hash = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.key
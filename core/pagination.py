@@ -0,0 +1,148 @@
+"""
+Pagination classes shared by the API apps
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on a (field, unique tiebreaker) pair.
+
+    The cursor holds the values of the last row on the page, and the next
+    page is fetched with `WHERE (date, id) < (cursor)` instead of an
+    OFFSET. Backed by a composite index on the same two columns, every
+    page costs the same no matter how deep the client scrolls.
+
+    Response format:
+        {"next": url or null, "previous": url or null, "results": [...]}
+    """
+    ordering = ('-date', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+        cursor = self.decode_cursor(request, queryset.model)
+        reverse = False
+        if cursor is not None:
+            reverse, values = cursor
+            queryset = queryset.filter(self._seek_filter(values, reverse))
+
+        if reverse:
+            queryset = queryset.order_by(*self._flipped_ordering())
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def _flipped_ordering(self):
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+
+    def _seek_filter(self, values, reverse):
+        """
+        Rows after the cursor in the current direction, written so that the
+        first column is an index range condition:
+            date <= d AND (date < d OR id < i)
+        """
+        (first, first_desc), (second, second_desc) = self.fields
+        first_op = 'lt' if first_desc != reverse else 'gt'
+        second_op = 'lt' if second_desc != reverse else 'gt'
+        return Q(**{f'{first}__{first_op}e': values[0]}) & (
+            Q(**{f'{first}__{first_op}': values[0]}) | Q(**{f'{second}__{second_op}': values[1]})
+        )
+
+    def encode_cursor(self, row, reverse):
+        # Rows are model instances, or dicts on the .values() fast path
+        values = [str(row[name] if isinstance(row, dict) else getattr(row, name)) for name, _ in self.fields]
+        data = json.dumps({'r': int(reverse), 'v': values}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(data.encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, data['v'], strict=True)
+            ]
+            return bool(data['r']), values
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class ImagePagination(PageNumberPagination):
+    """Page-number pagination for the images of a single collection"""
+    page_size = 24
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class SearchPagination(PageNumberPagination):
+    """Page-number pagination for the results of one search group"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 50
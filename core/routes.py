@@ -0,0 +1,191 @@
+"""
+Discovery of the cached public API endpoints in the URL conf, and
+in-process rendering of them.
+
+Used by the warm_cache and refresh_snapshots management commands and by
+the tests that check every registered route.
+"""
+import logging
+import re
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.test import RequestFactory
+from django.urls import Resolver404, URLPattern, URLResolver, get_resolver, resolve
+from rest_framework.views import APIView
+
+from .cache_utils import CacheMixin
+from .snapshots import save_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Named regex groups, e.g. (?P<pk>[^/.]+), and path converters, e.g. <int:pk>
+_REGEX_GROUP = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+_PATH_CONVERTER = re.compile(r'<(?:\w+:)?(\w+)>')
+
+Route = namedtuple('Route', ['name', 'template', 'view_class', 'params'])
+
+
+def _walk(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            yield prefix + str(pattern.pattern), pattern
+
+
+def _to_template(route):
+    """Turn a (possibly regex) route into a '/api/events/{pk}/' style template"""
+    template = route.replace('^', '').replace('$', '').replace('\\', '')
+    template = _REGEX_GROUP.sub(r'{\1}', template)
+    template = _PATH_CONVERTER.sub(r'{\1}', template)
+    return '/' + template
+
+
+def iter_api_routes():
+    """
+    Yield a Route for every GET endpoint served by a DRF view.
+    Format-suffix duplicates (e.g. /events.json) are skipped, and so are
+    routes shadowed by an earlier one with the same path.
+    """
+    seen = set()
+    for route, pattern in _walk(get_resolver().url_patterns):
+        view_class = getattr(pattern.callback, 'cls', None)
+        if view_class is None or not issubclass(view_class, APIView):
+            continue
+        actions = getattr(pattern.callback, 'actions', None)
+        if actions is not None and 'get' not in actions:
+            continue
+        if actions is None and not hasattr(view_class, 'get'):
+            continue
+        params = tuple(pattern.pattern.regex.groupindex)
+        if 'format' in params:
+            continue
+        template = _to_template(route)
+        if template in seen:
+            continue
+        seen.add(template)
+        yield Route(pattern.name, template, view_class, params)
+
+
+def iter_cached_routes():
+    """Yield a Route for every GET endpoint served by a CacheMixin view"""
+    for route in iter_api_routes():
+        if issubclass(route.view_class, CacheMixin):
+            yield route
+
+
+def get_detail_pks(route, limit=None):
+    """Primary keys to fill in a detail route, taken from the view's queryset"""
+    queryset = getattr(route.view_class, 'queryset', None)
+    if queryset is None:
+        return []
+    pks = queryset.prefetch_related(None).order_by('pk').values_list('pk', flat=True)
+    if limit is not None:
+        pks = pks[:limit]
+    return list(pks)
+
+
+def get_public_urls(max_detail=None):
+    """Concrete URLs of every cached list endpoint and its detail pages"""
+    urls = []
+    for route in iter_cached_routes():
+        if not route.params:
+            urls.append(route.template)
+        elif route.params == ('pk',):
+            urls.extend(route.template.format(pk=pk) for pk in get_detail_pks(route, max_detail))
+    return urls
+
+
+def iter_snapshot_routes():
+    """Yield the list routes whose view declares a snapshot_key"""
+    for route in iter_cached_routes():
+        if not route.params and getattr(route.view_class, 'snapshot_key', None):
+            yield route
+
+
+def get_snapshot_dependencies():
+    """Return {model: [snapshot keys]} for the models the snapshots are built from"""
+    dependencies = {}
+    for route in iter_snapshot_routes():
+        view_class = route.view_class
+        models = view_class.cache_models or (view_class.queryset.model,)
+        for model in models:
+            dependencies.setdefault(model, []).append(view_class.snapshot_key)
+    return dependencies
+
+
+def get_default_host():
+    """First concrete ALLOWED_HOSTS entry, used when no host is given"""
+    hosts = [h for h in settings.ALLOWED_HOSTS if h != '*' and not h.startswith('.')]
+    return hosts[0] if hosts else 'localhost'
+
+
+def get_default_base_url():
+    """Base URL snapshots are rendered for (settings.SNAPSHOT_BASE_URL)"""
+    base_url = getattr(settings, 'SNAPSHOT_BASE_URL', '')
+    if base_url:
+        return base_url.rstrip('/')
+    return f"{'http' if settings.DEBUG else 'https'}://{get_default_host()}"
+
+
+def unthrottled_view(func, **initkwargs):
+    """
+    Rebuild a DRF view without throttle classes, so in-process rendering
+    doesn't use up (or hit) the anonymous rate limit of the local address.
+    """
+    view_class = getattr(func, 'cls', None)
+    if view_class is None:
+        return func
+    initkwargs = dict(getattr(func, 'initkwargs', {}), throttle_classes=(), **initkwargs)
+    actions = getattr(func, 'actions', None)
+    if actions is not None:
+        return view_class.as_view(actions, **initkwargs)
+    return view_class.as_view(**initkwargs)
+
+
+def render_url(url, host, secure, factory=None, **initkwargs):
+    """
+    Render one URL through its view (no HTTP, no middleware, no throttling).
+    Returns (status, seconds, content); status is 404 for unknown URLs and
+    500 when the view raised.
+    """
+    factory = factory or RequestFactory()
+    started = time.monotonic()
+    try:
+        match = resolve(url.split('?', 1)[0])
+    except Resolver404:
+        return 404, 0.0, b''
+
+    request = factory.get(url, HTTP_HOST=host, secure=secure)
+    view = unthrottled_view(match.func, **initkwargs)
+    try:
+        response = view(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+    except Exception as e:
+        logger.error(f"Error rendering {url}: {e}")
+        return 500, time.monotonic() - started, b''
+    return response.status_code, time.monotonic() - started, response.content
+
+
+def refresh_snapshots(keys=None, base_url=None):
+    """
+    Re-render the snapshot endpoints (all, or only the given keys) past the
+    API cache and store their bodies. Returns {key: status} where status is
+    'updated', 'unchanged' or the HTTP status of a failed render.
+    """
+    base_url = (base_url or get_default_base_url()).rstrip('/')
+    scheme, host = base_url.split('://', 1)
+    results = {}
+    for route in iter_snapshot_routes():
+        key = route.view_class.snapshot_key
+        if keys is not None and key not in keys:
+            continue
+        status, _, content = render_url(route.template, host, scheme == 'https', cache_timeout=0)
+        if status != 200:
+            results[key] = status
+            continue
+        results[key] = 'updated' if save_snapshot(key, base_url, content) else 'unchanged'
+    return results
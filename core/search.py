@@ -0,0 +1,98 @@
+"""
+Full-text search across the public content.
+
+On PostgreSQL every searchable model has a `search_vector` column filled by
+a trigger (see core/migration_utils.py) and a GIN index on it. English text
+is indexed with the 'english' config (stemmed), Urdu text with 'simple'.
+The query is parsed with websearch_to_tsquery in both configs, so quoted
+phrases, OR and -exclusions work, and results are ranked with ts_rank.
+
+Queries are also matched in their normalized form (see core/text.py), so
+Urdu spelling variants find each other: the vectors index the normalized
+Urdu titles, and the fallback matches the normalized title columns.
+
+On other databases (local SQLite) search falls back to icontains over the
+same fields, unranked.
+"""
+from collections import namedtuple
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+
+from about.models import AboutSection, AboutSubSection
+from about.serializers import AboutSectionSerializer, AboutSubSectionSearchSerializer
+from about.views import get_active_sections
+from events.models import Event
+from events.serializers import EventSerializer
+from publications.models import Publication
+from publications.serializers import PublicationSerializer
+from video_audios.models import Audio, Video
+from video_audios.serializers import AudioSerializer, VideoSerializer
+
+from .text import normalize_text
+
+# Shortest and longest query that is searched at all
+MIN_QUERY_LENGTH = 2
+MAX_QUERY_LENGTH = 100
+
+SearchGroup = namedtuple('SearchGroup', ['name', 'get_queryset', 'fields', 'serializer_class'])
+
+# Result groups in response order
+SEARCH_GROUPS = [
+    SearchGroup(
+        'publications', Publication.objects.all,
+        ('title_en', 'title_ur', 'description_en', 'description_ur'), PublicationSerializer,
+    ),
+    SearchGroup(
+        'audios', Audio.objects.all,
+        ('english_title', 'urdu_title'), AudioSerializer,
+    ),
+    SearchGroup(
+        'videos', Video.objects.all,
+        ('english_title', 'urdu_title'), VideoSerializer,
+    ),
+    SearchGroup(
+        'events', lambda: Event.objects.filter(is_active=True),
+        ('title_en', 'title_ur', 'description_en', 'description_ur'), EventSerializer,
+    ),
+    SearchGroup(
+        'about_sections', get_active_sections,
+        ('title_en', 'title_ur', 'content_en', 'content_ur'), AboutSectionSerializer,
+    ),
+    SearchGroup(
+        'about_subsections', lambda: AboutSubSection.objects.filter(is_active=True, section__is_active=True),
+        ('title_en', 'title_ur', 'content_en', 'content_ur'), AboutSubSectionSearchSerializer,
+    ),
+]
+
+SEARCH_MODELS = (Publication, Audio, Video, Event, AboutSection, AboutSubSection)
+
+
+def clean_query(query):
+    """Trimmed query text, or '' if it is too short to search for"""
+    query = ' '.join((query or '').split())[:MAX_QUERY_LENGTH]
+    return query if len(query) >= MIN_QUERY_LENGTH else ''
+
+
+def search(queryset, fields, query):
+    """Filter a queryset to the rows matching query, best matches first"""
+    normalized = normalize_text(query)
+    if connection.vendor == 'postgresql':
+        search_query = (
+            SearchQuery(query, config='english', search_type='websearch')
+            | SearchQuery(query, config='simple', search_type='websearch')
+            | SearchQuery(normalized, config='simple', search_type='websearch')
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-rank', '-pk')
+
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f'{field}__icontains': query})
+    for field in getattr(queryset.model, 'normalized_fields', {}):
+        condition |= Q(**{f'{field}__contains': normalized})
+    return queryset.filter(condition).annotate(
+        rank=Value(0.0, output_field=FloatField())
+    ).order_by('-pk')
@@ -0,0 +1,116 @@
+"""
+Signal handlers that keep the API cache version stamps and the published
+snapshots up to date
+"""
+import functools
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed, pre_save
+from django.dispatch import receiver
+
+from .cache_utils import bump_cache_version
+from .routes import get_snapshot_dependencies, refresh_snapshots
+from .snapshots import discard_snapshots
+from .text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+def _bump(model):
+    # A cache outage must not fail (and roll back) the write itself
+    try:
+        bump_cache_version(model)
+    except Exception as e:
+        logger.warning(f"Could not invalidate API cache for {model._meta.label_lower}: {e}")
+
+
+def _invalidate(model, using=None):
+    # Bump right away so this process stops serving the old data, and again
+    # once the transaction commits so anything cached from the pre-commit
+    # state by a concurrent request is discarded as well.
+    _bump(model)
+    connection = transaction.get_connection(using)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _bump(model), using=using)
+
+
+@functools.lru_cache(maxsize=None)
+def _snapshot_dependencies():
+    # The URL conf doesn't change at runtime, walk it once
+    return get_snapshot_dependencies()
+
+
+class _SnapshotRefresh:
+    """on_commit callback re-rendering every snapshot a transaction changed"""
+
+    def __init__(self):
+        self.keys = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        # Runs after the commit: a failed render must not turn the write into a 500
+        try:
+            refresh_snapshots(self.keys)
+        except Exception as e:
+            logger.warning(f"Could not refresh snapshots {sorted(self.keys)}: {e}")
+
+
+def _refresh_snapshots(model, using=None):
+    keys = _snapshot_dependencies().get(model)
+    if not keys:
+        return
+    # Dropped in the same transaction as the change, so the old body is
+    # never served next to the new data; rebuilt once the change is visible
+    discard_snapshots(keys)
+    # One refresh per commit, however many rows (e.g. admin inlines) it saves.
+    # The pending callback is reused only while it is still queued and not
+    # run yet: rollbacks drop it from the queue.
+    connection = transaction.get_connection(using)
+    pending = getattr(connection, '_snapshot_refresh', None)
+    queued = (
+        pending is not None and not pending.done
+        and any(func is pending for _, func, _ in connection.run_on_commit)
+    )
+    if not queued:
+        pending = connection._snapshot_refresh = _SnapshotRefresh()
+    pending.keys.update(keys)
+    if not queued:
+        transaction.on_commit(pending, using=using)
+
+
+@receiver(post_save, dispatch_uid='core_cache_post_save')
+def invalidate_on_save(sender, using=None, raw=False, **kwargs):
+    """Invalidate cached responses built from the saved model"""
+    if raw:
+        # Fixture loading
+        return
+    _invalidate(sender, using)
+    _refresh_snapshots(sender, using)
+
+
+@receiver(post_delete, dispatch_uid='core_cache_post_delete')
+def invalidate_on_delete(sender, using=None, **kwargs):
+    """Invalidate cached responses built from the deleted model"""
+    _invalidate(sender, using)
+    _refresh_snapshots(sender, using)
+
+
+@receiver(m2m_changed, dispatch_uid='core_cache_m2m_changed')
+def invalidate_on_m2m_change(sender, instance, action, model, using=None, **kwargs):
+    """Invalidate both sides of a many-to-many relation when it changes"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    _invalidate(sender, using)
+    _invalidate(type(instance), using)
+    _invalidate(model, using)
+
+
+@receiver(pre_save, dispatch_uid='core_normalize_text')
+def fill_normalized_fields(sender, instance, **kwargs):
+    """Fill the normalized copies a model declares in `normalized_fields`"""
+    for target, source in getattr(sender, 'normalized_fields', {}).items():
+        max_length = sender._meta.get_field(target).max_length
+        # Compatibility forms (e.g. the ﷺ ligature) can expand, keep within the column
+        setattr(instance, target, normalize_text(getattr(instance, source))[:max_length])
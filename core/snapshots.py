@@ -0,0 +1,58 @@
+"""
+Write-time materialized JSON snapshots of low-churn list endpoints.
+
+Views with a `snapshot_key` (see core.cache_utils.CacheMixin) have their
+rendered list body stored in the PublishedSnapshot table. A snapshot is
+dropped inside the transaction that changes one of its models and rebuilt
+once it commits (core/signals.py), or on demand with
+`manage.py refresh_snapshots`.
+
+On an API cache miss the body is served from the snapshot with a single
+primary key lookup instead of running the queryset and serializer, and if
+the cache itself is unavailable the snapshot is served without it.
+"""
+import hashlib
+
+from django.http import HttpResponse
+
+from .models import PublishedSnapshot
+
+
+def get_base_url(request):
+    """Scheme and host of a request, e.g. 'https://api.example.com'"""
+    return f"{request.scheme}://{request.get_host()}"
+
+
+def get_content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def get_snapshot_response(key, request):
+    """
+    Return the snapshot for key as a plain JSON HttpResponse, or None if
+    there is none for the request's host (absolute media URLs are embedded).
+    """
+    try:
+        snapshot = PublishedSnapshot.objects.get(pk=key)
+    except PublishedSnapshot.DoesNotExist:
+        return None
+    if snapshot.base_url != get_base_url(request):
+        return None
+    return HttpResponse(snapshot.content.encode(), content_type='application/json')
+
+
+def save_snapshot(key, base_url, content):
+    """Store a rendered body, returns False if it was already up to date"""
+    content_hash = get_content_hash(content)
+    if PublishedSnapshot.objects.filter(pk=key, base_url=base_url, content_hash=content_hash).exists():
+        return False
+    PublishedSnapshot.objects.update_or_create(
+        key=key,
+        defaults={'base_url': base_url, 'content': content.decode(), 'content_hash': content_hash},
+    )
+    return True
+
+
+def discard_snapshots(keys):
+    """Drop snapshots so they are never served once their data has changed"""
+    PublishedSnapshot.objects.filter(pk__in=keys).delete()
@@ -0,0 +1,193 @@
+"""
+As-you-type title suggestions over publications, audios and videos.
+
+Matching runs on the normalized title columns (see core/text.py), so case
+and Urdu spelling variants don't matter:
+    - queries shorter than TRIGRAM_MIN_LENGTH match title prefixes, served
+      by the varchar_pattern_ops btree indexes
+    - longer queries match anywhere in the title, served on PostgreSQL by
+      pg_trgm GIN indexes
+Prefix matches rank first, then shorter titles.
+
+A miss is a single UNION query over the three tables. Results are kept in
+a bounded per-process LRU cache keyed by the models' version stamps, so
+any change to a title invalidates it. Most keystrokes never reach the
+database: repeated prefixes are cache hits, and when the cached result
+for a shorter prefix is complete (fewer than CANDIDATE_LIMIT matches) the
+longer query is answered by filtering it in memory.
+"""
+import threading
+from collections import OrderedDict
+
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.functions import Length
+
+from publications.models import Publication
+from video_audios.models import Audio, Video
+
+from .cache_utils import get_version_token
+from .text import normalize_text
+
+# type -> (model, English title field, Urdu title field)
+SUGGEST_SOURCES = {
+    'audio': (Audio, 'english_title', 'urdu_title'),
+    'publication': (Publication, 'title_en', 'title_ur'),
+    'video': (Video, 'english_title', 'urdu_title'),
+}
+SUGGEST_MODELS = tuple(model for model, _, _ in SUGGEST_SOURCES.values())
+
+# Shortest query matched anywhere in a title rather than as a prefix
+# (pg_trgm can't use its index for fewer than three characters)
+TRIGRAM_MIN_LENGTH = 3
+
+MAX_QUERY_LENGTH = 50
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+
+# Matches fetched and cached per query; a result with fewer is complete
+CANDIDATE_LIMIT = 50
+
+# Queries kept per process
+PREFIX_CACHE_SIZE = 2048
+
+
+def _mode(query):
+    return 'contains' if len(query) >= TRIGRAM_MIN_LENGTH else 'startswith'
+
+
+def _matches(candidate, query):
+    if _mode(query) == 'contains':
+        return query in candidate['normalized_en'] or query in candidate['normalized_ur']
+    return candidate['normalized_en'].startswith(query) or candidate['normalized_ur'].startswith(query)
+
+
+def _rank(candidate, query):
+    # Same order as the ORDER BY of fetch_candidates()
+    prefix = candidate['normalized_en'].startswith(query) or candidate['normalized_ur'].startswith(query)
+    return (0 if prefix else 1, len(candidate['normalized_en']), candidate['type'], candidate['id'])
+
+
+def fetch_candidates(query):
+    """Best CANDIDATE_LIMIT + 1 matches of all sources in one query"""
+    lookup = f'__{_mode(query)}'
+    querysets = []
+    for type_name, (model, title_en, title_ur) in SUGGEST_SOURCES.items():
+        prefix = Q(normalized_title_en__startswith=query) | Q(normalized_title_ur__startswith=query)
+        # Annotations only (in the same order everywhere) so the UNION columns line up
+        querysets.append(
+            model.objects.filter(
+                Q(**{f'normalized_title_en{lookup}': query}) | Q(**{f'normalized_title_ur{lookup}': query})
+            ).annotate(
+                type=Value(type_name),
+                item_id=F('pk'),
+                item_title_en=F(title_en),
+                item_title_ur=F(title_ur),
+                normalized_en=F('normalized_title_en'),
+                normalized_ur=F('normalized_title_ur'),
+                prefix=Case(When(prefix, then=Value(0)), default=Value(1), output_field=IntegerField()),
+                length=Length('normalized_title_en'),
+            ).values(
+                'type', 'item_id', 'item_title_en', 'item_title_ur',
+                'normalized_en', 'normalized_ur', 'prefix', 'length',
+            )
+        )
+    union = querysets[0].union(*querysets[1:], all=True)
+    rows = union.order_by('prefix', 'length', 'type', 'item_id')[:CANDIDATE_LIMIT + 1]
+    return [
+        {
+            'type': row['type'],
+            'id': row['item_id'],
+            'title_en': row['item_title_en'],
+            'title_ur': row['item_title_ur'],
+            'normalized_en': row['normalized_en'],
+            'normalized_ur': row['normalized_ur'],
+        }
+        for row in rows
+    ]
+
+
+class PrefixCache:
+    """
+    Bounded LRU of query -> (candidates, complete), valid for one version
+    token of the suggest models. Counts hits, derived answers and misses.
+    """
+
+    def __init__(self, max_entries=PREFIX_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            self._token = None
+            self.hits = self.derived = self.misses = 0
+
+    def get(self, token, query):
+        """Candidates for query, or None if it has to be fetched"""
+        with self._lock:
+            if token != self._token:
+                # A title changed somewhere, nothing cached is valid any more
+                self._entries.clear()
+                self._token = token
+            entry = self._entries.get(query)
+            if entry is not None:
+                self._entries.move_to_end(query)
+                self.hits += 1
+                return entry[0]
+            # A complete result of a shorter prefix contains every match of query
+            for length in range(len(query) - 1, 0, -1):
+                shorter = query[:length]
+                entry = self._entries.get(shorter)
+                if entry is not None and entry[1] and _mode(shorter) == _mode(query):
+                    self._entries.move_to_end(shorter)
+                    self.derived += 1
+                    candidates = [c for c in entry[0] if _matches(c, query)]
+                    self._set(query, candidates, True)
+                    return candidates
+            self.misses += 1
+            return None
+
+    def set(self, token, query, candidates, complete):
+        with self._lock:
+            if token == self._token:
+                self._set(query, candidates, complete)
+
+    def _set(self, query, candidates, complete):
+        # Caller holds the lock
+        self._entries[query] = (candidates, complete)
+        self._entries.move_to_end(query)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'derived': self.derived,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+            }
+
+
+prefix_cache = PrefixCache()
+
+
+def suggest(query, limit=DEFAULT_LIMIT):
+    """Top `limit` titles matching query as [{type, id, title_en, title_ur}]"""
+    query = normalize_text(query)[:MAX_QUERY_LENGTH]
+    if not query:
+        return []
+    token = get_version_token(SUGGEST_MODELS)
+    candidates = prefix_cache.get(token, query)
+    if candidates is None:
+        candidates = fetch_candidates(query)
+        complete = len(candidates) <= CANDIDATE_LIMIT
+        candidates = candidates[:CANDIDATE_LIMIT]
+        prefix_cache.set(token, query, candidates, complete)
+    best = sorted(candidates, key=lambda c: _rank(c, query))[:limit]
+    return [
+        {'type': c['type'], 'id': c['id'], 'title_en': c['title_en'], 'title_ur': c['title_ur']}
+        for c in best
+    ]
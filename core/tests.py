@@ -1,10 +1,62 @@
 """
 Basic tests for core functionality
 """
-from django.test import TestCase, Client
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import socket
+import tempfile
+import time
+import unittest
+from contextlib import ExitStack
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.http import Http404, HttpResponse
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.decorators import api_view
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.routers import APIRootView
+
+from about.models import AboutSection, AboutSubSection, CurrentNasheen, PreviousNasheen
+from core.cache_backends import LRUMemoryCache, is_shared_cache
+from core.cache_utils import (
+    DEFAULT_STALE_TIMEOUT, build_cache_key, cache_api_response, cache_stats, get_cache_stats,
+    get_cache_versions,
+)
+from core.compression import negotiate_encoding
+from core.db_pool import ConnectionPool, PoolTimeout
+from core.media_urls import MediaURLBuilder, get_media_url_builder, get_storage_url
+from core.middleware import CompressionMiddleware, ReplicaRoutingMiddleware
+from core.models import PublishedSnapshot
+from core.routes import get_detail_pks, get_public_urls, iter_api_routes, refresh_snapshots
+from core.suggest import CANDIDATE_LIMIT, prefix_cache
+from core.text import normalize_text
+from core.views import SearchView, SuggestThrottle, serve_media_file
+from events.models import Event
+from events.views import EventViewSet
+from khanqah_backend.urls import schema_view
+from gallery.models import GalleryCollection, GalleryImage
+from photos.models import Collection, Photo
+from publications.models import Publication
+from khanqah_backend.db_router import ReplicaRouter, set_read_replica
+from video_audios.models import Audio, Video
 
 
 class CoreAPITests(TestCase):
@@ -98,3 +150,1568 @@ class ErrorHandlingTests(TestCase):
         # Verify response has our custom error format
         self.assertIn('status', response.data)
         self.assertEqual(response.data['status'], 'error')
+
+
+class CacheInvalidationTests(TestCase):
+    """Tests for version-stamped API cache invalidation"""
+    
+    def setUp(self):
+        """Set up test client and start from an empty cache"""
+        cache.clear()
+        self.client = APIClient()
+    
+    def test_save_invalidates_cached_list(self):
+        """Editing an event is visible on the next request"""
+        event = Event.objects.create(title_en='Zikr', title_ur='ذکر')
+        response = self.client.get('/api/events/events/')
+        self.assertEqual(response.json()[0]['title']['english'], 'Zikr')
+        
+        event.title_en = 'Weekly Zikr'
+        event.save()
+        response = self.client.get('/api/events/events/')
+        self.assertEqual(response.json()[0]['title']['english'], 'Weekly Zikr')
+    
+    def test_delete_invalidates_cached_list(self):
+        """Deleting an event removes it from the cached list"""
+        event = Event.objects.create(title_en='Zikr', title_ur='ذکر')
+        self.assertEqual(len(self.client.get('/api/events/events/').json()), 1)
+        event.delete()
+        self.assertEqual(len(self.client.get('/api/events/events/').json()), 0)
+    
+    def test_save_only_bumps_own_model(self):
+        """Editing an event leaves other endpoints' cache keys untouched"""
+        before = get_cache_versions([Event, Publication])
+        Event.objects.create(title_en='Zikr', title_ur='ذکر')
+        after = get_cache_versions([Event, Publication])
+        self.assertNotEqual(before['events.event'], after['events.event'])
+        self.assertEqual(before['publications.publication'], after['publications.publication'])
+    
+    def test_child_model_invalidates_parent_endpoint(self):
+        """Subsection edits invalidate the about sections endpoint"""
+        section = AboutSection.objects.create(title_en='Silsila', title_ur='سلسلہ')
+        response = self.client.get('/api/about/sections/')
+        self.assertEqual(response.json()[0]['subsections'], [])
+        AboutSubSection.objects.create(
+            section=section, title_en='Daily', title_ur='روزانہ',
+            content_en='...', content_ur='...'
+        )
+        response = self.client.get('/api/about/sections/')
+        self.assertEqual(len(response.json()[0]['subsections']), 1)
+
+    def test_cache_outage_does_not_fail_writes(self):
+        """Saves and deletes go through when the cache backend is down"""
+        with ExitStack() as stack:
+            for name in ('add', 'get', 'get_many', 'set', 'set_many', 'incr', 'delete'):
+                stack.enter_context(mock.patch.object(
+                    LRUMemoryCache, name, side_effect=ConnectionError('cache down')
+                ))
+            with self.assertLogs('core.signals', level='WARNING'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    event = Event.objects.create(title_en='Zikr', title_ur='ذکر')
+            self.assertTrue(Event.objects.filter(pk=event.pk).exists())
+            with self.assertLogs('core.signals', level='WARNING'):
+                event.delete()
+        self.assertFalse(Event.objects.filter(pk=event.pk).exists())
+
+
+class CachedResponseTests(TestCase):
+    """Tests for the rendered-bytes API cache"""
+    
+    def setUp(self):
+        """Set up test client and start from an empty cache"""
+        cache.clear()
+        self.client = APIClient()
+        Event.objects.create(title_en='Zikr', title_ur='ذکر')
+    
+    def test_cache_hit_returns_identical_bytes(self):
+        """A cache hit serves the stored body without re-rendering"""
+        first = self.client.get('/api/events/events/')
+        second = self.client.get('/api/events/events/')
+        self.assertTrue(hasattr(first, 'data'))
+        self.assertFalse(hasattr(second, 'data'))
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second['Content-Type'], 'application/json')
+    
+    def test_cache_entry_holds_bytes_not_response(self):
+        """Only plain bytes, content type and headers end up in the cache"""
+        self.client.get('/api/events/events/')
+        request = RequestFactory().get('/api/events/events/')
+        entry = cache.get(build_cache_key('events', request, [Event]))
+        self.assertEqual(set(entry), {'content', 'content_type', 'headers', 'expires'})
+        self.assertIsInstance(entry['content'], bytes)
+        self.assertEqual(entry['content_type'], 'application/json')
+
+
+class CacheApiResponseDecoratorTests(TestCase):
+    """Tests for the cache_api_response function-view decorator"""
+    
+    def setUp(self):
+        cache.clear()
+        cache_stats.reset()
+        Event.objects.create(title_en='Zikr', title_ur='ذکر')
+        
+        @cache_api_response(timeout=60, key_prefix='decorated', models=[Event])
+        @api_view(['GET'])
+        def event_count(request):
+            return Response({'count': Event.objects.count()})
+        self.view = event_count
+    
+    def _get(self):
+        return self.view(RequestFactory().get('/api/event-count/'))
+    
+    def test_bytes_stored_and_hit_is_plain_response(self):
+        """The rendered body is cached; a hit is a plain HttpResponse and runs no query"""
+        first = self._get()
+        entry = cache.get(build_cache_key('decorated', RequestFactory().get('/api/event-count/'), [Event]))
+        self.assertEqual(entry['content'], first.content)
+        self.assertEqual(json.loads(entry['content']), {'count': 1})
+        
+        with self.assertNumQueries(0):
+            second = self._get()
+        self.assertIs(type(second), HttpResponse)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], 'application/json')
+        self.assertEqual(get_cache_stats()['hits'], 1)
+    
+    def test_save_invalidates(self):
+        """Saving a listed model addresses a new entry"""
+        self._get()
+        Event.objects.create(title_en='Mehfil', title_ur='محفل')
+        self.assertEqual(json.loads(self._get().content), {'count': 2})
+    
+    def test_inside_api_view_warns(self):
+        """Placed inside @api_view it can't cache and says so once"""
+        @api_view(['GET'])
+        @cache_api_response(timeout=60, key_prefix='misplaced', models=[Event])
+        def misplaced(request):
+            return Response({'count': Event.objects.count()})
+        
+        with self.assertLogs('core.cache_utils', 'WARNING') as logs:
+            for _ in range(2):
+                response = misplaced(RequestFactory().get('/api/misplaced/'))
+                self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('outside @api_view', logs.output[0])
+        self.assertEqual(get_cache_stats()['hits'], 0)
+
+
+class ConditionalGetTests(TestCase):
+    """Tests for ETag / Last-Modified handling on cached endpoints"""
+    
+    def setUp(self):
+        """Set up test client, start from an empty cache shared by every worker"""
+        cache.clear()
+        self.client = APIClient()
+        self.event = Event.objects.create(title_en='Zikr', title_ur='ذکر')
+        patcher = mock.patch('core.cache_utils.cache_is_shared', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_response_has_validators(self):
+        """Read endpoints send ETag and Last-Modified"""
+        for url in ['/api/events/events/', f'/api/events/events/{self.event.pk}/',
+                    '/api/about/sections/', '/api/about/current-nasheen/',
+                    '/api/video-audios/audios/', '/api/photos/collections/']:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertTrue(response.has_header('ETag'), url)
+            self.assertTrue(response.has_header('Last-Modified'), url)
+    
+    def test_matching_etag_returns_304_without_queries(self):
+        """A matching If-None-Match is answered before touching the database"""
+        etag = self.client.get('/api/events/events/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/events/events/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+    
+    def test_etag_changes_after_edit(self):
+        """A stale ETag gets the full, updated response"""
+        etag = self.client.get('/api/events/events/')['ETag']
+        self.event.title_en = 'Weekly Zikr'
+        self.event.save()
+        response = self.client.get('/api/events/events/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()[0]['title']['english'], 'Weekly Zikr')
+    
+    def test_local_cache_etag_is_body_hash(self):
+        """Without a shared cache the ETag is a hash of the body, checked once it is known"""
+        with mock.patch('core.cache_utils.cache_is_shared', return_value=False):
+            first = self.client.get('/api/events/events/')
+            self.assertEqual(first['ETag'], f'"{hashlib.md5(first.content).hexdigest()}"')
+            self.assertFalse(first.has_header('Last-Modified'))
+            with self.assertNumQueries(0):
+                response = self.client.get('/api/events/events/', HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+    
+    def test_local_cache_stale_stamps_not_trusted(self):
+        """A worker that missed a write (stamp not bumped) sends the new body once its entry expires"""
+        with mock.patch('core.cache_utils.cache_is_shared', return_value=False):
+            etag = self.client.get('/api/events/events/')['ETag']
+            # Written by another worker: no signal reaches this worker's stamps
+            Event.objects.filter(pk=self.event.pk).update(title_en='Weekly Zikr')
+            cache.delete(build_cache_key('events', RequestFactory().get('/api/events/events/'), [Event]))
+            response = self.client.get('/api/events/events/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['title']['english'], 'Weekly Zikr')
+
+
+class StaleWhileRevalidateTests(TestCase):
+    """Tests for soft TTL, refresh lock and stale serving"""
+    
+    def setUp(self):
+        """Set up test client, an expired cache entry and fresh counters"""
+        cache.clear()
+        self.client = APIClient()
+        Event.objects.create(title_en='Zikr', title_ur='ذکر')
+        self.client.get('/api/events/events/')
+        cache_stats.reset()
+        request = RequestFactory().get('/api/events/events/')
+        self.cache_key = build_cache_key('events', request, [Event])
+        entry = cache.get(self.cache_key)
+        entry['expires'] = time.time() - 1
+        cache.set(self.cache_key, entry)
+    
+    def test_stale_entry_served_while_locked(self):
+        """Requests that lose the refresh lock get the stale copy"""
+        cache.add(f"{self.cache_key}:lock", 1)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/events/events/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['title']['english'], 'Zikr')
+        self.assertEqual(get_cache_stats()['stale'], 1)
+    
+    def test_first_request_refreshes_stale_entry(self):
+        """The request that takes the lock recomputes and releases it"""
+        response = self.client.get('/api/events/events/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_cache_stats()['refreshes'], 1)
+        self.assertIsNone(cache.get(f"{self.cache_key}:lock"))
+        self.assertGreater(cache.get(self.cache_key)['expires'], time.time())
+    
+    def test_hard_ttl_drops_entry(self):
+        """An entry whose hard TTL has passed is gone from the backend"""
+        entry = cache.get(self.cache_key)
+        cache.set(self.cache_key, entry, 0)
+        self.client.get('/api/events/events/')
+        self.assertEqual(get_cache_stats()['misses'], 1)
+        self.assertEqual(get_cache_stats()['stale'], 0)
+
+
+class CacheTTLTests(TestCase):
+    """Tests for the soft and hard TTL of stored entries"""
+    
+    def setUp(self):
+        cache.clear()
+        cache_stats.reset()
+        self.client = APIClient()
+        Event.objects.create(title_en='Zikr', title_ur='ذکر')
+        self.request = RequestFactory().get('/api/events/events/')
+    
+    def _backend_expiry(self, cache_key):
+        """Expiry time the cache backend itself holds for a key"""
+        backend = caches[settings.API_CACHE_ALIAS]
+        return backend._store.entries[backend.make_key(cache_key)][1]
+    
+    def _clock(self, offset):
+        """Move the clock of the cache and the backend forward by offset seconds"""
+        now = time.time() + offset
+        clock = mock.Mock(time=mock.Mock(return_value=now))
+        stack = ExitStack()
+        stack.enter_context(mock.patch('core.cache_utils.time', clock))
+        stack.enter_context(mock.patch('core.cache_backends.time', clock))
+        return stack
+    
+    def test_entry_stored_with_soft_plus_stale_ttl(self):
+        """CacheMixin stores entries for cache_timeout + cache_stale_timeout"""
+        self.client.get('/api/events/events/')
+        cache_key = build_cache_key('events', self.request, [Event])
+        soft = cache.get(cache_key)['expires']
+        self.assertAlmostEqual(self._backend_expiry(cache_key) - soft, DEFAULT_STALE_TIMEOUT, delta=1)
+        self.assertAlmostEqual(soft - time.time(), 300, delta=1)
+        
+        # Past the soft TTL the stale copy is served, past the hard TTL it is gone
+        cache.add(f"{cache_key}:lock", 1, None)
+        with self._clock(300 + DEFAULT_STALE_TIMEOUT / 2), self.assertNumQueries(0):
+            self.client.get('/api/events/events/')
+        self.assertEqual(get_cache_stats()['stale'], 1)
+        with self._clock(300 + DEFAULT_STALE_TIMEOUT + 1):
+            self.assertIsNone(cache.get(cache_key))
+    
+    def test_no_stale_timeout(self):
+        """With stale_timeout=0 the entry is gone at the soft TTL"""
+        class NoStaleEventViewSet(EventViewSet):
+            cache_stale_timeout = 0
+        NoStaleEventViewSet.as_view({'get': 'list'})(RequestFactory().get('/api/events/events/'))
+        cache_key = build_cache_key('events', self.request, [Event])
+        self.assertAlmostEqual(self._backend_expiry(cache_key), cache.get(cache_key)['expires'], delta=1)
+        
+        @cache_api_response(timeout=60, key_prefix='no-stale', models=[Event], stale_timeout=0)
+        @api_view(['GET'])
+        def event_count(request):
+            return Response({'count': Event.objects.count()})
+        event_count(RequestFactory().get('/api/event-count/'))
+        cache_key = build_cache_key('no-stale', RequestFactory().get('/api/event-count/'), [Event])
+        self.assertAlmostEqual(self._backend_expiry(cache_key), cache.get(cache_key)['expires'], delta=1)
+        with self._clock(61):
+            self.assertIsNone(cache.get(cache_key))
+    
+    def test_decorator_refresher_holds_lock(self):
+        """While one request refreshes an expired entry, concurrent ones get the stale body"""
+        calls = []
+        
+        @cache_api_response(timeout=60, key_prefix='refresh', models=[Event])
+        @api_view(['GET'])
+        def event_count(request):
+            if calls:
+                # A request arriving while this one recomputes
+                calls.append(event_count(RequestFactory().get('/api/event-count/')))
+            else:
+                calls.append(None)
+            return Response({'count': Event.objects.count()})
+        
+        def get():
+            return event_count(RequestFactory().get('/api/event-count/'))
+        
+        get()
+        cache_key = build_cache_key('refresh', RequestFactory().get('/api/event-count/'), [Event])
+        entry = cache.get(cache_key)
+        entry['expires'] = time.time() - 1
+        entry['content'] = b'{"count":"stale"}'
+        cache.set(cache_key, entry)
+        cache_stats.reset()
+        
+        refreshed = get()
+        self.assertEqual(json.loads(refreshed.content), {'count': 1})
+        self.assertEqual(calls[1].content, b'{"count":"stale"}')
+        stats = get_cache_stats()
+        self.assertEqual((stats['refreshes'], stats['stale']), (1, 1))
+        self.assertIsNone(cache.get(f"{cache_key}:lock"))
+        self.assertEqual(json.loads(cache.get(cache_key)['content']), {'count': 1})
+        self.assertGreater(cache.get(cache_key)['expires'], time.time())
+
+
+class LRUMemoryCacheTests(TestCase):
+    """Tests for the byte-bounded in-process LRU cache backend"""
+    
+    def setUp(self):
+        """Create a small cache"""
+        self.cache = LRUMemoryCache(f'test-lru-{self.id()}', {'OPTIONS': {'MAX_BYTES': 2000}})
+        self.cache.clear()
+    
+    def test_evicts_least_recently_used_first(self):
+        """Recently read entries survive eviction"""
+        for i in range(3):
+            self.cache.set(f'key{i}', 'x' * 400)
+        self.cache.get('key0')
+        self.cache.set('key3', 'x' * 400)
+        self.cache.set('key4', 'x' * 400)
+        self.assertIsNotNone(self.cache.get('key0'))
+        self.assertIsNone(self.cache.get('key1'))
+        self.assertGreaterEqual(self.cache.get_stats()['evictions'], 1)
+    
+    def test_stays_under_byte_budget(self):
+        """Total stored size never exceeds MAX_BYTES"""
+        for i in range(50):
+            self.cache.set(f'key{i}', 'x' * (i * 10))
+        stats = self.cache.get_stats()
+        self.assertLessEqual(stats['bytes'], stats['max_bytes'])
+    
+    def test_oversized_value_not_stored(self):
+        """A value larger than the whole budget is skipped"""
+        self.cache.set('small', 1)
+        self.cache.set('huge', 'x' * 5000)
+        self.assertIsNone(self.cache.get('huge'))
+        self.assertEqual(self.cache.get('small'), 1)
+    
+    def test_non_positive_timeout_not_stored(self):
+        """timeout <= 0 only deletes the key (like LocMemCache), it never takes budget or evicts"""
+        for i in range(3):
+            self.cache.set(f'key{i}', 'x' * 400)
+        bytes_before = self.cache.get_stats()['bytes']
+        for timeout in (0, -1):
+            with self.subTest(timeout=timeout):
+                self.cache.set('expired', 'x' * 400, timeout)
+                self.assertIsNone(self.cache.get('expired'))
+                self.assertEqual(self.cache.get_stats()['bytes'], bytes_before)
+        self.assertEqual(self.cache.get_stats()['evictions'], 0)
+        self.assertEqual(self.cache.get_many([f'key{i}' for i in range(3)]).keys(), {f'key{i}' for i in range(3)})
+        self.cache.set('key0', 'y', 0)
+        self.assertIsNone(self.cache.get('key0'))
+        self.assertLess(self.cache.get_stats()['bytes'], bytes_before)
+    
+    def test_expiry_and_counters(self):
+        """Expired entries miss and counters track hits and misses"""
+        self.cache.set('gone', 1, 0)
+        self.cache.set('kept', 2)
+        self.assertIsNone(self.cache.get('gone'))
+        self.assertEqual(self.cache.get('kept'), 2)
+        self.assertEqual(self.cache.incr('kept'), 3)
+        stats = self.cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'core.cache_backends.LRUMemoryCache', 'LOCATION': 'tiered-l2'},
+    'near': {
+        'BACKEND': 'core.cache_backends.TieredCache',
+        'LOCATION': 'tiered-l1',
+        'OPTIONS': {'L2': 'default', 'L1_TIMEOUT': 60, 'L1_VERSION_TIMEOUT': 0},
+    },
+})
+class TieredCacheTests(TestCase):
+    """Tests for the L1 near-cache in front of a shared cache"""
+    
+    def setUp(self):
+        """Start from empty caches"""
+        self.near = caches['near']
+        self.shared = caches['default']
+        self.near.clear()
+    
+    def test_reads_are_served_from_l1(self):
+        """Once read, an entry no longer needs the shared cache"""
+        self.near.set('about', 'sections')
+        self.shared.delete('about')
+        self.assertEqual(self.near.get('about'), 'sections')
+    
+    def test_version_stamps_are_rechecked(self):
+        """Version stamps bumped by another worker are seen by the near-cache"""
+        self.near.set('cachever:events.event', 1)
+        self.shared.set('cachever:events.event', 2)
+        self.assertEqual(self.near.get('cachever:events.event'), 2)
+    
+    def test_delete_and_add_go_to_shared_cache(self):
+        """Locks and deletes are never answered from L1 alone"""
+        self.assertTrue(self.near.add('lock', 1))
+        self.assertFalse(self.near.add('lock', 1))
+        self.near.delete('lock')
+        self.assertFalse(self.shared.has_key('lock'))
+
+
+class FakeConnection:
+    """Stands in for a driver connection in the pool tests"""
+    
+    def __init__(self):
+        self.usable = True
+        self.in_transaction = False
+        self.closed = False
+
+
+class ConnectionPoolTests(TestCase):
+    """Tests for the bounded per-process database connection pool"""
+    
+    def setUp(self):
+        """Create a pool of two fake connections"""
+        self.opened = []
+        self.pool = ConnectionPool(
+            check=lambda conn: conn.usable,
+            reset=self.reset,
+            close=lambda conn: setattr(conn, 'closed', True),
+            min_size=1, max_size=2, timeout=0.05, check_interval=0,
+        )
+    
+    def connect(self):
+        conn = FakeConnection()
+        self.opened.append(conn)
+        return conn
+    
+    def reset(self, conn):
+        if not conn.usable:
+            raise RuntimeError('connection lost')
+        was_open, conn.in_transaction = conn.in_transaction, False
+        return was_open
+    
+    def test_connections_are_reused(self):
+        """A returned connection is handed out again instead of opening a new one"""
+        first = self.pool.getconn(self.connect)
+        self.pool.putconn(first)
+        self.assertIs(self.pool.getconn(self.connect), first)
+        stats = self.pool.get_stats()
+        self.assertEqual((stats['checkouts'], stats['created'], stats['in_use']), (2, 1, 1))
+    
+    def test_pool_is_bounded(self):
+        """A full pool makes the next checkout wait, then time out"""
+        self.pool.getconn(self.connect)
+        self.pool.getconn(self.connect)
+        with self.assertRaises(PoolTimeout):
+            self.pool.getconn(self.connect)
+        stats = self.pool.get_stats()
+        self.assertEqual((stats['size'], stats['timeouts']), (2, 1))
+        self.assertGreater(stats['wait_time'], 0)
+    
+    def test_open_transaction_is_reset_on_return(self):
+        """Whatever a request left open is rolled back before reuse"""
+        conn = self.pool.getconn(self.connect)
+        conn.in_transaction = True
+        self.pool.putconn(conn)
+        self.assertFalse(conn.in_transaction)
+        self.assertEqual(self.pool.get_stats()['resets'], 1)
+    
+    def test_broken_connections_are_discarded(self):
+        """Connections failing the health check or the reset are replaced"""
+        conn = self.pool.getconn(self.connect)
+        self.pool.putconn(conn)
+        conn.usable = False
+        replacement = self.pool.getconn(self.connect)
+        self.assertIsNot(replacement, conn)
+        self.assertTrue(conn.closed)
+        replacement.usable = False
+        self.pool.putconn(replacement)
+        stats = self.pool.get_stats()
+        self.assertEqual((stats['discarded'], stats['size']), (2, 0))
+    
+    def test_prewarm_opens_min_size(self):
+        """Prewarming opens MIN_SIZE idle connections once"""
+        self.assertEqual(self.pool.prewarm(self.connect), 1)
+        self.assertEqual(self.pool.prewarm(self.connect), 0)
+        self.assertEqual(self.pool.get_stats()['idle'], 1)
+    
+    def test_metrics_endpoint_is_staff_only(self):
+        """Pool and cache counters are only served to staff"""
+        client = APIClient()
+        self.assertIn(client.get('/api/metrics/').status_code, (401, 403))
+        client.force_authenticate(User.objects.create_user('staff', password='x', is_staff=True))
+        response = client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {'db_pool', 'cache'})
+
+
+class MediaURLBuilderTests(TestCase):
+    """Tests for the memoized media URL builder"""
+    
+    names = ['gallery/images/a.jpg', 'gallery/images/گیلری 1.jpg', 'audios/bayaan (2).mp3']
+    
+    def setUp(self):
+        get_storage_url.cache_clear()
+        self.request = RequestFactory().get('/api/gallery/', secure=True)
+    
+    def test_matches_build_absolute_uri(self):
+        """URLs are the same as request.build_absolute_uri(storage.url(name))"""
+        builder = MediaURLBuilder(self.request)
+        for name in self.names:
+            self.assertEqual(builder.url(name), self.request.build_absolute_uri(default_storage.url(name)))
+        self.assertEqual(MediaURLBuilder().url(self.names[0]), default_storage.url(self.names[0]))
+        self.assertIsNone(builder.url(''))
+    
+    def test_storage_urls_are_memoized(self):
+        """Each file name is resolved by the storage once"""
+        builder = get_media_url_builder(self.request)
+        self.assertIs(get_media_url_builder(self.request), builder)
+        for _ in range(3):
+            builder.url(self.names[0])
+        info = get_storage_url.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+    
+    def test_media_setting_change_clears_memo(self):
+        """Changing MEDIA_URL drops memoized URLs, absolute ones (a CDN) are kept as they are"""
+        MediaURLBuilder(self.request).url(self.names[0])
+        with override_settings(MEDIA_URL='https://cdn.example.com/media/'):
+            url = MediaURLBuilder(self.request).url(self.names[1])
+            self.assertEqual(url, self.request.build_absolute_uri(f'https://cdn.example.com/media/{self.names[1]}'))
+            self.assertTrue(MediaURLBuilder(self.request).url(self.names[0]).startswith('https://cdn.example.com/'))
+
+
+class MediaRangeTests(TestCase):
+    """Tests for byte-range requests to serve_media_file"""
+    
+    def setUp(self):
+        """Write an audio file and a PDF with position-dependent bytes"""
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        os.makedirs(os.path.join(self.media_root, 'audios'))
+        self.audio = bytes(i % 251 for i in range(300_000))
+        self.pdf = b'%PDF-1.7\n' + bytes(i % 199 for i in range(150_000))
+        for name, data in [('audios/bayaan.mp3', self.audio), ('book.pdf', self.pdf)]:
+            with open(os.path.join(self.media_root, name), 'wb') as f:
+                f.write(data)
+    
+    def _get(self, path, **headers):
+        response = serve_media_file(RequestFactory().get(f'/media/{path}', **headers), path)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return response, body
+    
+    def test_full_file_advertises_ranges(self):
+        """Without Range the whole file is sent with Accept-Ranges"""
+        response, body = self._get('audios/bayaan.mp3')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(body, self.audio)
+    
+    def test_audio_seek_patterns(self):
+        """Open-ended first request, a seek to the middle and the ID3v1 suffix"""
+        for header, expected, content_range in [
+            ('bytes=0-', self.audio, 'bytes 0-299999/300000'),
+            ('bytes=150000-', self.audio[150000:], 'bytes 150000-299999/300000'),
+            ('bytes=-128', self.audio[-128:], 'bytes 299872-299999/300000'),
+            ('bytes=299990-400000', self.audio[299990:], 'bytes 299990-299999/300000'),
+        ]:
+            with self.subTest(header=header):
+                response, body = self._get('audios/bayaan.mp3', HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], content_range)
+                self.assertEqual(response['Content-Length'], str(len(expected)))
+                self.assertEqual(body, expected)
+    
+    def test_pdfjs_chunked_fetches(self):
+        """PDF.js reads 64 KB chunks and may ask for several ranges at once"""
+        response, body = self._get('book.pdf', HTTP_RANGE='bytes=65536-131071')
+        self.assertEqual((response.status_code, body), (206, self.pdf[65536:131072]))
+        
+        response, body = self._get('book.pdf', HTTP_RANGE='bytes=0-1023, 140000-140099, 500-2000')
+        self.assertEqual(response.status_code, 206)
+        boundary = re.search(r'boundary=(\w+)', response['Content-Type']).group(1)
+        self.assertEqual(int(response['Content-Length']), len(body))
+        parts = body.split(f'--{boundary}'.encode())[1:-1]
+        self.assertEqual(len(parts), 2)  # overlapping ranges are merged
+        head, data = parts[1].split(b'\r\n\r\n', 1)
+        self.assertIn(b'Content-Range: bytes 140000-140099/150009', head)
+        self.assertEqual(data[:-2], self.pdf[140000:140100])
+    
+    def test_unsatisfiable_and_invalid_ranges(self):
+        """Ranges past the end get 416, malformed ones are ignored"""
+        response, _ = self._get('book.pdf', HTTP_RANGE='bytes=200000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */150009')
+        for header in ['bytes=abc', 'bytes=10-5', 'pages=1-2']:
+            response, body = self._get('book.pdf', HTTP_RANGE=header)
+            self.assertEqual((response.status_code, len(body)), (200, len(self.pdf)))
+    
+    def test_if_range(self):
+        """A range is only honoured while the file is the version the client has"""
+        response, _ = self._get('book.pdf')
+        last_modified = response['Last-Modified']
+        response, _ = self._get('book.pdf', HTTP_RANGE='bytes=0-99', HTTP_IF_RANGE=last_modified)
+        self.assertEqual(response.status_code, 206)
+        response, _ = self._get('book.pdf', HTTP_RANGE='bytes=0-99', HTTP_IF_RANGE='Mon, 01 Jan 2001 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+
+class MediaValidatorTests(TestCase):
+    """Tests for ETag / Last-Modified revalidation of serve_media_file"""
+    
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        os.makedirs(os.path.join(self.media_root, 'gallery'))
+        self.path = os.path.join(self.media_root, 'gallery/khanqah.jpg')
+        with open(self.path, 'wb') as f:
+            f.write(b'\xff\xd8' + b'x' * 5000)
+    
+    def _request(self, method='get', **headers):
+        request = getattr(RequestFactory(), method)('/media/gallery/khanqah.jpg', **headers)
+        response = serve_media_file(request, 'gallery/khanqah.jpg')
+        response.close()
+        return response
+    
+    def test_validators(self):
+        """ETag and Last-Modified describe the file on disk"""
+        response = self._request()
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['ETag'], r'^"[0-9a-f]+-138a"$')
+        self.assertEqual(response['Last-Modified'], http_date(os.stat(self.path).st_mtime))
+    
+    def test_not_modified_without_opening_file(self):
+        """Matching If-None-Match / If-Modified-Since get 304 and never open the file"""
+        first = self._request()
+        with mock.patch('core.views.open', create=True) as opened:
+            for headers in [
+                {'HTTP_IF_NONE_MATCH': first['ETag']},
+                {'HTTP_IF_NONE_MATCH': f'"other", {first["ETag"]}'},
+                {'HTTP_IF_MODIFIED_SINCE': first['Last-Modified']},
+            ]:
+                with self.subTest(headers=headers):
+                    response = self._request(**headers)
+                    self.assertEqual(response.status_code, 304)
+                    self.assertEqual(response['ETag'], first['ETag'])
+                    self.assertEqual(response.content, b'')
+        opened.assert_not_called()
+    
+    def test_changed_file_is_sent_again(self):
+        """A stale ETag gets the new file with a new ETag"""
+        first = self._request()
+        with open(self.path, 'ab') as f:
+            f.write(b'more')
+        response = self._request(HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+    
+    def test_head_from_stat(self):
+        """HEAD gets the full set of headers without the file being opened"""
+        with mock.patch('core.views.open', create=True) as opened:
+            response = self._request('head')
+        opened.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], '5002')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', response)
+    
+    def test_if_range_etag(self):
+        """If-Range with the current ETag allows a range, a weak or old one does not"""
+        etag = self._request()['ETag']
+        self.assertEqual(self._request(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag).status_code, 206)
+        self.assertEqual(self._request(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=f'W/{etag}').status_code, 200)
+        self.assertEqual(self._request(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"0-0"').status_code, 200)
+    
+    def test_directory_is_not_served(self):
+        """A directory under MEDIA_ROOT is a 404, like a missing file"""
+        with self.assertRaises(Http404):
+            serve_media_file(RequestFactory().get('/media/gallery'), 'gallery')
+        with self.assertRaises(Http404):
+            serve_media_file(RequestFactory().get('/media/gallery/missing.jpg'), 'gallery/missing.jpg')
+
+
+class MediaOffloadTests(TestCase):
+    """Tests for MEDIA_OFFLOAD and the os.sendfile path of serve_media_file"""
+    
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        os.makedirs(os.path.join(self.media_root, 'audios'))
+        self.audio = bytes(i % 251 for i in range(100_000))
+        self.names = ['audios/bayaan.mp3', 'audios/بیان 1.mp3']
+        for name in self.names:
+            with open(os.path.join(self.media_root, name), 'wb') as f:
+                f.write(self.audio)
+    
+    def _get(self, path, **headers):
+        return serve_media_file(RequestFactory().get(f'/media/{path}', **headers), path)
+    
+    @override_settings(MEDIA_OFFLOAD='x-accel-redirect', MEDIA_OFFLOAD_PREFIX='/protected-media/')
+    def test_x_accel_redirect(self):
+        """nginx gets the internal URI of the file and an empty body"""
+        with mock.patch('core.views.open', create=True) as opened:
+            for name, uri in [
+                (self.names[0], '/protected-media/audios/bayaan.mp3'),
+                (self.names[1], '/protected-media/audios/%D8%A8%DB%8C%D8%A7%D9%86%201.mp3'),
+            ]:
+                with self.subTest(name=name):
+                    response = self._get(name, HTTP_RANGE='bytes=0-99')
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response['X-Accel-Redirect'], uri)
+                    self.assertEqual(response['Content-Type'], 'audio/mpeg')
+                    self.assertIn('ETag', response)
+                    self.assertEqual(response.content, b'')
+        opened.assert_not_called()
+    
+    @override_settings(MEDIA_OFFLOAD='x-sendfile')
+    def test_x_sendfile(self):
+        """Apache gets the absolute path of the file"""
+        response = self._get(self.names[0])
+        self.assertEqual(response['X-Sendfile'], os.path.join(os.path.abspath(self.media_root), self.names[0]))
+        self.assertNotIn('X-Accel-Redirect', response)
+    
+    @override_settings(MEDIA_OFFLOAD='x-accel-redirect')
+    def test_checks_still_run(self):
+        """Rejected paths never reach the proxy"""
+        for path in ['../settings.py', 'audios/notes.txt', 'audios/missing.mp3']:
+            with self.subTest(path=path), self.assertRaises(Http404):
+                self._get(path)
+        response = self._get(self.names[0], HTTP_IF_NONE_MATCH=self._get(self.names[0])['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn('X-Accel-Redirect', response)
+    
+    @override_settings(MEDIA_OFFLOAD='x-accel-redirect')
+    def test_no_media_root_serves_nothing(self):
+        """Without a local MEDIA_ROOT (Cloudinary) nothing resolves against the working directory"""
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.media_root)
+        with override_settings(MEDIA_ROOT=''), self.assertRaises(Http404):
+            self._get(self.names[0])
+    
+    def test_sendfile_window(self):
+        """A single range reaches wsgi.file_wrapper as a file positioned at its start"""
+        response = self._get(self.names[0], HTTP_RANGE='bytes=40000-40999')
+        self.addCleanup(response.close)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Length'], '1000')
+        
+        # What gunicorn's sendfile does with response.file_to_stream
+        filelike = response.file_to_stream
+        offset = os.lseek(filelike.fileno(), 0, os.SEEK_CUR)
+        reader, writer = socket.socketpair()
+        with reader, writer:
+            writer.sendfile(filelike.file_handle, offset=offset, count=int(response['Content-Length']))
+            received = b''
+            while len(received) < 1000:
+                received += reader.recv(4096)
+        self.assertEqual(received, self.audio[40000:41000])
+
+
+class CompressionTests(TestCase):
+    """Tests for CompressionMiddleware and the cached compressed variants"""
+    
+    def setUp(self):
+        cache.clear()
+        cache_stats.reset()
+        self.client = APIClient()
+        Event.objects.bulk_create([
+            Event(title_en=f'Weekly gathering {i}', title_ur='ہفتہ وار محفل ذکر',
+                  description_en='Dhikr, recitation and a talk ' * 5,
+                  description_ur='ذکر، تلاوت اور بیان ' * 5, order=i)
+            for i in range(20)
+        ])
+    
+    def test_negotiation(self):
+        """Highest q-value wins, then br over zstd over gzip"""
+        codecs = {'br': None, 'zstd': None, 'gzip': None}
+        for header, expected in [
+            ('gzip, deflate, br, zstd', 'br'),
+            ('gzip;q=1.0, br;q=0.5', 'gzip'),
+            ('br;q=0, *', 'zstd'),
+            ('GZIP', 'gzip'),
+            ('identity', None),
+            ('*;q=0', None),
+            ('', None),
+        ]:
+            with self.subTest(header=header):
+                self.assertEqual(negotiate_encoding(header, codecs), expected)
+        self.assertIsNone(negotiate_encoding('deflate', {'gzip': None}))
+    
+    def test_cached_list_is_compressed_once(self):
+        """The first hit stores the gzip variant next to the entry, later hits reuse it"""
+        url = '/api/events/events/'
+        plain = self.client.get(url)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+        
+        first = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        second = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        for response in (first, second):
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(int(response['Content-Length']), len(response.content))
+            self.assertEqual(gzip.decompress(response.content), plain.content)
+            self.assertEqual(response['ETag'], f"W/{plain['ETag']}")
+        self.assertLess(len(first.content), len(plain.content) / 3)
+        stats = get_cache_stats()
+        self.assertEqual((stats['variant_misses'], stats['variant_hits']), (1, 1))
+        
+        # The weak ETag still revalidates
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+    
+    def test_new_entry_gets_new_variant(self):
+        """A variant is only reused for the cache entry it was made from"""
+        url = '/api/events/events/'
+        self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        Event.objects.create(title_en='New gathering', title_ur='نئی محفل', order=99)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertIn(b'New gathering', gzip.decompress(response.content))
+        self.assertEqual(get_cache_stats()['variant_hits'], 0)
+    
+    def test_skipped_responses(self):
+        """Tiny bodies, media, partial content and encoded bodies are left alone"""
+        body = b'{"items": "' + b'x' * 5000 + b'"}'
+        for response in [
+            HttpResponse(b'{"count": 0}', content_type='application/json'),
+            HttpResponse(b'\xff\xd8' + b'x' * 5000, content_type='image/jpeg'),
+            HttpResponse(body, content_type='application/json', status=206),
+            HttpResponse(body, content_type='application/json', headers={'Content-Encoding': 'br'}),
+        ]:
+            with self.subTest(content_type=response['Content-Type'], status=response.status_code):
+                content = response.content
+                middleware = CompressionMiddleware(lambda request: response)
+                result = middleware(RequestFactory().get('/api/x/', HTTP_ACCEPT_ENCODING='gzip'))
+                self.assertEqual(result.content, content)
+                self.assertNotIn('Vary', result)
+        
+        response = HttpResponse(body, content_type='application/json')
+        result = CompressionMiddleware(lambda request: response)(RequestFactory().get('/api/x/'))
+        self.assertEqual(result.content, body)
+        self.assertEqual(result['Vary'], 'Accept-Encoding')
+    
+    def test_secret_bearing_responses_not_compressed(self):
+        """Admin pages, HTML and non-GET answers are never compressed (BREACH)"""
+        body = b'x' * 5000
+        factory = RequestFactory()
+        for request, content_type in [
+            (factory.get('/admin/', HTTP_ACCEPT_ENCODING='gzip'), 'text/html; charset=utf-8'),
+            (factory.get('/admin/x/', HTTP_ACCEPT_ENCODING='gzip'), 'application/json'),
+            (factory.get('/api/x/', HTTP_ACCEPT_ENCODING='gzip'), 'text/html; charset=utf-8'),
+            (factory.post('/api/token/', HTTP_ACCEPT_ENCODING='gzip'), 'application/json'),
+        ]:
+            with self.subTest(method=request.method, path=request.path, content_type=content_type):
+                response = HttpResponse(body, content_type=content_type)
+                result = CompressionMiddleware(lambda request: response)(request)
+                self.assertEqual(result.content, body)
+                self.assertNotIn('Content-Encoding', result)
+        
+        response = self.client.get('/admin/login/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Encoding', response)
+
+
+class WarmCacheCommandTests(TestCase):
+    """Tests for the warm_cache management command"""
+    
+    def setUp(self):
+        """Seed a few objects and start from an empty cache"""
+        cache.clear()
+        self.event = Event.objects.create(title_en='Zikr', title_ur='ذکر')
+        AboutSection.objects.create(title_en='Silsila', title_ur='سلسلہ')
+    
+    def test_discovers_list_and_detail_urls(self):
+        """Every cached list endpoint and detail page is found"""
+        urls = get_public_urls()
+        for url in ['/api/events/events/', f'/api/events/events/{self.event.pk}/',
+                    '/api/about/sections/', '/api/about/current-nasheen/',
+                    '/api/about/previous-nasheen/', '/api/publications/publications/',
+                    '/api/video-audios/audios/', '/api/video-audios/videos/',
+                    '/api/gallery/', '/api/photos/collections/']:
+            self.assertIn(url, urls)
+    
+    def test_warmed_endpoints_are_cache_hits(self):
+        """After warming, requests are served from the cache"""
+        out = StringIO()
+        call_command('warm_cache', '--concurrency', '1', '--host', 'testserver', '--scheme', 'http', stdout=out)
+        self.assertIn('/api/events/events/', out.getvalue())
+        self.assertIn('Warmed', out.getvalue())
+        
+        cache_stats.reset()
+        with self.assertNumQueries(0):
+            response = APIClient().get('/api/events/events/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_cache_stats()['hits'], 1)
+    
+    @override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver'])
+    def test_warmed_https_entries_hit_behind_proxy(self):
+        """Entries warmed for https:// are hit by plain http requests forwarded by a TLS proxy"""
+        call_command('warm_cache', '--concurrency', '1', stdout=StringIO())
+        cache_stats.reset()
+        with self.assertNumQueries(0):
+            response = APIClient().get(
+                '/api/events/events/', HTTP_HOST='testserver', HTTP_X_FORWARDED_PROTO='https'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_cache_stats()['hits'], 1)
+
+
+class BenchmarkCommandTests(TestCase):
+    """Tests for the serializer and media URL benchmark commands"""
+    
+    def test_reports_and_rolls_back(self):
+        """Every model is measured and the seeded rows are removed again"""
+        out = StringIO()
+        call_command('benchmark_serializers', rows=20, repeat=1, stdout=out)
+        self.assertEqual(out.getvalue().count('rows/s'), 6)
+        self.assertNotIn('differs', out.getvalue())
+        self.assertFalse(Event.objects.exists())
+    
+    def test_media_url_benchmark(self):
+        """The gallery benchmark checks its output and rolls back"""
+        out = StringIO()
+        call_command('benchmark_media_urls', rows=20, repeat=1, stdout=out)
+        self.assertIn('builder (warm)', out.getvalue())
+        self.assertNotIn('differs', out.getvalue())
+        self.assertFalse(GalleryCollection.objects.exists())
+
+
+class HomeBundleTests(TestCase):
+    """Tests for the aggregated /api/home/ endpoint"""
+    
+    def setUp(self):
+        """Seed one object per section and start from an empty cache"""
+        cache.clear()
+        self.client = APIClient()
+        self.event = Event.objects.create(title_en='Zikr', title_ur='ذکر')
+        AboutSection.objects.create(title_en='Silsila', title_ur='سلسلہ')
+    
+    def test_returns_every_section(self):
+        """All home page sections come back in one response"""
+        response = self.client.get('/api/home/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data), {
+            'about_sections', 'current_nasheen', 'events',
+            'latest_audios', 'latest_videos', 'latest_publications',
+        })
+        self.assertEqual(data['events'][0]['title']['english'], 'Zikr')
+        self.assertEqual(data['about_sections'][0]['title_en'], 'Silsila')
+        self.assertIsNone(data['current_nasheen'])
+    
+    def test_edit_only_recomputes_its_section(self):
+        """Changing an event re-queries events only"""
+        self.client.get('/api/home/')
+        self.event.title_en = 'Weekly Zikr'
+        self.event.save()
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/home/')
+        self.assertEqual(response.json()['events'][0]['title']['english'], 'Weekly Zikr')
+
+
+class PublishedSnapshotTests(TestCase):
+    """Tests for the write-time JSON snapshots of low-churn endpoints"""
+    
+    base_url = 'http://testserver'
+    
+    def setUp(self):
+        """Seed an event and its snapshot, start from an empty cache"""
+        self.client = APIClient()
+        with mock.patch('core.signals.refresh_snapshots'), self.captureOnCommitCallbacks(execute=True):
+            self.event = Event.objects.create(title_en='Zikr', title_ur='ذکر')
+        refresh_snapshots(base_url=self.base_url)
+        cache.clear()
+    
+    def test_refresh_stores_rendered_bodies(self):
+        """Every snapshot endpoint is stored, byte-identical to the view output"""
+        self.assertEqual(
+            set(PublishedSnapshot.objects.values_list('key', flat=True)),
+            {'about.sections', 'about.current-nasheen', 'about.previous-nasheen', 'events.events'},
+        )
+        snapshot = PublishedSnapshot.objects.get(pk='events.events')
+        PublishedSnapshot.objects.all().delete()
+        self.assertEqual(self.client.get('/api/events/events/').content.decode(), snapshot.content)
+        self.assertEqual(refresh_snapshots(['events.events'], self.base_url), {'events.events': 'updated'})
+        self.assertEqual(refresh_snapshots(['events.events'], self.base_url), {'events.events': 'unchanged'})
+    
+    def test_cold_cache_served_from_snapshot(self):
+        """A cache miss costs a single primary key lookup"""
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/events/events/')
+        self.assertEqual(response.json()[0]['title']['english'], 'Zikr')
+        with self.assertNumQueries(0):
+            self.client.get('/api/events/events/')
+    
+    def test_other_host_not_served_from_snapshot(self):
+        """Snapshots embed absolute URLs, so they only serve their own host"""
+        with self.settings(ALLOWED_HOSTS=['testserver', 'other.example.com']):
+            with self.assertNumQueries(2):
+                response = self.client.get('/api/events/events/', HTTP_HOST='other.example.com')
+        self.assertEqual(response.status_code, 200)
+    
+    @override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver'], SNAPSHOT_BASE_URL='')
+    def test_https_snapshot_served_behind_proxy(self):
+        """Snapshots rendered for the default https:// base URL serve requests forwarded by a TLS proxy"""
+        self.assertEqual(refresh_snapshots(['events.events']), {'events.events': 'updated'})
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                '/api/events/events/', HTTP_HOST='testserver', HTTP_X_FORWARDED_PROTO='https'
+            )
+        self.assertEqual(response.json()[0]['title']['english'], 'Zikr')
+    
+    @override_settings(SNAPSHOT_BASE_URL=base_url)
+    def test_save_rebuilds_snapshot_on_commit(self):
+        """A change drops the snapshot at once and rebuilds it after commit"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.title_en = 'Weekly Zikr'
+            self.event.save()
+            self.assertFalse(PublishedSnapshot.objects.filter(pk='events.events').exists())
+        self.assertIn('Weekly Zikr', PublishedSnapshot.objects.get(pk='events.events').content)
+        self.assertTrue(PublishedSnapshot.objects.filter(pk='about.sections').exists())
+    
+    def test_snapshots_refreshed_once_per_commit(self):
+        """Saving many rows in one transaction re-renders their snapshots once"""
+        with mock.patch('core.signals.refresh_snapshots') as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(3):
+                    Event.objects.create(title_en=f'Zikr {i}', title_ur='ذکر')
+                AboutSection.objects.create(title_en='Silsila', title_ur='سلسلہ')
+            refresh.assert_called_once_with({'events.events', 'about.sections'})
+            
+            # Keys of a rolled back savepoint are not refreshed
+            refresh.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    Event.objects.create(title_en='Zikr', title_ur='ذکر')
+                    raise RuntimeError
+                AboutSection.objects.create(title_en='Silsila', title_ur='سلسلہ')
+            refresh.assert_called_once_with({'about.sections'})
+    
+    def test_failed_refresh_does_not_fail_write(self):
+        """A render error after the commit is logged, the write stands"""
+        with mock.patch('core.signals.refresh_snapshots', side_effect=RuntimeError('render failed')):
+            with self.assertLogs('core.signals', level='WARNING'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.event.title_en = 'Weekly Zikr'
+                    self.event.save()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.title_en, 'Weekly Zikr')
+    
+    def test_cache_outage_served_from_snapshot(self):
+        """If the cache backend is down, throttling lets the request through and the snapshot is served"""
+        down = mock.Mock(side_effect=ConnectionError('down'))
+        methods = ['add', 'get', 'get_many', 'set', 'set_many', 'touch', 'incr', 'has_key', 'delete']
+        with mock.patch.multiple(LRUMemoryCache, **dict.fromkeys(methods, down)):
+            with self.assertNumQueries(1):
+                response = self.client.get('/api/events/events/')
+        self.assertTrue(down.called)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['title']['english'], 'Zikr')
+
+
+class SearchTests(TestCase):
+    """Tests for the /api/search/ endpoint"""
+    
+    def setUp(self):
+        """Seed matching and non-matching content in English and Urdu"""
+        cache.clear()
+        self.client = APIClient()
+        today = datetime.date(2024, 1, 1)
+        Event.objects.create(title_en='Weekly Zikr', title_ur='ہفتہ وار ذکر')
+        Event.objects.create(title_en='Old Zikr', title_ur='ذکر', is_active=False)
+        Publication.objects.create(
+            title_en='Book', title_ur='کتاب', file='publications/book.pdf',
+            description_en='On the etiquette of zikr', description_ur='...', category='book',
+        )
+        for i in range(7):
+            Audio.objects.create(english_title=f'Zikr session {i}', urdu_title='ذکر', audio_file='audios/a.mp3',
+                                 category='Dhikr', date=today)
+        Video.objects.create(english_title='Bayaan', urdu_title='بیان', youtube_url='https://youtu.be/x',
+                             category='Bayaan', date=today)
+        section = AboutSection.objects.create(title_en='Silsila', title_ur='سلسلہ')
+        AboutSubSection.objects.create(section=section, title_en='Lineage', title_ur='شجرہ',
+                                       content_en='The practice of zikr', content_ur='...')
+    
+    def test_results_grouped_by_type(self):
+        """Every content type is searched, active content only"""
+        data = self.client.get('/api/search/', {'q': 'zikr'}).json()
+        self.assertEqual(data['query'], 'zikr')
+        counts = {name: group['count'] for name, group in data['results'].items()}
+        self.assertEqual(counts, {
+            'publications': 1, 'audios': 7, 'videos': 0,
+            'events': 1, 'about_sections': 0, 'about_subsections': 1,
+        })
+        self.assertEqual(len(data['results']['audios']['results']), 5)
+        self.assertIn('type=audios', data['results']['audios']['more'])
+        self.assertIsNone(data['results']['events']['more'])
+        self.assertEqual(data['results']['about_subsections']['results'][0]['section'], AboutSection.objects.get().pk)
+    
+    def test_urdu_query(self):
+        """Urdu text is searchable"""
+        data = self.client.get('/api/search/', {'q': 'بیان'}).json()
+        self.assertEqual(data['results']['videos']['count'], 1)
+    
+    def test_single_type_is_paginated(self):
+        """?type= pages through the matches of one content type"""
+        data = self.client.get('/api/search/', {'q': 'zikr', 'type': 'audios', 'page_size': 4}).json()
+        self.assertEqual(data['count'], 7)
+        self.assertEqual(len(data['results']), 4)
+        self.assertIsNotNone(data['next'])
+        response = self.client.get('/api/search/', {'q': 'zikr', 'type': 'unknown'})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_short_query_runs_no_queries(self):
+        """Empty and one-letter queries return empty groups without touching the database"""
+        with self.assertNumQueries(0):
+            data = self.client.get('/api/search/', {'q': ' z '}).json()
+        self.assertEqual({group['count'] for group in data['results'].values()}, {0})
+    
+    def test_query_budget(self):
+        """A search stays within the view's query budget"""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/search/', {'q': 'zikr'})
+        self.assertLessEqual(len(queries), SearchView.query_budget)
+    
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'Full-text ranking needs PostgreSQL')
+    def test_stemmed_and_ranked(self):
+        """English words match their stems, title matches rank above description matches"""
+        data = self.client.get('/api/search/', {'q': 'sessions'}).json()
+        self.assertEqual(data['results']['audios']['count'], 7)
+        Publication.objects.create(
+            title_en='Zikr', title_ur='ذکر', file='publications/zikr.pdf',
+            description_en='...', description_ur='...', category='book',
+        )
+        cache.clear()
+        data = self.client.get('/api/search/', {'q': 'zikr', 'type': 'publications'}).json()
+        self.assertEqual([p['title_en'] for p in data['results']], ['Zikr', 'Book'])
+
+
+class TextNormalizationTests(TestCase):
+    """Tests for the Urdu-aware normalized title columns"""
+    
+    def test_spelling_variants_fold_together(self):
+        """Arabic/Urdu letters, aerab, tatweel, ZWNJ, digits and case all fold away"""
+        self.assertEqual(normalize_text('كتاب'), normalize_text('کتاب'))  # Arabic kaf
+        self.assertEqual(normalize_text('ذِکْر'), normalize_text('ذکر'))  # zer, sukun
+        self.assertEqual(normalize_text('ہفتہ\u200cوار'), normalize_text('ہفتہوار'))  # ZWNJ
+        self.assertEqual(normalize_text('مـــحمد'), normalize_text('محمد'))  # tatweel
+        self.assertEqual(normalize_text('علي'), normalize_text('علی'))  # Arabic yeh
+        self.assertEqual(normalize_text('ﻛﺘﺎﺏ'), normalize_text('کتاب'))  # presentation forms
+        self.assertEqual(normalize_text(' Weekly  ZIKR ۱۲ '), 'weekly zikr 12')
+    
+    def test_filled_on_save_and_looked_up_exactly(self):
+        """Saving fills the normalized columns, lookups probe them with the normalized input"""
+        Audio.objects.create(english_title='Weekly Zikr', urdu_title='ہفتہ وار ذِكر', audio_file='audios/a.mp3',
+                             category='Dhikr', date=datetime.date(2024, 1, 1))
+        audio = Audio.objects.get(normalized_title_ur=normalize_text('ہفتہ وار ذکر'))
+        self.assertEqual(audio.normalized_title_en, 'weekly zikr')
+        self.assertTrue(Audio.objects.filter(normalized_title_ur__startswith=normalize_text('ہفتہ')).exists())
+    
+    def test_search_matches_spelling_variants(self):
+        """Searching with one spelling finds titles entered with another"""
+        Publication.objects.create(
+            title_en='Book', title_ur='كتاب', file='publications/book.pdf',
+            description_en='...', description_ur='...', category='book',
+        )
+        data = APIClient().get('/api/search/', {'q': 'کتاب', 'type': 'publications'}).json()
+        self.assertEqual(data['count'], 1)
+
+
+class SuggestTests(TestCase):
+    """Tests for the /api/suggest/ typeahead endpoint"""
+    
+    def setUp(self):
+        """Seed titles of every type, start from empty caches"""
+        cache.clear()
+        prefix_cache.clear()
+        self.client = APIClient()
+        today = datetime.date(2024, 1, 1)
+        self.audio = Audio.objects.create(english_title='Zikr Majlis', urdu_title='مجلس ذكر', audio_file='audios/a.mp3',
+                                          category='Dhikr', date=today)
+        Video.objects.create(english_title='Weekly Zikr', urdu_title='ہفتہ وار ذکر', youtube_url='https://youtu.be/x',
+                             category='Dhikr', date=today)
+        Publication.objects.create(
+            title_en='Zikr and its Etiquette', title_ur='ذکر کے آداب', file='publications/book.pdf',
+            description_en='...', description_ur='...', category='book',
+        )
+    
+    def _suggest(self, q, **params):
+        return self.client.get('/api/suggest/', {'q': q, **params}).json()['results']
+    
+    def test_prefix_matches_rank_first(self):
+        """Short queries match title prefixes, prefix matches come before substring ones"""
+        self.assertEqual([r['type'] for r in self._suggest('zi')], ['audio', 'publication'])
+        results = self._suggest('zikr')
+        self.assertEqual([r['type'] for r in results], ['audio', 'publication', 'video'])
+        self.assertEqual(results[0], {'type': 'audio', 'id': self.audio.pk,
+                                      'title_en': 'Zikr Majlis', 'title_ur': 'مجلس ذكر'})
+        self.assertEqual(len(self._suggest('zikr', limit=1)), 1)
+    
+    def test_urdu_spelling_variants(self):
+        """Urdu queries match titles typed with other Unicode forms"""
+        self.assertEqual(len(self._suggest('ذکر')), 3)  # Urdu kaf matches the Arabic kaf title
+    
+    def test_keystrokes_served_from_prefix_cache(self):
+        """Repeated and extended queries don't query the database"""
+        with self.assertNumQueries(1):
+            self._suggest('zik')
+        with self.assertNumQueries(0):
+            self._suggest('zik')
+            self._suggest('zikr')
+            results = self._suggest('zikr maj')
+        self.assertEqual([r['id'] for r in results], [self.audio.pk])
+        self.assertEqual(prefix_cache.get_stats()['misses'], 1)
+    
+    def test_incomplete_prefix_is_not_filtered(self):
+        """A prefix with more than CANDIDATE_LIMIT matches is not used to answer longer queries"""
+        Audio.objects.bulk_create([
+            Audio(english_title=f'Zikr {i}', urdu_title='ذکر', normalized_title_en=f'zikr {i}',
+                  audio_file='audios/a.mp3', category='Dhikr', date=datetime.date(2024, 1, 1))
+            for i in range(CANDIDATE_LIMIT)
+        ])
+        self._suggest('zik')
+        with self.assertNumQueries(1):
+            self._suggest('zikr')
+    
+    def test_title_change_invalidates(self):
+        """Saving a title drops the cached suggestions"""
+        self._suggest('maj')
+        self.audio.english_title = 'Zikr Gathering'
+        self.audio.save()
+        self.assertEqual(self._suggest('maj'), [])
+    
+    def test_throttle_does_not_lock_out_other_endpoints(self):
+        """Reaching the typeahead limit leaves the rest of the API answering"""
+        with mock.patch.dict(SuggestThrottle.THROTTLE_RATES, {'anon': '5/hour', 'suggest': '5/hour'}):
+            for _ in range(5):
+                self.assertEqual(self.client.get('/api/suggest/', {'q': 'zikr'}).status_code, 200)
+            self.assertEqual(self.client.get('/api/suggest/', {'q': 'zikr'}).status_code, 429)
+            self.assertEqual(self.client.get('/api/events/events/').status_code, 200)
+
+
+class ReplicaRoutingTests(TestCase):
+    """Tests for the read-replica router and its request middleware"""
+    
+    def setUp(self):
+        """Enable routing as if REPLICA_DATABASE_URL were set"""
+        cache.clear()
+        caches['default'].clear()
+        self.router = ReplicaRouter()
+        for target in ('khanqah_backend.db_router.replica_enabled', 'core.middleware.replica_enabled'):
+            patcher = mock.patch(target, return_value=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(set_read_replica, False)
+    
+    def test_public_reads_use_replica(self):
+        """Only the public apps are read from the replica, and only when allowed"""
+        self.assertEqual(self.router.db_for_read(Event), 'default')
+        set_read_replica(True)
+        self.assertEqual(self.router.db_for_read(Event), 'replica')
+        self.assertEqual(self.router.db_for_read(User), 'default')
+    
+    def test_write_pins_request_to_primary(self):
+        """Reads after a write in the same request see the write"""
+        set_read_replica(True)
+        self.assertEqual(self.router.db_for_write(Event), 'default')
+        self.assertEqual(self.router.db_for_read(Event), 'default')
+    
+    def _login(self):
+        """A write: the admin login updates last_login"""
+        User.objects.create_user('editor', password='x', is_staff=True)
+        return Client().post('/admin/login/', {'username': 'editor', 'password': 'x'})
+    
+    def test_write_sets_pin_cookie(self):
+        """A write keeps the client, and with a shared cache everyone else, on the primary"""
+        with mock.patch('core.middleware.is_shared_cache', return_value=True):
+            response = self._login()
+            self.assertIn('primary_pin', response.cookies)
+            
+            with mock.patch('core.middleware.set_read_replica') as set_replica:
+                APIClient().get('/api/events/events/')
+        set_replica.assert_any_call(False)
+        self.assertNotIn(mock.call(True), set_replica.call_args_list)
+    
+    def test_no_global_pin_without_shared_cache(self):
+        """A per-process cache pins only the writing client"""
+        self.assertFalse(is_shared_cache(caches['default']))
+        self.assertIn('primary_pin', self._login().cookies)
+        self.assertIsNone(caches['default'].get(ReplicaRoutingMiddleware.PIN_CACHE_KEY))
+        with mock.patch('core.middleware.set_read_replica') as set_replica:
+            APIClient().get('/api/events/events/')
+        self.assertEqual(set_replica.call_args_list[0], mock.call(True))
+    
+    def test_cache_failure_reads_primary(self):
+        """If the pin can't be read or written the request still succeeds, on the primary"""
+        down = mock.Mock(side_effect=ConnectionError('down'))
+        with mock.patch('core.middleware.is_shared_cache', return_value=True), \
+                mock.patch.object(LRUMemoryCache, 'get', down), mock.patch.object(LRUMemoryCache, 'set', down), \
+                mock.patch('core.middleware.set_read_replica') as set_replica:
+            with self.assertLogs('core.middleware', 'WARNING') as logs:
+                with mock.patch('core.middleware.has_written', return_value=False):
+                    response = ReplicaRoutingMiddleware(lambda request: HttpResponse('ok'))(
+                        RequestFactory().get('/api/events/events/')
+                    )
+                self.assertEqual(response.status_code, 200)
+                with mock.patch('core.middleware.has_written', return_value=True):
+                    response = ReplicaRoutingMiddleware(lambda request: HttpResponse('ok'))(
+                        RequestFactory().post('/contact/send-message/')
+                    )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('primary_pin', response.cookies)
+        self.assertEqual(set_replica.call_args_list[0], mock.call(False))
+        self.assertEqual(len(logs.records), 2)
+    
+    def test_reads_without_recent_writes_use_replica(self):
+        """Anonymous GETs are marked replica-safe, the admin never is"""
+        with mock.patch('core.middleware.set_read_replica') as set_replica:
+            Client().get('/api/events/events/')
+            Client().get('/admin/login/')
+        self.assertEqual(set_replica.call_args_list[0], mock.call(True))
+        self.assertEqual(set_replica.call_args_list[2], mock.call(False))
+
+
+@unittest.skipUnless('replica' in settings.DATABASES, 'needs REPLICA_DATABASE_URL')
+@override_settings(REPLICA_READS=True)
+class ReplicaDatabaseTests(TestCase):
+    """
+    End-to-end routing with a second database configured. Run the suite with
+    REPLICA_DATABASE_URL set and REPLICA_READS=False, so that only this class
+    reads from the replica.
+    """
+    databases = '__all__'
+    
+    def setUp(self):
+        cache.clear()
+        caches['default'].clear()
+    
+    def test_list_queries_run_on_replica(self):
+        """A public list is read through the replica connection"""
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            response = Client().get('/api/events/events/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(any('events_event' in q['sql'] for q in replica_queries.captured_queries))
+
+
+class QueryBudgetTests(TestCase):
+    """Every public API endpoint must declare a query budget and stay within it"""
+    
+    # Rows per model; large enough for an N+1 to blow any budget
+    rows = 5
+    
+    # Views from DRF and drf-yasg, which can't declare a budget themselves
+    framework_budgets = {APIRootView: 0, schema_view: 0}
+    
+    # Query strings for endpoints that do nothing without one
+    route_queries = {
+        '/api/search/': '?q=Book',
+        '/api/suggest/': '?q=Boo',
+    }
+    
+    def setUp(self):
+        """Seed several rows of every model with children"""
+        cache.clear()
+        self.client = APIClient()
+        today = datetime.date(2024, 1, 1)
+        CurrentNasheen.objects.create(name_en='Nasheen', name_ur='نشین', description_en='...', description_ur='...')
+        for i in range(self.rows):
+            section = AboutSection.objects.create(title_en=f'Section {i}', title_ur='حصہ', order=i)
+            PreviousNasheen.objects.create(name_en=f'Nasheen {i}', name_ur='نشین', order=i)
+            Event.objects.create(title_en=f'Event {i}', title_ur='تقریب')
+            Publication.objects.create(
+                title_en=f'Book {i}', title_ur='کتاب', file='publications/book.pdf',
+                description_en='...', description_ur='...', category='book',
+            )
+            Audio.objects.create(english_title=f'Audio {i}', urdu_title='آڈیو',
+                                 audio_file='audios/a.mp3', category='Bayaan', date=today)
+            Video.objects.create(english_title=f'Video {i}', urdu_title='ویڈیو',
+                                 youtube_url='https://youtu.be/x', category='Bayaan', date=today)
+            gallery = GalleryCollection.objects.create(name_en=f'Gallery {i}', name_ur='گیلری')
+            collection = Collection.objects.create(name_en=f'Collection {i}', name_ur='مجموعہ')
+            for j in range(self.rows):
+                AboutSubSection.objects.create(section=section, title_en=f'Sub {j}', title_ur='ذیلی',
+                                               content_en='...', content_ur='...')
+                GalleryImage.objects.create(collection=gallery, image=f'gallery/images/{j}.jpg')
+                Photo.objects.create(collection=collection, image=f'photos/{j}.jpg')
+    
+    def _urls(self, route):
+        if not route.params:
+            return [route.template + self.route_queries.get(route.template, '')]
+        urls = [route.template.format(pk=pk) for pk in get_detail_pks(route, 1)]
+        self.assertTrue(urls, f'No rows to request {route.template} with')
+        return urls
+    
+    def _is_public(self, view_class):
+        return all(issubclass(permission, AllowAny) for permission in view_class.permission_classes)
+    
+    def test_routes_within_query_budget(self):
+        """Cold (uncached) requests run no more queries than the view's budget"""
+        checked = set()
+        for route in iter_api_routes():
+            if not self._is_public(route.view_class):
+                continue
+            budget = getattr(route.view_class, 'query_budget', self.framework_budgets.get(route.view_class))
+            self.assertIsNotNone(budget, f'{route.view_class.__name__} ({route.template}) declares no query_budget')
+            checked.add(route.view_class.__name__)
+            for url in self._urls(route):
+                with self.subTest(url=url):
+                    cache.clear()
+                    with CaptureQueriesContext(connection) as queries:
+                        response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertLessEqual(
+                        len(queries), budget,
+                        f'{url} ran {len(queries)} queries (budget {budget}):\n'
+                        + '\n'.join(q['sql'] for q in queries.captured_queries),
+                    )
+        # Views outside iter_cached_routes() are checked too
+        self.assertTrue({'HomeView', 'SearchView', 'SuggestView', 'PublicationList'} <= checked, checked)
+    
+    @override_settings(QUERY_COUNT_HEADERS=True)
+    def test_diagnostic_headers(self):
+        """Query count, budget and timing are sent when enabled"""
+        response = self.client.get('/api/events/events/')
+        self.assertEqual(response['X-DB-Queries'], '2')
+        self.assertEqual(response['X-DB-Query-Budget'], '2')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[0-9.]+;desc="2 queries"$')
+    
+    @override_settings(QUERY_COUNT_HEADERS=False)
+    def test_headers_only_for_staff_when_disabled(self):
+        """Anonymous users get no diagnostics, staff users do"""
+        response = self.client.get('/api/events/events/')
+        self.assertNotIn('X-DB-Queries', response)
+        
+        staff = User.objects.create_user('staff', password='x', is_staff=True)
+        self.client.force_authenticate(staff)
+        response = self.client.get('/api/events/events/')
+        self.assertIn('X-DB-Queries', response)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'EXPLAIN plans are checked on PostgreSQL only')
+class IndexUsageTests(TestCase):
+    """The public endpoint queries are answered from their indexes"""
+    
+    rows = 5000
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Seed enough rows that a sequential scan is clearly the slower plan"""
+        today = datetime.date(2024, 1, 1)
+        # Only a few rows are active, as with years of archived events
+        Event.objects.bulk_create([
+            Event(title_en=f'Event {i}', title_ur='تقریب', order=i, is_active=i % 100 == 0)
+            for i in range(cls.rows)
+        ])
+        AboutSection.objects.bulk_create([
+            AboutSection(title_en=f'Section {i}', title_ur='حصہ', order=i, is_active=i % 100 == 0)
+            for i in range(cls.rows)
+        ])
+        cls.section = AboutSection.objects.filter(is_active=True).first()
+        AboutSubSection.objects.bulk_create([
+            AboutSubSection(section=cls.section, title_en=f'Sub {i}', title_ur='ذیلی',
+                            content_en='...', content_ur='...', order=i, is_active=i % 100 == 0)
+            for i in range(cls.rows)
+        ])
+        PreviousNasheen.objects.bulk_create([
+            PreviousNasheen(name_en=f'Nasheen {i}', name_ur='نشین', order=i, is_active=i % 100 == 0)
+            for i in range(cls.rows)
+        ])
+        Audio.objects.bulk_create([
+            Audio(english_title=f'Audio {i}', urdu_title='آڈیو', audio_file='audios/a.mp3',
+                  category=['Bayaan', 'Dhikr', 'Event'][i % 3], date=today - datetime.timedelta(days=i))
+            for i in range(cls.rows)
+        ])
+        Video.objects.bulk_create([
+            Video(english_title=f'Video {i}', urdu_title='ویڈیو', youtube_url='https://youtu.be/x',
+                  category=['Bayaan', 'Dhikr', 'Event'][i % 3], date=today - datetime.timedelta(days=i))
+            for i in range(cls.rows)
+        ])
+        Collection.objects.bulk_create([
+            Collection(name_en=f'Collection {i}', name_ur='مجموعہ', created_at=today - datetime.timedelta(days=i))
+            for i in range(cls.rows)
+        ])
+        cls.collection = Collection.objects.first()
+        Photo.objects.bulk_create([
+            Photo(collection_id=cls.collection.pk + i % 50, image=f'photos/{i}.jpg') for i in range(cls.rows)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+    
+    def assertEndpointUsesIndex(self, url, table, index_name):
+        """EXPLAIN the query the endpoint itself runs on table (the last one, e.g. the page after its count)"""
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        statements = [query['sql'] for query in queries.captured_queries if f'FROM "{table}"' in query['sql']]
+        self.assertTrue(statements, f'{url} ran no query on {table}')
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN {statements[-1]}')
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        self.assertIn(index_name, plan, f'{url}\n{statements[-1]}\n{plan}')
+    
+    def test_active_ordered_lists(self):
+        """is_active lists ORDER BY order, id use the partial indexes"""
+        for url, table, index_name in [
+            ('/api/events/events/', 'events_event', 'event_active_order_idx'),
+            ('/api/about/sections/', 'about_aboutsection', 'aboutsection_active_order_idx'),
+            ('/api/about/sections/', 'about_aboutsubsection', 'aboutsub_active_order_idx'),
+            ('/api/about/previous-nasheen/', 'about_previousnasheen', 'prevnasheen_active_order_idx'),
+        ]:
+            with self.subTest(url=url, table=table):
+                self.assertEndpointUsesIndex(url, table, index_name)
+    
+    def test_media_pages(self):
+        """Audio/Video pages (optionally by category) and collection image pages use their indexes"""
+        for path, table, prefix in [('audios', 'video_audios_audio', 'audio'), ('videos', 'video_audios_video', 'video')]:
+            with self.subTest(path=path):
+                self.assertEndpointUsesIndex(f'/api/video-audios/{path}/', table, f'{prefix}_date_id_idx')
+                self.assertEndpointUsesIndex(
+                    f'/api/video-audios/{path}/?category=Dhikr', table, f'{prefix}_cat_date_id_idx',
+                )
+        self.assertEndpointUsesIndex(
+            f'/api/photos/collections/{self.collection.pk}/images/', 'photos_photo', 'photo_collection_id_idx',
+        )
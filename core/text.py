@@ -0,0 +1,70 @@
+"""
+Urdu-aware text normalization for search and lookups.
+
+The same Urdu word reaches the database in several Unicode spellings:
+Arabic vs Farsi yeh and kaf, with or without aerab (diacritics), with
+tatweel or zero-width joiners, in presentation forms pasted from PDFs.
+normalize_text() folds all of them (and English case) into one form.
+
+Models list the columns to keep a normalized copy of:
+
+    class Audio(models.Model):
+        normalized_fields = {'normalized_title_en': 'english_title',
+                             'normalized_title_ur': 'urdu_title'}
+
+The copies are filled on save (core/signals.py) and indexed, so a lookup
+normalizes its input the same way and probes the index with an exact or
+prefix match instead of scanning with icontains. bulk_create() and
+queryset.update() bypass save(); rows written that way need the copies
+set explicitly.
+"""
+import re
+import unicodedata
+
+# Letters with an Arabic and an Urdu/Farsi code point, folded to the Urdu one
+_LETTER_MAP = {
+    'ي': 'ی',  # ARABIC LETTER YEH -> FARSI YEH
+    'ى': 'ی',  # ARABIC LETTER ALEF MAKSURA -> FARSI YEH
+    'ك': 'ک',  # ARABIC LETTER KAF -> KEHEH
+    'ه': 'ہ',  # ARABIC LETTER HEH -> HEH GOAL
+    'ة': 'ۃ',  # ARABIC LETTER TEH MARBUTA -> TEH MARBUTA GOAL
+}
+
+# Arabic-Indic and Extended Arabic-Indic (Urdu) digits -> ASCII
+_DIGIT_MAP = {
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+    **{chr(0x06f0 + i): str(i) for i in range(10)},
+}
+
+# Invisible characters that only affect rendering
+_REMOVED = {
+    'ـ',  # ARABIC TATWEEL
+    '­',  # SOFT HYPHEN
+    '​',  # ZERO WIDTH SPACE
+    '‌',  # ZERO WIDTH NON-JOINER
+    '‍',  # ZERO WIDTH JOINER
+    '‎',  # LEFT-TO-RIGHT MARK
+    '‏',  # RIGHT-TO-LEFT MARK
+    '﻿',  # ZERO WIDTH NO-BREAK SPACE (BOM)
+}
+
+_TRANSLATION = str.maketrans({**_LETTER_MAP, **_DIGIT_MAP, **{c: None for c in _REMOVED}})
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(value):
+    """
+    Fold a string to its search form:
+    compatibility forms decomposed, diacritics (aerab, hamza/madda marks)
+    and invisible characters removed, Arabic letters mapped to their Urdu
+    counterparts, digits to ASCII, case folded, whitespace collapsed.
+    """
+    if not value:
+        return ''
+    # NFKD splits presentation forms and letters with marks (e.g. ئ -> ي + hamza)
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(c for c in value if unicodedata.category(c) != 'Mn')
+    value = value.translate(_TRANSLATION).casefold()
+    value = unicodedata.normalize('NFC', value)
+    return _WHITESPACE.sub(' ', value).strip()
@@ -0,0 +1,34 @@
+"""
+Rate throttles that fail open
+
+DRF's rate throttles keep their request history in the default cache and
+run in APIView.initial(), before the view. With Redis down every request
+would fail there, so the snapshot fallback of CacheMixin (core/snapshots.py)
+could never be reached. These throttles let the request through and log a
+warning instead; endpoints that must stay limited during an outage (the
+contact form) keep DRF's throttles.
+"""
+import logging
+
+from rest_framework import throttling
+
+logger = logging.getLogger(__name__)
+
+
+class FailOpenThrottleMixin:
+    """Allow the request when the throttle's cache can't be read or written"""
+
+    def allow_request(self, request, view):
+        try:
+            return super().allow_request(request, view)
+        except Exception as e:
+            logger.warning(f"Throttle cache unavailable, not throttling {request.path}: {e}")
+            return True
+
+
+class AnonRateThrottle(FailOpenThrottleMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(FailOpenThrottleMixin, throttling.UserRateThrottle):
+    pass
@@ -1,6 +1,10 @@
 from django.urls import path
-from .views import PublicationList
+from .views import HomeView, MetricsView, PublicationList, SearchView, SuggestView
 
 urlpatterns = [
     path('publications/', PublicationList.as_view(), name='publication-list'),
+    path('home/', HomeView.as_view(), name='home'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('suggest/', SuggestView.as_view(), name='suggest'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
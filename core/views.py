@@ -1,15 +1,42 @@
 from rest_framework import generics
-from django.http import FileResponse, Http404, HttpResponseForbidden
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework.views import APIView
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
 from django.views.decorators.clickjacking import xframe_options_exempt
 from django.views.decorators.http import require_http_methods
 from django.conf import settings
+from django.utils.cache import get_conditional_response
 from django.utils.text import get_valid_filename
 import os
+import stat
 import logging
 import mimetypes
 from pathlib import Path
 
+from about.models import AboutSection, AboutSubSection, CurrentNasheen
+from about.serializers import AboutSectionSerializer, CurrentNasheenSerializer
+from about.views import get_active_sections
+from events.models import Event
+from events.serializers import EventFastSerializer
+from publications.models import Publication as PublicationItem
+from publications.serializers import PublicationFastSerializer
+from video_audios.models import Audio, Video
+from video_audios.serializers import AudioFastSerializer, VideoFastSerializer
+
+from .cache_utils import CacheMixin, cache, get_cache_stats, get_version_token
+from .db_pool import get_pool_stats
+from .media_files import (
+    RangeNotSatisfiable, file_etag, if_range_matches, offload_response, parse_range_header,
+    partial_response, range_not_satisfiable, set_validators,
+)
 from .models import Publication
+from .pagination import SearchPagination
+from .search import SEARCH_GROUPS, SEARCH_MODELS, clean_query, search
+from .suggest import DEFAULT_LIMIT, MAX_LIMIT, suggest
+from .throttling import AnonRateThrottle
 from .serializers import PublicationSerializer
 
 logger = logging.getLogger(__name__)
@@ -32,6 +59,211 @@ ALLOWED_MEDIA_EXTENSIONS = {
 class PublicationList(generics.ListAPIView):
     queryset = Publication.objects.all()
     serializer_class = PublicationSerializer
+    query_budget = 1
+
+
+class HomeView(CacheMixin, APIView):
+    """
+    Everything the home page needs in a single request:
+    about sections, current nasheen, events and the latest audios,
+    videos and publications.
+
+    The combined response is cached as one entry. Each section is also
+    cached on its own, keyed by the versions of its own models, so when
+    one model changes only that section is queried again.
+    """
+    cache_key_prefix = 'home'
+    query_budget = 7  # one per section, about sections take two
+    cache_models = (
+        AboutSection, AboutSubSection, CurrentNasheen, Event, Audio, Video, PublicationItem,
+    )
+    latest_count = 6  # Items per "latest" section
+
+    # name -> (models, method building the section data)
+    sections = {
+        'about_sections': ((AboutSection, AboutSubSection), 'get_about_sections'),
+        'current_nasheen': ((CurrentNasheen,), 'get_current_nasheen'),
+        'events': ((Event,), 'get_events'),
+        'latest_audios': ((Audio,), 'get_latest_audios'),
+        'latest_videos': ((Video,), 'get_latest_videos'),
+        'latest_publications': ((PublicationItem,), 'get_latest_publications'),
+    }
+
+    def get(self, request, *args, **kwargs):
+        return self.get_cached_response(self.get_cache_key(), self._home_response)
+
+    def _home_response(self):
+        versions = self.get_model_versions()
+        host = f"{self.request.scheme}://{self.request.get_host()}"
+        keys = {}
+        for name, (models, _) in self.sections.items():
+            section_versions = {
+                namespace: version for namespace, version in versions.items()
+                if namespace in {model._meta.label_lower for model in models}
+            }
+            keys[name] = f"home:{name}:{host}:{get_version_token(versions=section_versions)}"
+
+        cached = cache.get_many(list(keys.values()))
+        data = {}
+        missing = {}
+        for name, (_, method) in self.sections.items():
+            if keys[name] in cached:
+                data[name] = cached[keys[name]]
+            else:
+                data[name] = getattr(self, method)()
+                missing[keys[name]] = data[name]
+        if missing:
+            cache.set_many(missing, self.cache_timeout + self.cache_stale_timeout)
+        return Response(data)
+
+    def get_serializer_context(self):
+        return {'request': self.request}
+
+    def get_about_sections(self):
+        queryset = get_active_sections()
+        return AboutSectionSerializer(queryset, many=True, context=self.get_serializer_context()).data
+
+    def get_current_nasheen(self):
+        current_nasheen = CurrentNasheen.objects.filter(is_active=True).first()
+        if current_nasheen:
+            return CurrentNasheenSerializer(current_nasheen, context=self.get_serializer_context()).data
+        return None
+
+    def get_events(self):
+        queryset = Event.objects.filter(is_active=True).order_by('order', 'id')
+        return EventFastSerializer(queryset, context=self.get_serializer_context()).data
+
+    def get_latest_audios(self):
+        queryset = Audio.objects.order_by('-date', '-id')[:self.latest_count]
+        return AudioFastSerializer(queryset, context=self.get_serializer_context()).data
+
+    def get_latest_videos(self):
+        queryset = Video.objects.order_by('-date', '-id')[:self.latest_count]
+        return VideoFastSerializer(queryset, context=self.get_serializer_context()).data
+
+    def get_latest_publications(self):
+        queryset = PublicationItem.objects.order_by('-id')[:self.latest_count]
+        return PublicationFastSerializer(queryset, context=self.get_serializer_context()).data
+
+
+class SearchView(CacheMixin, APIView):
+    """
+    Full-text search across publications, audios, videos, events and the
+    about page, in English and Urdu.
+
+    GET /api/search/?q=zikr
+        The best matches of every content type:
+        {"query": "zikr", "results": {"audios": {"count": 12, "results": [...],
+                                                 "more": ".../api/search/?q=zikr&type=audios"}, ...}}
+
+    GET /api/search/?q=zikr&type=audios&page=2
+        All matches of one content type, paginated:
+        {"count": 12, "next": ..., "previous": ..., "results": [...]}
+    """
+    cache_key_prefix = 'search'
+    query_budget = 13  # two per group (count, page), about sections prefetch subsections
+    cache_models = SEARCH_MODELS
+    group_size = 5  # Results per group without ?type=
+    pagination_class = SearchPagination
+
+    def get(self, request, *args, **kwargs):
+        return self.get_cached_response(self.get_cache_key(), self._search_response)
+
+    def _search_response(self):
+        query = clean_query(self.request.query_params.get('q'))
+        groups = {group.name: group for group in SEARCH_GROUPS}
+        group_name = self.request.query_params.get('type')
+        if group_name is not None and group_name not in groups:
+            raise ValidationError({'type': [f"Must be one of: {', '.join(groups)}"]})
+
+        if group_name is not None:
+            return self._group_page(groups[group_name], query)
+
+        results = {}
+        for group in SEARCH_GROUPS:
+            if not query:
+                results[group.name] = {'count': 0, 'results': [], 'more': None}
+                continue
+            queryset = search(group.get_queryset(), group.fields, query)
+            count = queryset.count()
+            rows = queryset[:self.group_size] if count else []
+            results[group.name] = {
+                'count': count,
+                'results': group.serializer_class(rows, many=True, context=self.get_serializer_context()).data,
+                'more': self._group_url(group.name) if count > self.group_size else None,
+            }
+        return Response({'query': query, 'results': results})
+
+    def _group_page(self, group, query):
+        queryset = search(group.get_queryset(), group.fields, query) if query else group.get_queryset().none()
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        serializer = group.serializer_class(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    def _group_url(self, name):
+        url = remove_query_param(self.request.build_absolute_uri(), 'page')
+        return replace_query_param(url, 'type', name)
+
+    def get_serializer_context(self):
+        return {'request': self.request}
+
+
+class SuggestThrottle(AnonRateThrottle):
+    """
+    Typeahead sends a request per keystroke, allow far more than the default.
+    Counted apart from the 'anon' history so typing never throttles the rest of the API.
+    """
+    scope = 'suggest'
+
+
+class SuggestView(APIView):
+    """
+    As-you-type title suggestions for publications, audios and videos.
+
+    GET /api/suggest/?q=zik&limit=8
+        {"query": "zik", "results": [{"type": "audio", "id": 3,
+                                      "title_en": "Weekly Zikr", "title_ur": "..."}, ...]}
+
+    Served from an in-process prefix cache where possible (see core/suggest.py).
+    """
+    throttle_classes = [SuggestThrottle]
+    query_budget = 1
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            limit = DEFAULT_LIMIT
+        limit = max(1, min(limit, MAX_LIMIT))
+        return Response({'query': query, 'results': suggest(query, limit)})
+
+
+class MetricsView(APIView):
+    """
+    Counters of the worker process that served the request, for monitoring.
+    Staff only.
+
+    GET /api/metrics/
+        {"db_pool": {"default": {"checkouts": 120, "wait_time": 0.03, ...}},
+         "cache": {"hits": 95, "misses": 4, ...}}
+
+    db_pool is empty unless the pooled database backend is enabled (DB_POOL).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response({'db_pool': get_pool_stats(), 'cache': get_cache_stats()})
+
+
+def _media_headers(response, file_stat, filename):
+    """Validator, range and security headers of a media response"""
+    set_validators(response, file_stat)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = f'inline; filename="{get_valid_filename(filename)}"'
+    response['X-Content-Type-Options'] = 'nosniff'
+    return response
 
 
 @xframe_options_exempt
@@ -41,14 +273,27 @@ def serve_media_file(request, file_path):
     Securely serve media files (PDFs, images, audio, etc.) with X-Frame-Options exempted
     to allow embedding in iframes from the frontend.
     
+    Byte ranges (Range / If-Range) are answered with 206 Partial Content,
+    so audio seeking and PDF.js chunked loading only read what they need.
+    Responses carry an ETag and Last-Modified from a single os.stat;
+    matching If-None-Match / If-Modified-Since requests get 304 and HEAD
+    requests are answered without opening the file. With MEDIA_OFFLOAD the
+    front proxy sends the file once these checks pass (see core/media_files.py).
+    
     Security features:
     - Directory traversal protection
     - File extension validation
     - MIME type validation
     - Request logging
     - File existence checks
+    - Nothing is served without a local MEDIA_ROOT
     """
     try:
+        # An empty MEDIA_ROOT (Cloudinary storage) would resolve to the working directory
+        if not settings.MEDIA_ROOT:
+            logger.error(f"Media requested without a local MEDIA_ROOT: {file_path}")
+            raise Http404("File not found")
+        
         # Normalize and sanitize file path
         file_path = file_path.strip().lstrip('/')
         
@@ -66,13 +311,14 @@ def serve_media_file(request, file_path):
             logger.warning(f"Directory traversal attempt detected: {file_path} from IP: {request.META.get('REMOTE_ADDR')}")
             raise Http404("Invalid file path")
         
-        # Check if file exists
-        if not os.path.exists(full_path):
+        # Check that the file exists and is a regular file (not a directory);
+        # this one stat also gives the size and validators
+        try:
+            file_stat = os.stat(full_path)
+        except (FileNotFoundError, NotADirectoryError):
             logger.info(f"File not found: {file_path} from IP: {request.META.get('REMOTE_ADDR')}")
             raise Http404("File not found")
-        
-        # Check if it's a file (not a directory)
-        if not os.path.isfile(full_path):
+        if not stat.S_ISREG(file_stat.st_mode):
             logger.warning(f"Path is not a file: {file_path} from IP: {request.META.get('REMOTE_ADDR')}")
             raise Http404("Invalid file path")
         
@@ -91,24 +337,54 @@ def serve_media_file(request, file_path):
             # Log mismatch but use our whitelist (more secure)
             logger.debug(f"MIME type mismatch for {file_path}: detected {detected_mime}, using {content_type}")
         
-        # Get file size for logging
-        file_size = os.path.getsize(full_path)
+        file_size = file_stat.st_size
+        filename = os.path.basename(file_path)
+        
+        # Conditional requests: the client's copy is current (304), or a
+        # precondition failed (412); the file is not opened
+        not_modified = get_conditional_response(
+            request, etag=file_etag(file_stat), last_modified=int(file_stat.st_mtime),
+        )
+        if not_modified is not None:
+            return set_validators(not_modified, file_stat)
+        
+        # HEAD is answered from the stat alone
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=content_type)
+            response['Content-Length'] = str(file_size)
+            return _media_headers(response, file_stat, filename)
+        
+        # Offload mode: the proxy sends the file (and handles ranges)
+        if settings.MEDIA_OFFLOAD:
+            logger.info(f"Media file served: {file_path} ({file_size} bytes, {settings.MEDIA_OFFLOAD}) to IP: {request.META.get('REMOTE_ADDR')}")
+            response = offload_response(file_path, full_path, content_type)
+            return _media_headers(response, file_stat, filename)
+        
+        # Requested byte ranges, ignored when If-Range names an older version
+        ranges = None
+        if if_range_matches(request, file_stat):
+            try:
+                ranges = parse_range_header(request.META.get('HTTP_RANGE'), file_size)
+            except RangeNotSatisfiable:
+                logger.info(f"Unsatisfiable range {request.META.get('HTTP_RANGE')} for {file_path} ({file_size} bytes)")
+                return range_not_satisfiable(file_size)
         
         # Log successful file access (for monitoring)
-        logger.info(f"Media file served: {file_path} ({file_size} bytes) to IP: {request.META.get('REMOTE_ADDR')}")
+        served = f"{file_size} bytes" if ranges is None else f"ranges {ranges} of {file_size} bytes"
+        logger.info(f"Media file served: {file_path} ({served}) to IP: {request.META.get('REMOTE_ADDR')}")
         
         # Open file in binary mode and serve
         try:
             file_handle = open(full_path, 'rb')
-            response = FileResponse(
-                file_handle,
-                content_type=content_type,
-                filename=os.path.basename(file_path)
-            )
-            # Add security headers
-            response['Content-Disposition'] = f'inline; filename="{get_valid_filename(os.path.basename(file_path))}"'
-            response['X-Content-Type-Options'] = 'nosniff'
-            return response
+            if ranges:
+                response = partial_response(file_handle, ranges, file_size, content_type)
+            else:
+                response = FileResponse(
+                    file_handle,
+                    content_type=content_type,
+                    filename=filename
+                )
+            return _media_headers(response, file_stat, filename)
         except IOError as e:
             logger.error(f"Error opening file {file_path}: {e}")
             raise Http404("Error reading file")
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_event_priority'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'id'], name='event_active_order_idx'),
+        ),
+    ]
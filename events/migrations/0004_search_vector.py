@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:36
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+from core.migration_utils import PostgresOnly, search_vector_trigger
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_event_active_order_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        PostgresOnly(migrations.AddIndex(
+            model_name='event',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='event_search_idx'),
+        )),
+        PostgresOnly(search_vector_trigger('events_event', [
+            ('title_en', 'english', 'A'),
+            ('title_ur', 'simple', 'A'),
+            ('description_en', 'english', 'B'),
+            ('description_ur', 'simple', 'B'),
+        ])),
+    ]
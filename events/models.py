@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 
@@ -99,10 +101,27 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Full-text search (kept up to date by a database trigger on PostgreSQL)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Normalized titles for search and lookups (filled on save, see core/text.py)
+    normalized_title_en = models.CharField(max_length=255, blank=True, default='', editable=False)
+    normalized_title_ur = models.CharField(max_length=255, blank=True, default='', editable=False)
+    normalized_fields = {'normalized_title_en': 'title_en', 'normalized_title_ur': 'title_ur'}
+    
     class Meta:
         ordering = ['order', 'id']
         verbose_name = "Event"
         verbose_name_plural = "Events"
+        indexes = [
+            # Public list: WHERE is_active ORDER BY order, id
+            models.Index(fields=['order', 'id'], condition=models.Q(is_active=True),
+                         name='event_active_order_idx'),
+            GinIndex(fields=['search_vector'], name='event_search_idx'),
+            models.Index(fields=['normalized_title_en'], name='event_norm_en_idx',
+                         opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['normalized_title_ur'], name='event_norm_ur_idx',
+                         opclasses=['varchar_pattern_ops']),
+        ]
     
     def __str__(self):
         return f"{self.title_en} ({self.recurring_type})"
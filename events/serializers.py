@@ -1,6 +1,57 @@
 from rest_framework import serializers
+from core.fast_serializers import FastSerializer
 from .models import Event
 
+DAYS_EN = ('Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday')
+DAYS_UR = ('اتوار', 'پیر', 'منگل', 'بدھ', 'جمعرات', 'جمعہ', 'ہفتہ')
+
+
+def generate_date_text_en(recurring_type, day_of_week, week_of_month, event_date):
+    """English date text of an event without date_text_en"""
+    if recurring_type == 'daily':
+        return 'Daily'
+    elif recurring_type == 'weekly':
+        if day_of_week is not None:
+            if day_of_week == 4:  # Thursday
+                return 'Every Thursday'
+            if 0 <= day_of_week < len(DAYS_EN):
+                return f'Every {DAYS_EN[day_of_week]}'
+        return 'Weekly'
+    elif recurring_type == 'monthly':
+        if day_of_week is not None and week_of_month is not None:
+            if day_of_week == 4 and week_of_month == 1:
+                return 'First Thursday of every month'
+            elif day_of_week == 4:
+                return 'Thursday of every month'
+        return 'Monthly'
+    elif recurring_type == 'one_time' and event_date:
+        return event_date.strftime('%B %d, %Y')
+    return 'Ongoing'
+
+
+def generate_date_text_ur(recurring_type, day_of_week, week_of_month, event_date):
+    """Urdu date text of an event without date_text_ur"""
+    if recurring_type == 'daily':
+        return 'روزانہ'
+    elif recurring_type == 'weekly':
+        if day_of_week is not None:
+            if day_of_week == 4:  # Thursday
+                return 'ہر جمعرات'
+            if 0 <= day_of_week < len(DAYS_UR):
+                return f'ہر {DAYS_UR[day_of_week]}'
+        return 'ہفتہ وار'
+    elif recurring_type == 'monthly':
+        if day_of_week is not None and week_of_month is not None:
+            if day_of_week == 4 and week_of_month == 1:
+                return 'ہر مہینے کی پہلی جمعرات'
+            elif day_of_week == 4:
+                return 'ہر مہینے کا جمعرات'
+        return 'ماہانہ'
+    elif recurring_type == 'one_time' and event_date:
+        # Simple date format for Urdu
+        return f'{event_date.strftime("%d/%m/%Y")}'
+    return 'جاری'
+
 
 class EventSerializer(serializers.ModelSerializer):
     """
@@ -62,47 +113,33 @@ class EventSerializer(serializers.ModelSerializer):
     
     def _generate_date_text_en(self, obj):
         """Generate English date text from recurring_type"""
-        if obj.recurring_type == 'daily':
-            return 'Daily'
-        elif obj.recurring_type == 'weekly':
-            if obj.day_of_week is not None:
-                if obj.day_of_week == 4:  # Thursday
-                    return 'Every Thursday'
-                days = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-                if 0 <= obj.day_of_week < len(days):
-                    return f'Every {days[obj.day_of_week]}'
-            return 'Weekly'
-        elif obj.recurring_type == 'monthly':
-            if obj.day_of_week is not None and obj.week_of_month is not None:
-                if obj.day_of_week == 4 and obj.week_of_month == 1:
-                    return 'First Thursday of every month'
-                elif obj.day_of_week == 4:
-                    return 'Thursday of every month'
-            return 'Monthly'
-        elif obj.recurring_type == 'one_time' and obj.event_date:
-            return obj.event_date.strftime('%B %d, %Y')
-        return 'Ongoing'
+        return generate_date_text_en(obj.recurring_type, obj.day_of_week, obj.week_of_month, obj.event_date)
     
     def _generate_date_text_ur(self, obj):
         """Generate Urdu date text from recurring_type"""
-        if obj.recurring_type == 'daily':
-            return 'روزانہ'
-        elif obj.recurring_type == 'weekly':
-            if obj.day_of_week is not None:
-                if obj.day_of_week == 4:  # Thursday
-                    return 'ہر جمعرات'
-                days_ur = ['اتوار', 'پیر', 'منگل', 'بدھ', 'جمعرات', 'جمعہ', 'ہفتہ']
-                if 0 <= obj.day_of_week < len(days_ur):
-                    return f'ہر {days_ur[obj.day_of_week]}'
-            return 'ہفتہ وار'
-        elif obj.recurring_type == 'monthly':
-            if obj.day_of_week is not None and obj.week_of_month is not None:
-                if obj.day_of_week == 4 and obj.week_of_month == 1:
-                    return 'ہر مہینے کی پہلی جمعرات'
-                elif obj.day_of_week == 4:
-                    return 'ہر مہینے کا جمعرات'
-            return 'ماہانہ'
-        elif obj.recurring_type == 'one_time' and obj.event_date:
-            # Simple date format for Urdu
-            return f'{obj.event_date.strftime("%d/%m/%Y")}'
-        return 'جاری'
+        return generate_date_text_ur(obj.recurring_type, obj.day_of_week, obj.week_of_month, obj.event_date)
+
+
+class EventFastSerializer(FastSerializer):
+    """Same output as EventSerializer, from .values() rows (used for the list)"""
+    serializer_class = EventSerializer
+    value_fields = (
+        'title_en', 'title_ur', 'date_text_en', 'date_text_ur', 'description_en', 'description_ur',
+    )
+    
+    def get_title(self, row):
+        return {'english': row['title_en'], 'urdu': row['title_ur']}
+    
+    def get_date(self, row):
+        date_en = row['date_text_en']
+        date_ur = row['date_text_ur']
+        if date_en and date_ur:
+            return {'english': date_en, 'urdu': date_ur}
+        args = (row['recurring_type'], row['day_of_week'], row['week_of_month'], row['event_date'])
+        return {
+            'english': date_en or generate_date_text_en(*args),
+            'urdu': date_ur or generate_date_text_ur(*args),
+        }
+    
+    def get_description(self, row):
+        return {'english': row['description_en'] or '', 'urdu': row['description_ur'] or ''}
@@ -1,3 +1,50 @@
-from django.test import TestCase
+from datetime import date, time
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .models import Event
+from .serializers import EventFastSerializer, EventSerializer
+
+
+class EventFastSerializerTests(TestCase):
+    """Golden tests: the .values() fast path renders the same bytes as EventSerializer"""
+
+    def setUp(self):
+        """Seed an event for every date text branch"""
+        cache.clear()
+        variants = [
+            {'recurring_type': 'daily'},
+            {'recurring_type': 'weekly', 'day_of_week': 4},
+            {'recurring_type': 'weekly', 'day_of_week': 1, 'event_time': time(19, 30)},
+            {'recurring_type': 'weekly'},
+            {'recurring_type': 'monthly', 'day_of_week': 4, 'week_of_month': 1},
+            {'recurring_type': 'monthly', 'day_of_week': 4, 'week_of_month': 3},
+            {'recurring_type': 'monthly', 'day_of_week': 2},
+            {'recurring_type': 'yearly'},
+            {'recurring_type': 'one_time', 'event_date': date(2026, 3, 14), 'priority': 'high'},
+            {'recurring_type': 'one_time'},
+            {'recurring_type': 'daily', 'date_text_en': 'After Isha', 'date_text_ur': 'بعد نماز عشاء'},
+            {'recurring_type': 'weekly', 'day_of_week': 5, 'date_text_en': 'Fridays only'},
+        ]
+        for i, variant in enumerate(variants):
+            Event.objects.create(
+                title_en=f'Event {i}', title_ur=f'محفل {i}', description_en='Dhikr' if i % 2 else '',
+                description_ur='ذکر', order=i % 3, **variant,
+            )
+
+    def test_output_is_byte_identical(self):
+        """Both serializers render to the same JSON"""
+        queryset = Event.objects.order_by('order', 'id')
+        context = {'request': RequestFactory().get('/')}
+        expected = JSONRenderer().render(EventSerializer(queryset, many=True, context=context).data)
+        actual = JSONRenderer().render(EventFastSerializer(queryset, context=context).data)
+        self.assertEqual(actual, expected)
+
+    def test_list_endpoint_uses_fast_path(self):
+        """The events list matches the DRF serializer, detail pages still use it"""
+        response = APIClient().get('/api/events/events/')
+        expected = EventSerializer(Event.objects.order_by('order', 'id'), many=True).data
+        self.assertEqual(response.content, JSONRenderer().render(expected))
@@ -1,23 +1,22 @@
 from rest_framework import viewsets
-from rest_framework.response import Response
+from core.cache_utils import CacheMixin
+from core.fast_serializers import FastListMixin
 from .models import Event
-from .serializers import EventSerializer
+from .serializers import EventFastSerializer, EventSerializer
 
 
-class EventViewSet(viewsets.ReadOnlyModelViewSet):
+class EventViewSet(CacheMixin, FastListMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint to get all active events
     Read-only viewset for public access
     """
     queryset = Event.objects.filter(is_active=True)
     serializer_class = EventSerializer
+    fast_serializer_class = EventFastSerializer
+    cache_key_prefix = 'events'
+    query_budget = 2  # snapshot lookup, then the queryset if there is none
+    snapshot_key = 'events.events'
     
     def get_queryset(self):
         """Return all active events, ordered by order field"""
         return Event.objects.filter(is_active=True).order_by('order', 'id')
-    
-    def list(self, request, *args, **kwargs):
-        """Return list of all active events"""
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0002_gallerycollection_delete_mediafile_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='galleryimage',
+            index=models.Index(fields=['collection', 'id'], name='galleryimage_coll_id_idx'),
+        ),
+    ]
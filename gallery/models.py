@@ -12,5 +12,11 @@ class GalleryImage(models.Model):
 
     image = models.ImageField(upload_to='gallery/images/')
 
+    class Meta:
+        indexes = [
+            # Images of one collection in id order (list previews, paginated images)
+            models.Index(fields=['collection', 'id'], name='galleryimage_coll_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.collection.name_en} - {self.id}"
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from core.media_urls import get_media_url_builder
 from .models import GalleryCollection, GalleryImage
 
 class GalleryImageSerializer(serializers.ModelSerializer):
@@ -9,10 +10,7 @@ class GalleryImageSerializer(serializers.ModelSerializer):
         fields = ['id', 'image']
 
     def get_image(self, obj):
-        request = self.context.get('request')
-        if obj.image:
-            return request.build_absolute_uri(obj.image.url)
-        return None
+        return get_media_url_builder(self.context.get('request')).file_url(obj.image)
 
 
 
@@ -22,3 +20,23 @@ class GalleryCollectionSerializer(serializers.ModelSerializer):
     class Meta:
         model = GalleryCollection
         fields = ['id', 'name_en', 'name_ur', 'images']
+
+
+class GalleryCollectionListSerializer(serializers.ModelSerializer):
+    """
+    Collection listing without the full image list.
+    Expects the queryset to annotate `image_count` and prefetch the first
+    few images into `preview_images` (see GalleryCollectionViewSet).
+    """
+    image_count = serializers.IntegerField(read_only=True)
+    cover = serializers.SerializerMethodField()
+    preview_images = GalleryImageSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = GalleryCollection
+        fields = ['id', 'name_en', 'name_ur', 'image_count', 'cover', 'preview_images']
+
+    def get_cover(self, obj):
+        if obj.preview_images:
+            return GalleryImageSerializer(obj.preview_images[0], context=self.context).data['image']
+        return None
@@ -1,3 +1,50 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import GalleryCollection, GalleryImage
+
+
+class GalleryListingTests(TestCase):
+    """Tests for the lightweight gallery collection listing"""
+
+    def setUp(self):
+        """Seed collections with many images"""
+        cache.clear()
+        self.client = APIClient()
+        for c in range(3):
+            collection = GalleryCollection.objects.create(name_en=f'Urs {c}', name_ur=f'عرس {c}')
+            GalleryImage.objects.bulk_create([
+                GalleryImage(collection=collection, image=f'gallery/images/{c}-{i}.jpg')
+                for i in range(30)
+            ])
+        self.collection = GalleryCollection.objects.order_by('id').first()
+
+    def test_list_has_count_cover_and_preview(self):
+        """Each collection carries its image count and a few previews"""
+        data = self.client.get('/api/gallery/').json()
+        self.assertEqual(len(data), 3)
+        first = data[0]
+        self.assertEqual(first['image_count'], 30)
+        self.assertEqual(len(first['preview_images']), 4)
+        self.assertNotIn('images', first)
+        self.assertEqual(first['cover'], first['preview_images'][0]['image'])
+        self.assertTrue(first['cover'].startswith('http://testserver/media/gallery/images/'))
+
+    def test_list_query_count_is_flat(self):
+        """Listing costs two queries however many images there are"""
+        with self.assertNumQueries(2):
+            self.client.get('/api/gallery/')
+
+    def test_images_endpoint_is_paginated(self):
+        """Full image lists come page by page"""
+        url = f'/api/gallery/{self.collection.pk}/images/?page_size=20'
+        data = self.client.get(url).json()
+        self.assertEqual(data['count'], 30)
+        self.assertEqual(len(data['results']), 20)
+        second = self.client.get(data['next']).json()
+        self.assertEqual(len(second['results']), 10)
+
+    def test_images_endpoint_unknown_collection(self):
+        """Unknown collections are a 404"""
+        self.assertEqual(self.client.get('/api/gallery/999999/images/').status_code, 404)
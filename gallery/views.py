@@ -1,7 +1,46 @@
+from django.db.models import Count, Prefetch
 from rest_framework import viewsets
-from .models import GalleryCollection
-from .serializers import GalleryCollectionSerializer
+from rest_framework.decorators import action
+from core.cache_utils import CacheMixin
+from core.pagination import ImagePagination
+from .models import GalleryCollection, GalleryImage
+from .serializers import GalleryCollectionListSerializer, GalleryCollectionSerializer, GalleryImageSerializer
 
-class GalleryCollectionViewSet(viewsets.ModelViewSet):
+class GalleryCollectionViewSet(CacheMixin, viewsets.ModelViewSet):
     queryset = GalleryCollection.objects.all().prefetch_related('images')
     serializer_class = GalleryCollectionSerializer
+    cache_key_prefix = 'gallery'
+    query_budget = 3  # images action: collection, count, page
+    cache_models = (GalleryCollection, GalleryImage)
+    preview_count = 4  # Images embedded per collection in the list
+
+    def get_queryset(self):
+        if self.action == 'list':
+            # Image count plus the first few images only - the full list is
+            # served page by page from the images endpoint
+            return GalleryCollection.objects.annotate(image_count=Count('images')).prefetch_related(
+                Prefetch(
+                    'images',
+                    queryset=GalleryImage.objects.order_by('id')[:self.preview_count],
+                    to_attr='preview_images',
+                )
+            ).order_by('id')
+        if self.action == 'images':
+            return GalleryCollection.objects.all()
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return GalleryCollectionListSerializer
+        return super().get_serializer_class()
+
+    @action(detail=True, methods=['get'], pagination_class=ImagePagination)
+    def images(self, request, pk=None):
+        """Paginated images of one collection"""
+        return self.get_cached_response(self.get_cache_key(), self._images_response)
+
+    def _images_response(self):
+        collection = self.get_object()
+        page = self.paginate_queryset(collection.images.order_by('id'))
+        serializer = GalleryImageSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,29 @@
+"""
+gunicorn settings (render.yaml starts gunicorn with -c gunicorn.conf.py)
+
+Once the server is listening, warm_cache fills the shared Redis API cache
+in the background, so a cold start is never held up by it (see
+core/management/commands/warm_cache.py). Without REDIS_URL each worker has
+its own in-process cache and a separate warm_cache process would fill
+nothing the workers can read, so nothing is warmed.
+"""
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Detail pages warmed per endpoint after a start (the list endpoints are always warmed)
+WARM_CACHE_MAX_DETAIL = os.environ.get('WARM_CACHE_MAX_DETAIL', '20')
+
+
+def when_ready(server):
+    """Start warm_cache once the listening socket is bound"""
+    if not os.environ.get('REDIS_URL'):
+        return
+    server.log.info("Warming the API cache in the background")
+    subprocess.Popen(
+        [sys.executable, os.path.join(BASE_DIR, 'manage.py'), 'warm_cache',
+         '--max-detail', WARM_CACHE_MAX_DETAIL, '--concurrency', '2'],
+        cwd=BASE_DIR,
+    )
@@ -0,0 +1,68 @@
+"""
+Database router sending public reads to a read replica (REPLICA_DATABASE_URL).
+
+Reads go to the replica only while a request is marked replica-safe by
+core.middleware.ReplicaRoutingMiddleware (a GET/HEAD outside the admin
+from a client that hasn't written recently), and only for models of the
+public apps. Everything else (writes, the admin, auth, sessions,
+management commands) uses the primary.
+
+Replication lag: a request that writes pins itself to the primary for the
+rest of the request and, through a cookie, for REPLICA_PIN_SECONDS after
+it, so editors see their own changes. With a cache shared by all workers
+(REDIS_URL) the same window is also recorded there for every client, so
+responses cached right after a change are built from the primary and not
+from a replica that hasn't caught up yet.
+"""
+import threading
+
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+
+# Apps whose models are read from the replica
+REPLICA_APPS = frozenset({'about', 'events', 'gallery', 'photos', 'publications', 'video_audios'})
+
+_state = threading.local()
+
+
+def replica_enabled():
+    return getattr(settings, 'REPLICA_READS', True) and REPLICA_ALIAS in settings.DATABASES
+
+
+def set_read_replica(enabled):
+    """Allow (or stop) replica reads for the rest of the current request"""
+    _state.use_replica = enabled
+    _state.wrote = False
+
+
+def has_written():
+    """Whether the current request has written to the database"""
+    return getattr(_state, 'wrote', False)
+
+
+class ReplicaRouter:
+    """Route public reads to REPLICA_ALIAS, everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if (
+            getattr(_state, 'use_replica', False)
+            and model._meta.app_label in REPLICA_APPS
+            and replica_enabled()
+        ):
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        # Read-your-writes: later reads of this request see the change
+        _state.use_replica = False
+        _state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is migrated through replication
+        return db != REPLICA_ALIAS
@@ -3,6 +3,7 @@ from datetime import timedelta
 import os
 
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 import dj_database_url
 
 
@@ -21,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Full-text search fields and indexes
     
     # Third party
     'rest_framework',
@@ -43,6 +45,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Compresses API responses (gzip, plus brotli/zstd when installed); near the
+    # top, so it sees the final headers and body
+    'core.middleware.CompressionMiddleware',
+    # Counts SQL queries per request, checks them against view query budgets
+    'core.middleware.QueryCountMiddleware',
+    # Lets safe requests read the public apps from the replica (REPLICA_DATABASE_URL)
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -103,6 +112,45 @@ else:
         }
     }
 
+# Optional read replica for the public GET endpoints (see khanqah_backend/db_router.py)
+REPLICA_DATABASE_URL = config('REPLICA_DATABASE_URL', default=None)
+
+if REPLICA_DATABASE_URL:
+    DATABASES['replica'] = dj_database_url.parse(REPLICA_DATABASE_URL, conn_max_age=600, conn_health_checks=True)
+    # Tests read the replica through the test copy of the primary
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+# Send replica-safe reads to the replica; with REPLICA_READS=False the replica
+# stays configured but unused (e.g. for the test suite, see core/tests.py)
+REPLICA_READS = config('REPLICA_READS', default=True, cast=bool)
+
+DATABASE_ROUTERS = ['khanqah_backend.db_router.ReplicaRouter']
+
+# Seconds a client (and the API cache) keeps reading from the primary after a write,
+# longer than the usual replication lag
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=15, cast=int)
+
+# Optional bounded connection pool per worker process (see core/db_pool.py)
+# instead of one persistent connection per thread
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+
+if DB_POOL:
+    # The replica, if any, gets a pool of its own
+    for database in DATABASES.values():
+        database.update({
+            'ENGINE': 'core.db_backends.postgresql_pool',
+            # Connections go back to the pool at the end of every request
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False,
+            'POOL': {
+                'MIN_SIZE': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+                'MAX_SIZE': config('DB_POOL_MAX_SIZE', default=4, cast=int),
+                'TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=float),
+                'CHECK_INTERVAL': config('DB_POOL_CHECK_INTERVAL', default=30, cast=float),
+                'MAX_LIFETIME': config('DB_POOL_MAX_LIFETIME', default=1800, cast=float),
+            },
+        })
+
 # Static & Media
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
@@ -128,16 +176,34 @@ if CLOUDINARY_CLOUD_NAME and CLOUDINARY_API_KEY and CLOUDINARY_API_SECRET:
     
     DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
     MEDIA_URL = '/media/'
-    # Cloudinary will handle file storage
+    # Cloudinary will handle file storage, there is no local media directory
+    MEDIA_ROOT = ''
 else:
     # Use local storage (development)
     MEDIA_URL = '/media/'
     MEDIA_ROOT = BASE_DIR / 'media'
 
+# How serve_media_file delivers local media once its checks pass (see
+# core/media_files.py): 'x-accel-redirect' (nginx, internal location
+# MEDIA_OFFLOAD_PREFIX aliased to MEDIA_ROOT) or 'x-sendfile' (Apache
+# mod_xsendfile) hand the transfer to the proxy; empty streams it from
+# gunicorn with os.sendfile. Any mode also serves /media/ when DEBUG is off.
+MEDIA_OFFLOAD = config('MEDIA_OFFLOAD', default='').strip().lower()
+MEDIA_OFFLOAD_PREFIX = config('MEDIA_OFFLOAD_PREFIX', default='/protected-media/')
+
+if MEDIA_OFFLOAD not in ('', 'x-accel-redirect', 'x-sendfile'):
+    raise ImproperlyConfigured("MEDIA_OFFLOAD must be 'x-accel-redirect', 'x-sendfile' or empty")
+if MEDIA_OFFLOAD and not MEDIA_ROOT:
+    # serve_media_file would resolve paths against the working directory
+    raise ImproperlyConfigured("MEDIA_OFFLOAD needs local media storage (MEDIA_ROOT), not Cloudinary")
+
 # Caching Configuration
 # Supports Redis (if REDIS_URL is set) or in-memory cache (default)
 REDIS_URL = config('REDIS_URL', default=None)
 
+# In-process LRU budget per worker (bytes)
+CACHE_MAX_BYTES = config('CACHE_MAX_BYTES', default=32 * 1024 * 1024, cast=int)
+
 if REDIS_URL:
     # Use Redis for caching (production)
     CACHES = {
@@ -149,33 +215,67 @@ if REDIS_URL:
             },
             'KEY_PREFIX': 'khanqah',
             'TIMEOUT': 300,  # Default timeout: 5 minutes
-        }
+        },
+        # API responses: in-process LRU near-cache in front of Redis
+        'api': {
+            'BACKEND': 'core.cache_backends.TieredCache',
+            'LOCATION': 'api-near-cache',
+            'TIMEOUT': 300,
+            'OPTIONS': {
+                'L2': 'default',
+                'MAX_BYTES': CACHE_MAX_BYTES,
+                'L1_TIMEOUT': config('CACHE_L1_TIMEOUT', default=60, cast=int),
+                'L1_VERSION_TIMEOUT': config('CACHE_L1_VERSION_TIMEOUT', default=2, cast=int),
+            },
+        },
     }
+    # Throttle counters stay on 'default' so they are shared by all workers
+    API_CACHE_ALIAS = 'api'
 else:
-    # Use in-memory cache (development)
+    # Use in-memory LRU cache (development)
     CACHES = {
         'default': {
-            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'BACKEND': 'core.cache_backends.LRUMemoryCache',
             'LOCATION': 'unique-snowflake',
             'TIMEOUT': 300,
             'OPTIONS': {
-                'MAX_ENTRIES': 1000
+                'MAX_BYTES': CACHE_MAX_BYTES,
             }
         }
     }
+    API_CACHE_ALIAS = 'default'
+
+# Extra URLs warmed by `manage.py warm_cache` besides every list/detail endpoint,
+# e.g. paginated or filtered variants the frontend requests
+CACHE_WARM_URLS = [
+    u.strip() for u in config('CACHE_WARM_URLS', default='').split(',') if u.strip()
+]
+
+# Scheme and host the published JSON snapshots are rendered for (see core/snapshots.py)
+# Defaults to https:// (http:// with DEBUG) plus the first ALLOWED_HOSTS entry
+SNAPSHOT_BASE_URL = config('SNAPSHOT_BASE_URL', default='')
+
+# Send X-DB-Queries / Server-Timing headers on every response
+# (staff users always get them)
+QUERY_COUNT_HEADERS = config('QUERY_COUNT_HEADERS', default=DEBUG, cast=bool)
+
+# Smallest response body (bytes) CompressionMiddleware compresses (see core/compression.py)
+COMPRESSION_MIN_LENGTH = config('COMPRESSION_MIN_LENGTH', default=512, cast=int)
 
 # REST Framework & JWT
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
+    # DRF's rate throttles, letting requests through while the cache is down (core/throttling.py)
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'core.throttling.AnonRateThrottle',
+        'core.throttling.UserRateThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/hour',  # General anonymous rate limit
-        'user': '1000/hour'  # Authenticated users
+        'user': '1000/hour',  # Authenticated users
+        'suggest': '2000/hour',  # Typeahead, a request per keystroke (core.views.SuggestThrottle)
     },
     'EXCEPTION_HANDLER': 'core.exceptions.custom_exception_handler',  # Custom error handler for standardized responses
 }
@@ -277,6 +377,11 @@ CSP_FRAME_SRC = config('CSP_FRAME_SRC', default="'self' https://www.youtube.com
 # Default CSP_FRAME_ANCESTORS - will be overridden based on DEBUG mode
 CSP_FRAME_ANCESTORS = config('CSP_FRAME_ANCESTORS', default="'self'", cast=str)
 
+# TLS ends at the proxy (Render), which sets X-Forwarded-Proto. Trusting it
+# gives requests their real https scheme, which cache keys, warmed entries and
+# snapshots (rendered for https:// with DEBUG off) are matched on.
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+
 # Security settings (production)
 if not DEBUG:
     SECURE_SSL_REDIRECT = config('SECURE_SSL_REDIRECT', default=True, cast=bool)
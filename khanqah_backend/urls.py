@@ -55,13 +55,16 @@ urlpatterns = [
 ]
 
 # In development, serve media files through custom view (allows iframe embedding)
-# In production, use a proper web server (nginx/apache) to serve media files
-if settings.DEBUG:
+# In production, use a proper web server (nginx/apache) to serve media files,
+# either directly or through the view with MEDIA_OFFLOAD (the view checks the
+# request, the server sends the file)
+if settings.DEBUG or settings.MEDIA_OFFLOAD:
     # Use custom view for media files to allow iframe embedding
     from core.views import serve_media_file
     urlpatterns += [
         path('media/<path:file_path>', serve_media_file, name='serve-media-file'),
     ]
+if settings.DEBUG:
     # Also keep static file serving for other static files
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'khanqah_backend.settings')
 
 application = get_wsgi_application()
+
+# Open the pooled database connections (DB_POOL) before the first request
+from core.db_pool import prewarm_pools  # noqa: E402
+
+prewarm_pools()
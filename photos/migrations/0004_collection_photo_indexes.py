@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photos', '0003_alter_collection_created_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='collection',
+            index=models.Index(fields=['-created_at', '-id'], name='collection_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['collection', 'id'], name='photo_collection_id_idx'),
+        ),
+    ]
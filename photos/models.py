@@ -7,6 +7,12 @@ class Collection(models.Model):
     name_ur = models.CharField(max_length=255)
     created_at = models.DateField(default=timezone.now, null=True, blank=True)  # editable in admin
 
+    class Meta:
+        indexes = [
+            # Public list: ORDER BY created_at DESC, id DESC
+            models.Index(fields=['-created_at', '-id'], name='collection_created_id_idx'),
+        ]
+
     def __str__(self):
         return self.name_en
 
@@ -19,5 +25,11 @@ class Photo(models.Model):
     )
     image = models.ImageField(upload_to="photos/")  # saves to MEDIA_ROOT/photos/
 
+    class Meta:
+        indexes = [
+            # Images of one collection in id order (list previews, paginated images)
+            models.Index(fields=['collection', 'id'], name='photo_collection_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.collection.name_en} - {self.id}"
@@ -1,7 +1,14 @@
+from django.db import models
 from rest_framework import serializers
+from core.media_urls import MediaImageField
 from .models import Collection, Photo
 
 class PhotoSerializer(serializers.ModelSerializer):
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.ImageField: MediaImageField,
+    }
+
     class Meta:
         model = Photo
         fields = ["id", "image"]
@@ -13,3 +20,23 @@ class CollectionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Collection
         fields = ["id", "name_en", "name_ur", "created_at", "images"]
+
+
+class CollectionListSerializer(serializers.ModelSerializer):
+    """
+    Collection listing without the full image list.
+    Expects the queryset to annotate `image_count` and prefetch the first
+    few photos into `preview_images` (see CollectionViewSet).
+    """
+    image_count = serializers.IntegerField(read_only=True)
+    cover = serializers.SerializerMethodField()
+    preview_images = PhotoSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Collection
+        fields = ["id", "name_en", "name_ur", "created_at", "image_count", "cover", "preview_images"]
+
+    def get_cover(self, obj):
+        if obj.preview_images:
+            return PhotoSerializer(obj.preview_images[0], context=self.context).data["image"]
+        return None
@@ -1,3 +1,42 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import Collection, Photo
+
+
+class PhotoCollectionListingTests(TestCase):
+    """Tests for the lightweight photo collection listing"""
+
+    def setUp(self):
+        """Seed collections with many photos"""
+        cache.clear()
+        self.client = APIClient()
+        for c in range(3):
+            collection = Collection.objects.create(name_en=f'Urs {c}', name_ur=f'عرس {c}')
+            Photo.objects.bulk_create([
+                Photo(collection=collection, image=f'photos/{c}-{i}.jpg') for i in range(30)
+            ])
+        self.collection = Collection.objects.order_by('id').first()
+
+    def test_list_has_count_cover_and_preview(self):
+        """Each collection carries its photo count and a few previews"""
+        data = self.client.get('/api/photos/collections/').json()
+        self.assertEqual(len(data), 3)
+        for collection in data:
+            self.assertEqual(collection['image_count'], 30)
+            self.assertEqual(len(collection['preview_images']), 4)
+            self.assertNotIn('images', collection)
+            self.assertEqual(collection['cover'], collection['preview_images'][0]['image'])
+
+    def test_list_query_count_is_flat(self):
+        """Listing costs two queries however many photos there are"""
+        with self.assertNumQueries(2):
+            self.client.get('/api/photos/collections/')
+
+    def test_images_endpoint_is_paginated(self):
+        """Full photo lists come page by page"""
+        url = f'/api/photos/collections/{self.collection.pk}/images/'
+        data = self.client.get(url).json()
+        self.assertEqual(data['count'], 30)
+        self.assertEqual(len(data['results']), 24)
@@ -1,12 +1,53 @@
+from django.db.models import Count, Prefetch
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from core.cache_utils import CacheMixin
+from core.pagination import ImagePagination
 from .models import Collection, Photo
-from .serializers import CollectionSerializer, PhotoSerializer
+from .serializers import CollectionListSerializer, CollectionSerializer, PhotoSerializer
 
-class CollectionViewSet(viewsets.ModelViewSet):
+class CollectionViewSet(CacheMixin, viewsets.ModelViewSet):
     queryset = Collection.objects.all().prefetch_related('images').order_by("-created_at")
     serializer_class = CollectionSerializer
+    cache_key_prefix = 'photos'
+    query_budget = 3  # images action: collection, count, page
+    cache_models = (Collection, Photo)
+    preview_count = 4  # Photos embedded per collection in the list
 
+    def get_queryset(self):
+        if self.action == 'list':
+            # Photo count plus the first few photos only - the full list is
+            # served page by page from the images endpoint
+            return Collection.objects.annotate(image_count=Count('images')).prefetch_related(
+                Prefetch(
+                    'images',
+                    queryset=Photo.objects.order_by('id')[:self.preview_count],
+                    to_attr='preview_images',
+                )
+            ).order_by("-created_at", "-id")
+        if self.action == 'images':
+            return Collection.objects.all()
+        return super().get_queryset()
 
-class PhotoViewSet(viewsets.ModelViewSet):
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CollectionListSerializer
+        return super().get_serializer_class()
+
+    @action(detail=True, methods=['get'], pagination_class=ImagePagination)
+    def images(self, request, pk=None):
+        """Paginated photos of one collection"""
+        return self.get_cached_response(self.get_cache_key(), self._images_response)
+
+    def _images_response(self):
+        collection = self.get_object()
+        page = self.paginate_queryset(collection.images.order_by('id'))
+        serializer = PhotoSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
+
+class PhotoViewSet(CacheMixin, viewsets.ModelViewSet):
     queryset = Photo.objects.all()
     serializer_class = PhotoSerializer
+    cache_key_prefix = 'photos'
+    query_budget = 1
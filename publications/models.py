@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 class Publication(models.Model):
@@ -17,6 +19,24 @@ class Publication(models.Model):
     description_en = models.TextField()
     description_ur = models.TextField()
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
+    # Full-text search (kept up to date by a database trigger on PostgreSQL)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Normalized titles for search and lookups (filled on save, see core/text.py)
+    normalized_title_en = models.CharField(max_length=255, blank=True, default='', editable=False)
+    normalized_title_ur = models.CharField(max_length=255, blank=True, default='', editable=False)
+    normalized_fields = {'normalized_title_en': 'title_en', 'normalized_title_ur': 'title_ur'}
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='publication_search_idx'),
+            models.Index(fields=['normalized_title_en'], name='publication_norm_en_idx',
+                         opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['normalized_title_ur'], name='publication_norm_ur_idx',
+                         opclasses=['varchar_pattern_ops']),
+            # Typeahead substring matches (pg_trgm, see core/suggest.py)
+            GinIndex(fields=['normalized_title_en'], name='publication_trgm_en_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['normalized_title_ur'], name='publication_trgm_ur_idx', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return self.title_en
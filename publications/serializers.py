@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.core.exceptions import ValidationError
 from .models import Publication
+from core.fast_serializers import FastSerializer
+from core.media_urls import get_media_url_builder
 from core.validators import validate_file_mime_type, sanitize_filename
 import os
 import logging
@@ -21,7 +23,7 @@ class PublicationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Publication
-        fields = "__all__"
+        exclude = ["search_vector", "normalized_title_en", "normalized_title_ur"]
         read_only_fields = ['id']
 
     def validate_file(self, value):
@@ -91,11 +93,31 @@ class PublicationSerializer(serializers.ModelSerializer):
     def get_cover(self, obj):
         request = self.context.get("request")
         if obj.cover and request:
-            return request.build_absolute_uri(obj.cover.url)
+            return get_media_url_builder(request).file_url(obj.cover)
         return None
 
     def get_file(self, obj):
         request = self.context.get("request")
         if obj.file and request:
-            return request.build_absolute_uri(obj.file.url)
+            return get_media_url_builder(request).file_url(obj.file)
+        return None
+
+
+class PublicationFastSerializer(FastSerializer):
+    """Same output as PublicationSerializer, from .values() rows (used for the list)"""
+    serializer_class = PublicationSerializer
+    value_fields = ('cover', 'file')
+    cover_storage = Publication._meta.get_field('cover').storage
+    file_storage = Publication._meta.get_field('file').storage
+
+    def get_cover(self, row):
+        request = self.context.get("request")
+        if row['cover'] and request:
+            return get_media_url_builder(request).url(row['cover'], self.cover_storage)
+        return None
+
+    def get_file(self, row):
+        request = self.context.get("request")
+        if row['file'] and request:
+            return get_media_url_builder(request).url(row['file'], self.file_storage)
         return None
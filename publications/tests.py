@@ -1,3 +1,53 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import Publication
+from .serializers import PublicationFastSerializer, PublicationSerializer
+
+
+class PublicationFilterTests(TestCase):
+    """Tests for the category filter and facets of the publications list"""
+
+    def setUp(self):
+        """Seed publications of two categories"""
+        cache.clear()
+        self.client = APIClient()
+        for i, category in enumerate(['book', 'book', 'risala']):
+            Publication.objects.create(
+                title_en=f'Publication {i}', title_ur='کتاب', file='publications/p.pdf',
+                description_en='...', description_ur='...', category=category,
+            )
+
+    def test_category_filter_and_facets(self):
+        """The plain list is unchanged, ?facets=true wraps it with category counts"""
+        data = self.client.get('/api/publications/publications/', {'category': 'risala'}).json()
+        self.assertEqual(len(data), 1)
+        data = self.client.get('/api/publications/publications/', {'category': 'risala', 'facets': 'true'}).json()
+        self.assertEqual(len(data['results']), 1)
+        self.assertEqual(data['facets'], {'category': [{'value': 'book', 'count': 2}, {'value': 'risala', 'count': 1}]})
+
+
+class PublicationFastSerializerTests(TestCase):
+    """Golden test: the .values() fast path renders the same bytes as PublicationSerializer"""
+
+    def test_output_is_byte_identical(self):
+        """Cover and file URLs, default cover and empty cover all match"""
+        Publication.objects.create(
+            title_en='Maktubat', title_ur='مکتوبات', file='publications/m.pdf', cover='publications/covers/m.png',
+            description_en='Letters', description_ur='خطوط', category='book',
+        )
+        Publication.objects.create(
+            title_en='Risala', title_ur='رسالہ', file='publications/r.pdf',
+            description_en='', description_ur='', category='risala',
+        )
+        Publication.objects.create(
+            title_en='Other', title_ur='دیگر', file='publications/o.pdf', cover='',
+            description_en='...', description_ur='...', category='other',
+        )
+        queryset = Publication.objects.order_by('id')
+        for context in ({'request': RequestFactory().get('/', secure=True)}, {}):
+            expected = JSONRenderer().render(PublicationSerializer(queryset, many=True, context=context).data)
+            actual = JSONRenderer().render(PublicationFastSerializer(queryset, context=context).data)
+            self.assertEqual(actual, expected)
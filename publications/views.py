@@ -1,10 +1,17 @@
 from rest_framework import viewsets
+from core.cache_utils import CacheMixin
+from core.fast_serializers import FastListMixin
+from core.filters import ArchiveFilterMixin
 from .models import Publication
-from .serializers import PublicationSerializer
+from .serializers import PublicationFastSerializer, PublicationSerializer
 
-class PublicationViewSet(viewsets.ModelViewSet):
+class PublicationViewSet(CacheMixin, ArchiveFilterMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Publication.objects.all()
     serializer_class = PublicationSerializer
+    fast_serializer_class = PublicationFastSerializer
+    cache_key_prefix = 'publications'
+    query_budget = 2  # list, facets
+    filter_date_field = None  # Publications have no date
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_audios', '0004_audio_video_delete_media'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='audio',
+            index=models.Index(fields=['date', 'id'], name='audio_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audio',
+            index=models.Index(fields=['category', 'date', 'id'], name='audio_cat_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['date', 'id'], name='video_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['category', 'date', 'id'], name='video_cat_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:36
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+from core.migration_utils import PostgresOnly, search_vector_trigger
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_audios', '0005_audio_video_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audio',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        PostgresOnly(migrations.AddIndex(
+            model_name='audio',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='audio_search_idx'),
+        )),
+        PostgresOnly(migrations.AddIndex(
+            model_name='video',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='video_search_idx'),
+        )),
+        PostgresOnly(search_vector_trigger('video_audios_audio', [
+            ('english_title', 'english', 'A'),
+            ('urdu_title', 'simple', 'A'),
+        ])),
+        PostgresOnly(search_vector_trigger('video_audios_video', [
+            ('english_title', 'english', 'A'),
+            ('urdu_title', 'simple', 'A'),
+        ])),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:39
+
+from django.db import migrations, models
+
+from core.migration_utils import PostgresOnly, fill_normalized_fields, search_vector_trigger
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_audios', '0006_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audio',
+            name='normalized_title_en',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='audio',
+            name='normalized_title_ur',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='normalized_title_en',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='normalized_title_ur',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='audio',
+            index=models.Index(fields=['normalized_title_en'], name='audio_norm_en_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='audio',
+            index=models.Index(fields=['normalized_title_ur'], name='audio_norm_ur_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['normalized_title_en'], name='video_norm_en_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['normalized_title_ur'], name='video_norm_ur_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        fill_normalized_fields('video_audios', 'audio', {
+            'normalized_title_en': 'english_title',
+            'normalized_title_ur': 'urdu_title',
+        }),
+        fill_normalized_fields('video_audios', 'video', {
+            'normalized_title_en': 'english_title',
+            'normalized_title_ur': 'urdu_title',
+        }),
+        # Index the normalized Urdu title instead of the raw one
+        PostgresOnly(search_vector_trigger(
+            'video_audios_audio',
+            [
+                ('english_title', 'english', 'A'),
+                ('normalized_title_ur', 'simple', 'A'),
+            ],
+            previous_columns=[
+                ('english_title', 'english', 'A'),
+                ('urdu_title', 'simple', 'A'),
+            ],
+        )),
+        # Index the normalized Urdu title instead of the raw one
+        PostgresOnly(search_vector_trigger(
+            'video_audios_video',
+            [
+                ('english_title', 'english', 'A'),
+                ('normalized_title_ur', 'simple', 'A'),
+            ],
+            previous_columns=[
+                ('english_title', 'english', 'A'),
+                ('urdu_title', 'simple', 'A'),
+            ],
+        )),
+    ]
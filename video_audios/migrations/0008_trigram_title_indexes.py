@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:41
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+from core.migration_utils import PostgresOnly
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_trigram_extension'),
+        ('video_audios', '0007_normalized_titles'),
+    ]
+
+    operations = [
+        PostgresOnly(migrations.AddIndex(
+            model_name='audio',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['normalized_title_en'], name='audio_trgm_en_idx', opclasses=['gin_trgm_ops']),
+        )),
+        PostgresOnly(migrations.AddIndex(
+            model_name='audio',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['normalized_title_ur'], name='audio_trgm_ur_idx', opclasses=['gin_trgm_ops']),
+        )),
+        PostgresOnly(migrations.AddIndex(
+            model_name='video',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['normalized_title_en'], name='video_trgm_en_idx', opclasses=['gin_trgm_ops']),
+        )),
+        PostgresOnly(migrations.AddIndex(
+            model_name='video',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['normalized_title_ur'], name='video_trgm_ur_idx', opclasses=['gin_trgm_ops']),
+        )),
+    ]
@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 CATEGORY_CHOICES = [
@@ -12,6 +14,27 @@ class Audio(models.Model):
     audio_file = models.FileField(upload_to="audios/")
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
     date = models.DateField()
+    # Full-text search (kept up to date by a database trigger on PostgreSQL)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Normalized titles for search and lookups (filled on save, see core/text.py)
+    normalized_title_en = models.CharField(max_length=255, blank=True, default='', editable=False)
+    normalized_title_ur = models.CharField(max_length=255, blank=True, default='', editable=False)
+    normalized_fields = {'normalized_title_en': 'english_title', 'normalized_title_ur': 'urdu_title'}
+
+    class Meta:
+        indexes = [
+            # Keyset pagination: ORDER BY date DESC, id DESC with (date, id) seek
+            models.Index(fields=['date', 'id'], name='audio_date_id_idx'),
+            models.Index(fields=['category', 'date', 'id'], name='audio_cat_date_id_idx'),
+            GinIndex(fields=['search_vector'], name='audio_search_idx'),
+            models.Index(fields=['normalized_title_en'], name='audio_norm_en_idx',
+                         opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['normalized_title_ur'], name='audio_norm_ur_idx',
+                         opclasses=['varchar_pattern_ops']),
+            # Typeahead substring matches (pg_trgm, see core/suggest.py)
+            GinIndex(fields=['normalized_title_en'], name='audio_trgm_en_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['normalized_title_ur'], name='audio_trgm_ur_idx', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return self.english_title
@@ -22,6 +45,27 @@ class Video(models.Model):
     youtube_url = models.URLField()
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
     date = models.DateField()
+    # Full-text search (kept up to date by a database trigger on PostgreSQL)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Normalized titles for search and lookups (filled on save, see core/text.py)
+    normalized_title_en = models.CharField(max_length=255, blank=True, default='', editable=False)
+    normalized_title_ur = models.CharField(max_length=255, blank=True, default='', editable=False)
+    normalized_fields = {'normalized_title_en': 'english_title', 'normalized_title_ur': 'urdu_title'}
+
+    class Meta:
+        indexes = [
+            # Keyset pagination: ORDER BY date DESC, id DESC with (date, id) seek
+            models.Index(fields=['date', 'id'], name='video_date_id_idx'),
+            models.Index(fields=['category', 'date', 'id'], name='video_cat_date_id_idx'),
+            GinIndex(fields=['search_vector'], name='video_search_idx'),
+            models.Index(fields=['normalized_title_en'], name='video_norm_en_idx',
+                         opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['normalized_title_ur'], name='video_norm_ur_idx',
+                         opclasses=['varchar_pattern_ops']),
+            # Typeahead substring matches (pg_trgm, see core/suggest.py)
+            GinIndex(fields=['normalized_title_en'], name='video_trgm_en_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['normalized_title_ur'], name='video_trgm_ur_idx', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return self.english_title
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from django.core.exceptions import ValidationError
+from core.fast_serializers import FastSerializer
+from core.media_urls import get_media_url_builder
 from .models import Audio, Video
 import os
 
@@ -36,7 +38,20 @@ class AudioSerializer(serializers.ModelSerializer):
     def get_audioUrl(self, obj):
         request = self.context.get("request")
         if obj.audio_file and request:
-            return request.build_absolute_uri(obj.audio_file.url)
+            return get_media_url_builder(request).file_url(obj.audio_file)
+        return ""
+
+
+class AudioFastSerializer(FastSerializer):
+    """Same output as AudioSerializer, from .values() rows (used for the list)"""
+    serializer_class = AudioSerializer
+    value_fields = ('audio_file',)
+    storage = Audio._meta.get_field('audio_file').storage
+
+    def get_audioUrl(self, row):
+        request = self.context.get("request")
+        if row['audio_file'] and request:
+            return get_media_url_builder(request).url(row['audio_file'], self.storage)
         return ""
 
 
@@ -57,3 +72,8 @@ class VideoSerializer(serializers.ModelSerializer):
                     "Please provide a valid YouTube URL"
                 )
         return value
+
+
+class VideoFastSerializer(FastSerializer):
+    """Same output as VideoSerializer, from .values() rows (used for the list)"""
+    serializer_class = VideoSerializer
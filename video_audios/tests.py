@@ -1,3 +1,155 @@
-from django.test import TestCase
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .models import Audio, Video
+from .serializers import AudioFastSerializer, AudioSerializer, VideoFastSerializer, VideoSerializer
+
+
+class KeysetPaginationTests(TestCase):
+    """Tests for cursor pagination of the audio and video lists"""
+
+    def setUp(self):
+        """Seed recordings with many shared dates"""
+        cache.clear()
+        self.client = APIClient()
+        start = date(2024, 1, 1)
+        Audio.objects.bulk_create([
+            Audio(
+                english_title=f'Bayaan {i}', urdu_title=f'بیان {i}', audio_file=f'audios/{i}.mp3',
+                category='Bayaan' if i % 3 else 'Dhikr', date=start + timedelta(days=i // 4),
+            )
+            for i in range(45)
+        ])
+        self.expected = list(Audio.objects.order_by('-date', '-id').values_list('id', flat=True))
+
+    def _walk(self, url):
+        ids = []
+        while url:
+            data = self.client.get(url).json()
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        return ids
+
+    def test_pages_cover_every_row_once_in_order(self):
+        """Following next links returns every audio exactly once"""
+        self.assertEqual(self._walk('/api/video-audios/audios/?page_size=7'), self.expected)
+
+    def test_previous_link_returns_previous_page(self):
+        """The previous link of page two is page one"""
+        first = self.client.get('/api/video-audios/audios/?page_size=10').json()
+        second = self.client.get(first['next']).json()
+        back = self.client.get(second['previous']).json()
+        self.assertIsNone(first['previous'])
+        self.assertEqual([a['id'] for a in back['results']], [a['id'] for a in first['results']])
+
+    def test_category_filter(self):
+        """Pages can be restricted to one category"""
+        ids = self._walk('/api/video-audios/audios/?category=Dhikr&page_size=4')
+        expected = list(Audio.objects.filter(category='Dhikr').order_by('-date', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_deep_page_costs_one_query(self):
+        """A page deep in the archive is a single seek query"""
+        url = '/api/video-audios/audios/?page_size=5'
+        for _ in range(6):
+            url = self.client.get(url).json()['next']
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()['results']), 5)
+
+    def test_invalid_cursor(self):
+        """A tampered cursor is a 404"""
+        response = self.client.get('/api/video-audios/audios/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_video_list_is_paginated(self):
+        """Videos use the same pagination"""
+        Video.objects.create(
+            english_title='Event', urdu_title='تقریب', youtube_url='https://youtu.be/x',
+            category='Event', date=date(2024, 5, 1),
+        )
+        data = self.client.get('/api/video-audios/videos/').json()
+        self.assertEqual(len(data['results']), 1)
+        self.assertIsNone(data['next'])
+
+
+class ArchiveFilterTests(TestCase):
+    """Tests for the category/year/date filters and facet counts"""
+
+    def setUp(self):
+        """Seed audios over two years and two categories"""
+        cache.clear()
+        self.client = APIClient()
+        rows = [
+            ('Bayaan', date(2023, 5, 1)), ('Bayaan', date(2024, 2, 1)), ('Bayaan', date(2024, 3, 1)),
+            ('Dhikr', date(2023, 7, 1)), ('Dhikr', date(2024, 8, 1)),
+        ]
+        Audio.objects.bulk_create([
+            Audio(english_title=f'Audio {i}', urdu_title='آڈیو', audio_file='audios/a.mp3', category=c, date=d)
+            for i, (c, d) in enumerate(rows)
+        ])
+
+    def _get(self, **params):
+        return self.client.get('/api/video-audios/audios/', params)
+
+    def test_filters(self):
+        """category, year and date range narrow the list"""
+        self.assertEqual(len(self._get(category='Bayaan').json()['results']), 3)
+        self.assertEqual(len(self._get(year=2024).json()['results']), 3)
+        self.assertEqual(len(self._get(category='Dhikr', year=2024).json()['results']), 1)
+        self.assertEqual(len(self._get(date_from='2024-01-15', date_to='2024-03-01').json()['results']), 2)
+        self.assertEqual(self._get(year='last').status_code, 400)
+        self.assertEqual(self._get(date_from='2024-13-01').status_code, 400)
+
+    def test_year_out_of_range(self):
+        """Years a date can't hold are a 400, not a 500"""
+        for year in ['-5', '0', '99999']:
+            with self.subTest(year=year):
+                response = self._get(year=year)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('year', response.json()['errors'])
+        self.assertEqual(self._get(year='9999').status_code, 200)
+
+    def test_facets_ignore_their_own_filter(self):
+        """Each facet counts over the other filters only"""
+        facets = self._get(category='Bayaan', year=2024, facets='true').json()['facets']
+        self.assertEqual(facets['category'], [{'value': 'Bayaan', 'count': 2}, {'value': 'Dhikr', 'count': 1}])
+        self.assertEqual(facets['year'], [{'value': 2024, 'count': 2}, {'value': 2023, 'count': 1}])
+        self.assertNotIn('facets', self._get().json())
+
+    def test_facets_cached_across_pages(self):
+        """Facets are one query, and reused by the next page of the same listing"""
+        with self.assertNumQueries(2):
+            first = self._get(facets='true', page_size=2).json()
+        with self.assertNumQueries(1):
+            second = self.client.get(first['next']).json()
+        self.assertEqual(first['facets'], second['facets'])
+        self.assertEqual(sum(f['count'] for f in second['facets']['year']), 5)
+
+
+class FastSerializerTests(TestCase):
+    """Golden tests: the .values() fast path renders the same bytes as the DRF serializers"""
+
+    def test_output_is_byte_identical(self):
+        """Audio URLs (with and without a request) and videos match"""
+        Audio.objects.create(
+            english_title='Bayaan', urdu_title='بیان', audio_file='audios/b 1.mp3', category='Bayaan',
+            date=date(2024, 1, 5),
+        )
+        Audio.objects.create(english_title='Silent', urdu_title='خاموش', category='Dhikr', date=date(2024, 1, 6))
+        Video.objects.create(
+            english_title='Urs', urdu_title='عرس', youtube_url='https://youtu.be/x', category='Event',
+            date=date(2024, 2, 1),
+        )
+        audios = Audio.objects.order_by('id')
+        for context in ({'request': RequestFactory().get('/')}, {}):
+            expected = JSONRenderer().render(AudioSerializer(audios, many=True, context=context).data)
+            self.assertEqual(JSONRenderer().render(AudioFastSerializer(audios, context=context).data), expected)
+        videos = Video.objects.order_by('id')
+        expected = JSONRenderer().render(VideoSerializer(videos, many=True).data)
+        self.assertEqual(JSONRenderer().render(VideoFastSerializer(videos).data), expected)
@@ -1,11 +1,24 @@
 from rest_framework import generics
+from core.cache_utils import CacheMixin
+from core.fast_serializers import FastListMixin
+from core.filters import ArchiveFilterMixin
+from core.pagination import KeysetPagination
 from .models import Audio, Video
-from .serializers import AudioSerializer, VideoSerializer
+from .serializers import AudioFastSerializer, AudioSerializer, VideoFastSerializer, VideoSerializer
 
-class AudioListView(generics.ListAPIView):
-    queryset = Audio.objects.all().order_by("-date")
+
+class AudioListView(CacheMixin, ArchiveFilterMixin, FastListMixin, generics.ListAPIView):
+    queryset = Audio.objects.all().order_by("-date", "-id")
     serializer_class = AudioSerializer
+    fast_serializer_class = AudioFastSerializer
+    pagination_class = KeysetPagination
+    cache_key_prefix = 'audios'
+    query_budget = 2  # page, facets
 
-class VideoListView(generics.ListAPIView):
-    queryset = Video.objects.all().order_by("-date")
+class VideoListView(CacheMixin, ArchiveFilterMixin, FastListMixin, generics.ListAPIView):
+    queryset = Video.objects.all().order_by("-date", "-id")
     serializer_class = VideoSerializer
+    fast_serializer_class = VideoFastSerializer
+    pagination_class = KeysetPagination
+    cache_key_prefix = 'videos'
+    query_budget = 2  # page, facets